@@ -31,21 +31,47 @@ qtradex.Sell
 qtradex.Thresholds
 
 qtradex.Data
+
+Everything above is imported on first access (PEP 562), so `import qtradex`
+itself only loads this namespace; see qtradex.common.lazy.
 """
 
-import qtradex.common
-import qtradex.core
-import qtradex.indicators
-import qtradex.optimizers
-import qtradex.plot
-import qtradex.public.data
-from qtradex.common.utilities import expand_bools, rotate, truncate
-from qtradex.core import BaseBot, backtest, dispatch, live, papertrade
-from qtradex.core.tune_manager import load_tune
-from qtradex.indicators import derivative, fitness, float_period, lag, qi
-from qtradex.indicators import tulipy_wrapped as ti
-from qtradex.indicators.cache_decorator import float_period as float_decorator
-from qtradex.plot import plot, plotmotion
-from qtradex.private import PaperWallet, Wallet
-from qtradex.private.signals import Buy, Hold, Sell, Thresholds
-from qtradex.public import Data, load_csv
+from qtradex.common.lazy import lazy_exports
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "common": "qtradex.common",
+        "core": "qtradex.core",
+        "indicators": "qtradex.indicators",
+        "optimizers": "qtradex.optimizers",
+        "private": "qtradex.private",
+        "public": "qtradex.public",
+        "expand_bools": "qtradex.common.utilities:expand_bools",
+        "rotate": "qtradex.common.utilities:rotate",
+        "truncate": "qtradex.common.utilities:truncate",
+        "BaseBot": "qtradex.core.base_bot:BaseBot",
+        "backtest": "qtradex.core.backtest:backtest",
+        "dispatch": "qtradex.core.dispatch:dispatch",
+        "live": "qtradex.core.live:live",
+        "papertrade": "qtradex.core.papertrade:papertrade",
+        "load_tune": "qtradex.core.tune_manager:load_tune",
+        "derivative": "qtradex.indicators.utilities:derivative",
+        "fitness": "qtradex.indicators.fitness",
+        "float_period": "qtradex.indicators.utilities:float_period",
+        "lag": "qtradex.indicators.utilities:lag",
+        "qi": "qtradex.indicators.qi",
+        "ti": "qtradex.indicators.tulipy_wrapped",
+        "float_decorator": "qtradex.indicators.cache_decorator:float_period",
+        "plot": "qtradex.plot.utilities:plot",
+        "plotmotion": "qtradex.plot.utilities:plotmotion",
+        "PaperWallet": "qtradex.private.wallet:PaperWallet",
+        "Wallet": "qtradex.private.wallet:Wallet",
+        "Buy": "qtradex.private.signals:Buy",
+        "Hold": "qtradex.private.signals:Hold",
+        "Sell": "qtradex.private.signals:Sell",
+        "Thresholds": "qtradex.private.signals:Thresholds",
+        "Data": "qtradex.public.data:Data",
+        "load_csv": "qtradex.public.file_loader:load_csv",
+    },
+)
@@ -1,3 +1,10 @@
-import qtradex.common.bitshares_nodes
-import qtradex.common.json_ipc
-import qtradex.common.utilities
+from qtradex.common.lazy import lazy_exports
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "bitshares_nodes": "qtradex.common.bitshares_nodes",
+        "json_ipc": "qtradex.common.json_ipc",
+        "utilities": "qtradex.common.utilities",
+    },
+)
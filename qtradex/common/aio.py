@@ -0,0 +1,166 @@
+"""
+Shared asyncio plumbing for exchange access via ccxt.async_support.
+
+One `ccxt.async_support` instance (session) is kept per exchange and set of
+credentials per event loop, so every coroutine talking to an exchange reuses its
+HTTP connections, loaded markets and rate limiter (ccxt's own throttle, a token
+bucket sized from the exchange's `rateLimit`).
+
+Synchronous code runs coroutines on a background event loop with run_sync(), and
+BlockingExchange gives the familiar blocking ccxt interface on top of a session,
+so live bots, the prefetcher and load tests can issue hundreds of concurrent
+requests from one loop while older code keeps calling plain methods.
+"""
+# STANDARD MODULES
+import asyncio
+import atexit
+import inspect
+import threading
+
+LOOP = None
+LOOP_LOCK = threading.Lock()
+# {(loop, exchange_id, api_key): ccxt.async_support exchange}
+SESSIONS = {}
+# {(loop, exchange_id, api_key): asyncio.Lock}, held while a session loads its markets
+SESSION_LOCKS = {}
+
+
+def event_loop():
+    """
+    Return the background event loop, starting it in a daemon thread if need be.
+    """
+    global LOOP
+    with LOOP_LOCK:
+        if LOOP is None:
+            LOOP = asyncio.new_event_loop()
+            threading.Thread(
+                target=LOOP.run_forever, name="qtradex-aio", daemon=True
+            ).start()
+            atexit.register(shutdown)
+        return LOOP
+
+
+def run_sync(coroutine, timeout=None):
+    """
+    Run a coroutine on the background event loop and block until it returns.
+
+    Parameters:
+    - coroutine: The coroutine object to run.
+    - timeout: Optional seconds to wait before raising TimeoutError.
+
+    Returns:
+    - Whatever the coroutine returns; its exceptions are raised here.
+    """
+    loop = event_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coroutine.close()
+        raise RuntimeError("run_sync() called from the background loop; await instead")
+    return asyncio.run_coroutine_threadsafe(coroutine, loop).result(timeout)
+
+
+async def session(exchange_id, api_key=None, api_secret=None):
+    """
+    Return the shared ccxt.async_support instance for an exchange on this loop.
+
+    Parameters:
+    - exchange_id: A ccxt exchange id, i.e. "binance".
+    - api_key, api_secret: Optional credentials; each set gets its own session.
+
+    Returns:
+    - A ccxt.async_support exchange with its markets loaded.
+    """
+    key = (asyncio.get_running_loop(), exchange_id, api_key)
+    if key in SESSIONS:
+        return SESSIONS[key]
+    # concurrent callers wait for the first one's markets instead of racing it
+    async with SESSION_LOCKS.setdefault(key, asyncio.Lock()):
+        if key not in SESSIONS:
+            # imported here so a headless backtest never pays for ccxt and aiohttp
+            import ccxt.async_support as ccxt_async
+
+            config = {"enableRateLimit": True}
+            if api_key is not None:
+                config.update({"apiKey": api_key, "secret": api_secret})
+            exchange = getattr(ccxt_async, exchange_id)(config)
+            try:
+                await exchange.load_markets()
+            except BaseException:
+                await exchange.close()
+                raise
+            # only published once usable
+            SESSIONS[key] = exchange
+    return SESSIONS[key]
+
+
+async def close_sessions():
+    """
+    Close every session opened on the running loop.
+    """
+    loop = asyncio.get_running_loop()
+    for key in [key for key in SESSION_LOCKS if key[0] is loop]:
+        del SESSION_LOCKS[key]
+    for key in [key for key in SESSIONS if key[0] is loop]:
+        await SESSIONS.pop(key).close()
+
+
+def shutdown():
+    """
+    Close the background loop's sessions; registered with atexit.
+    """
+    if LOOP is not None and LOOP.is_running():
+        try:
+            run_sync(close_sessions(), timeout=10)
+        except Exception:
+            pass
+
+
+class BlockingExchange:
+    """
+    Blocking facade over a shared ccxt.async_support session.
+
+    Attribute access is forwarded to the session; any method returning an
+    awaitable, such as `fetch_ticker`, `create_order` or the implicit API
+    endpoints (`public_get_ticker`, ...), is run to completion with run_sync(), so
+    this behaves like a synchronous ccxt instance.  Like a plain ccxt instance,
+    it does not touch the network before its first use.
+    """
+
+    def __init__(self, exchange_id, api_key=None, api_secret=None):
+        self.exchange_id = exchange_id
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self._session = None
+
+    @property
+    def session(self):
+        """
+        The shared session, opened (and its markets loaded) on first use.
+        """
+        if self._session is None:
+            self._session = run_sync(
+                session(self.exchange_id, self.api_key, self.api_secret)
+            )
+        return self._session
+
+    def __getattr__(self, name):
+        attr = getattr(self.session, name)
+        if callable(attr):
+            # ccxt's implicit endpoints are plain functions returning coroutines,
+            # so check what a call returns rather than what the attribute is
+
+            def blocking(*args, **kwargs):
+                result = attr(*args, **kwargs)
+                return run_sync(result) if inspect.isawaitable(result) else result
+
+            return blocking
+        return attr
+
+    async def connect(self):
+        """
+        Return the session for use from a coroutine on any event loop.
+        """
+        return await session(self.exchange_id, self.api_key, self.api_secret)
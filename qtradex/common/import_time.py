@@ -0,0 +1,102 @@
+"""
+Import-time benchmark guarding the lazy `qtradex` namespace against regressions.
+
+Each statement is timed in a fresh interpreter, and the heavy third party modules
+it pulled in are listed; run as
+
+    python -m qtradex.common.import_time
+
+which exits non-zero if a statement exceeds its time budget or loads a module it
+should not.
+"""
+import json
+import subprocess
+import sys
+
+# modules a headless backtest must never pay for
+HEAVY = (
+    "matplotlib",
+    "ccxt",
+    "pandas",
+    "pandas_ta",
+    "scipy",
+    "ttkbootstrap",
+    "tkinter",
+    "websocket",
+    "yfinance",
+)
+
+# statement: (seconds budget, heavy modules it is allowed to load)
+CHECKS = {
+    "import qtradex": (0.25, ()),
+    "from qtradex.core.backtest import backtest": (1.0, ()),
+    "from qtradex.private.wallet import PaperWallet": (0.5, ()),
+}
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+heavy = sorted(i for i in {heavy!r} if i in sys.modules)
+print(json.dumps([elapsed, heavy]))
+"""
+
+
+def measure(statement, repeat=3):
+    """
+    Time a statement in fresh interpreters.
+
+    Parameters:
+    - statement: Python source to execute, i.e. "import qtradex".
+    - repeat: Number of interpreters to average over; the best run is kept.
+
+    Returns:
+    - A tuple of (seconds, list of heavy modules loaded).
+    """
+    best = None
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(statement=statement, heavy=HEAVY)],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        elapsed, heavy = json.loads(output.strip().splitlines()[-1])
+        if best is None or elapsed < best[0]:
+            best = (elapsed, heavy)
+    return best
+
+
+def check(checks=None, repeat=3):
+    """
+    Run the import benchmark.
+
+    Parameters:
+    - checks: Optional dictionary like CHECKS.
+    - repeat: Number of interpreters per statement.
+
+    Returns:
+    - A list of human readable failures, empty when everything is within budget.
+    """
+    failures = []
+    for statement, (budget, allowed) in (checks or CHECKS).items():
+        elapsed, heavy = measure(statement, repeat)
+        unexpected = [i for i in heavy if i not in allowed]
+        print(f"{elapsed * 1000:8.1f} ms  {statement}  {' '.join(heavy)}")
+        if elapsed > budget:
+            failures.append(f"{statement!r} took {elapsed:.3f}s; budget is {budget}s")
+        if unexpected:
+            failures.append(f"{statement!r} imported {', '.join(unexpected)}")
+    return failures
+
+
+def main():
+    failures = check()
+    for failure in failures:
+        print(failure)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
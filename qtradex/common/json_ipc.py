@@ -2,20 +2,21 @@
 JSON IPC
 Concurrent Interprocess Communication via Read and Write JSON
 features to mitigate race condition:
-    open file using with statement
-    explicit close() in with statement
-    finally close()
+    writes go to a temporary file that atomically replaces the document, so a
+        reader sees either the old or the new document, never a partial one
+    writers and appenders hold an advisory lock (fcntl, msvcrt on Windows) on a
+        sidecar `.lock` file, so concurrent updates serialize instead of racing
+    json_update() is read-copy-update: read, modify and replace under the lock,
+        so two processes updating one document never lose each other's changes
+    reads take no lock and never spin
     json formatting required
-    postscript clipping prevents misread due to overwrite without erase
     read and write to the text pipe with a single definition
-    growing delay between attempts prevents cpu leak
 to view your live streaming database, navigate to the pipe folder in the terminal:
     tail -F your_json_ipc_database.txt
-:dependencies: os, traceback, json.loads, json.dumps
-:warn: incessant read/write concurrency may damage older spinning platter drives
+:dependencies: os, threading, json.loads, json.dumps
 :warn: keeping a 3rd party file browser pointed to the pipe folder may consume RAM
 :param str(doc): name of file to read or write
-:param str(text): json dumped list or dict to write; if empty string: then read
+:param str(text): json dumped list or dict to write, "" to clear; if None: then read
 :return: python list or dictionary if reading, else None
 wtfpl2020 litepresence.com
 """
@@ -25,43 +26,121 @@ wtfpl2020 litepresence.com
 #
 # STANDARD MODULES
 import os
+import threading
 import time
-import traceback
+from contextlib import contextmanager
 from json import dumps as json_dumps
 from json import loads as json_loads
 
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
 
-def json_ipc(doc="", text=None, initialize=False, append=False):
+PATH = f"{os.path.dirname(os.path.abspath(__file__))}/data"
+# documents written before atomic writes may still carry clipping tags
+TAG = "<<< JSON IPC >>>"
+# {path: depth} of the file locks each thread holds, so locks are reentrant
+HELD = threading.local()
+
+
+@contextmanager
+def file_lock(path, shared=False):
     """
-    read, write, or append json while mitigating race condition
+    Hold an advisory lock on `path + ".lock"` across processes.
+
+    Reentrant within a thread; other threads and processes block until it is
+    released.  Windows has no shared locks, so `shared` is exclusive there.
+
+    Parameters:
+    - path: The file to lock; the lock itself lives in a sidecar file.
+    - shared: Take a shared (reader) lock instead of an exclusive one.
     """
-    # initialize variables
-    data = None
-    # file operation type for exception message
-    if text is not None:
-        if append:
-            act = "appending"
+    path = os.path.abspath(f"{path}.lock")
+    held = HELD.__dict__.setdefault("depth", {})
+    if held.get(path):
+        held[path] += 1
+        try:
+            yield
+        finally:
+            held[path] -= 1
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a+b") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
         else:
-            act = "writing"
-    else:
-        act = "reading"
-    # create a clipping tag for read and write operations
-    tag = ""
-    if not act == "appending":
-        tag = "<<< JSON IPC >>>"
-    # determine where we are in the file system; change directory to data folder
-    path = f"{os.path.dirname(os.path.abspath(__file__))}/data"
-    # ensure we're writing json then add prescript and postscript for clipping
-    try:
-        if text:
-            # Only add tags if it's not a .json file
-            if doc.endswith(".json"):
-                text = json_dumps(json_loads(text))
+            handle.seek(0)
+            while True:
+                try:
+                    # LK_LOCK itself retries for about ten seconds
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        held[path] = 1
+        try:
+            yield
+        finally:
+            held[path] = 0
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
             else:
-                text = tag + json_dumps(json_loads(text)) + tag
-    except Exception as error:
-        print(text, error.args)
-        raise error
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def atomic_write(path, text, mode="w"):
+    """
+    Replace the file at `path` with `text` so no reader ever sees it half written.
+
+    Parameters:
+    - path: The file to write.
+    - text: str, or bytes with mode="wb".
+    - mode: "w" or "wb".
+    """
+    temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporary, mode, **({} if "b" in mode else {"encoding": "utf-8"})) as handle:
+        handle.write(text)
+        handle.flush()
+        os.fsync(handle.fileno())
+    for attempt in range(50):
+        try:
+            os.replace(temporary, path)
+            return
+        except PermissionError:
+            # Windows refuses to replace a file another process has open
+            if attempt == 49:
+                os.remove(temporary)
+                raise
+            time.sleep(0.01)
+
+
+def read_json(path):
+    """
+    Read a json document, tolerating the clipping tags of older versions.
+    """
+    with open(path, "r", encoding="utf-8") as handle:
+        content = handle.read()
+    if TAG in content:
+        content = content.split(TAG)[1]
+    return json_loads(content)
+
+
+def json_ipc(doc="", text=None, initialize=False, append=False):
+    """
+    read, write, or append json while mitigating race condition
+    """
+    path = PATH
+    # ensure we're writing json
+    if text:
+        try:
+            text = json_dumps(json_loads(text))
+        except Exception as error:
+            print(text, error.args)
+            raise error
     # move append operations to the comptroller folder and add new line
     if append:
         path += "/comptroller"
@@ -70,52 +149,48 @@ def json_ipc(doc="", text=None, initialize=False, append=False):
     if initialize:
         os.makedirs(path, exist_ok=True)
         os.makedirs(f"{path}/comptroller", exist_ok=True)
+    if not doc:
+        return None
+    doc = f"{path}/{doc}"
+    if text is None:
+        try:
+            return read_json(doc)
+        except FileNotFoundError:
+            if not os.path.isdir(PATH):
+                # maybe there is no pipe? auto initialize the pipe!
+                print("no json_ipc pipe found, initializing...")
+                json_ipc(initialize=True)
+            raise
+    os.makedirs(os.path.dirname(doc), exist_ok=True)
+    with file_lock(doc):
+        if append:
+            with open(doc, "a", encoding="utf-8") as handle:
+                handle.write(text)
+        else:
+            atomic_write(doc, text)
+    return None
 
-    if doc:
-        doc = f"{path}/{doc}"
-        # race read/write until satisfied
-        iteration = 0
-        while True:
-            # increment the delay between attempts exponentially
-            time.sleep(0.02 * iteration**2)
-            try:
-                if act == "appending":
-                    with open(doc, "a") as handle:
-                        handle.write(text)
-                        handle.close()
-                        break
-                elif act == "writing":
-                    with open(doc, "w+") as handle:
-                        handle.write(text)
-                        handle.close()
-                        break
-                elif act == "reading":
-                    with open(doc, "r") as handle:
-                        # only accept legitimate json
-                        content = handle.read()
-                        if tag and tag in content:
-                            data = json_loads(content.split(tag)[1])
-                        else:
-                            data = json_loads(content)
-                        handle.close()
-                        break
-            except Exception:
-                if iteration == 1:
-                    print("no json_ipc pipe found, initializing...")
-                elif iteration == 5:
-                    # maybe there is no pipe? auto initialize the pipe!
-                    json_ipc(initialize=True)
-                    if act == "reading" and not os.path.exists(f"{path}/{doc}"):
-                        raise FileNotFoundError()
-                    print("json_ipc pipe initialized, retrying...\n")
-                elif iteration == 10:
-                    print("json_ipc unexplained failure\n", traceback.format_exc())
-                iteration += 1
-                continue
-            # deliberately double check that the file is closed
-            finally:
-                try:
-                    handle.close()
-                except Exception:
-                    pass
-    return data
+
+def json_update(doc, update, default=None):
+    """
+    Read-copy-update a json document under an exclusive lock.
+
+    Parameters:
+    - doc: Name of the document, as for json_ipc().
+    - update: Callable receiving the current document (or `default` if there is
+      none) and returning the new one.
+    - default: The document to start from if it does not exist yet; {} if None.
+
+    Returns:
+    - The new document.
+    """
+    doc = f"{PATH}/{doc}"
+    os.makedirs(os.path.dirname(doc), exist_ok=True)
+    with file_lock(doc):
+        try:
+            current = read_json(doc)
+        except FileNotFoundError:
+            current = {} if default is None else default
+        new = update(current)
+        atomic_write(doc, json_dumps(new))
+    return new
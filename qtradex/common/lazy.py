@@ -0,0 +1,67 @@
+"""
+Lazy attribute loading for qtradex packages (PEP 562).
+
+A package lists what it exports as `{name: "module"}` or `{name: "module:attribute"}`
+and nothing is imported until one of those names is first accessed, so a headless
+backtest worker never pays for matplotlib, ccxt or the optimizer suite.
+"""
+import importlib
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    """
+    Module type for lazily exporting packages.
+
+    The import system binds every submodule on its parent package once loaded;
+    several qtradex packages export a function under the name of the submodule
+    that defines it (i.e. `qtradex.core.backtest`), so such bindings are ignored
+    and the name keeps resolving to the function.
+    """
+
+    def __setattr__(self, name, value):
+        target = self.__dict__.get("LAZY", {}).get(name, "")
+        if ":" in target and isinstance(value, types.ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+def lazy_exports(name, exports):
+    """
+    Install lazy exports on a package.
+
+    Usage, in a package `__init__.py`:
+
+        __getattr__, __dir__ = lazy_exports(__name__, {
+            "backtest": "qtradex.core.backtest:backtest",
+            "tune_manager": "qtradex.core.tune_manager",
+        })
+
+    Parameters:
+    - name: The package's `__name__`.
+    - exports: Dictionary mapping attribute names to "module" or "module:attribute".
+
+    Returns:
+    - The module level `__getattr__` and `__dir__` functions.
+    """
+    module = sys.modules[name]
+    module.LAZY = exports
+    module.__class__ = LazyModule
+    namespace = module.__dict__
+
+    def __getattr__(attr):
+        if attr not in exports:
+            raise AttributeError(f"module {name!r} has no attribute {attr!r}")
+        path, _, member = exports[attr].partition(":")
+        value = importlib.import_module(path)
+        if member:
+            value = getattr(value, member)
+        # cache in the module namespace so the next lookup is a plain dict hit
+        namespace[attr] = value
+        return value
+
+    def __dir__():
+        return sorted(set(namespace) | set(exports))
+
+    return __getattr__, __dir__
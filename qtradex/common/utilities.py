@@ -35,6 +35,8 @@ from threading import Thread
 import re
 
 import numpy as np
+from qtradex.common.json_ipc import atomic_write, file_lock
+from qtradex.common.json_ipc import json_ipc as _json_ipc
 
 
 PATH = str(os.path.dirname(os.path.abspath(__file__))) + "/"
@@ -282,177 +284,52 @@ def write_file(path, contents):
 
 def race_write(doc="", text=""):
     """
-    Concurrent Write to File Operation
+    Concurrent Write to File Operation; the file is replaced atomically under a lock
     """
-    text = str(text)
-    i = 0
     doc = PATH + "pipe/" + doc
-    while True:
-        try:
-            time.sleep(0.05 * i**2)
-            i += 1
-            with open(doc, "w+", encoding="utf-8") as handle:
-                handle.write(text)
-                handle.close()
-                break
-        except Exception as error:
-            msg = str(type(error).__name__) + str(error.args)
-            msg += " race_write()"
-            print(msg)
-            try:
-                handle.close()
-            except:
-                pass
-            continue
-        finally:
-            try:
-                handle.close()
-            except:
-                pass
+    os.makedirs(os.path.dirname(doc), exist_ok=True)
+    with file_lock(doc):
+        atomic_write(doc, str(text))
 
 
-def race_read(doc):
+def race_update(doc, update, default=None):
     """
-    Concurrent Read JSON from File Operation
+    Concurrent Read-Copy-Update of a JSON File; read and write happen under one lock
+    so concurrent updates are not lost
+    :param str(doc): name of file to update
+    :param callable(update): receives the current document and returns the new one
+    :param default: document to start from if the file does not exist; {} if None
+    :return: the new document
     """
     doc = PATH + "pipe/" + doc
-    i = 0
-    while True:
+    os.makedirs(os.path.dirname(doc), exist_ok=True)
+    with file_lock(doc):
         try:
-            time.sleep(0.05 * i**2)
-            i += 1
             with open(doc, "r", encoding="utf-8") as handle:
-                data = json_loads(handle.read())
-                handle.close()
-                return data
-        except Exception as error:
-            msg = str(type(error).__name__) + str(error.args)
-            msg += " race_read_json()"
-            print(msg)
-            try:
-                handle.close()
-            except:
-                pass
-            if i > 5:
-                raise error
-            continue
-        finally:
-            try:
-                handle.close()
-            except:
-                pass
+                current = json_loads(handle.read())
+        except FileNotFoundError:
+            current = {} if default is None else default
+        new = update(current)
+        atomic_write(doc, json_dumps(new))
+    return new
+
+
+def race_read(doc):
+    """
+    Concurrent Read JSON from File Operation; writes are atomic, so no lock is needed
+    """
+    with open(PATH + "pipe/" + doc, "r", encoding="utf-8") as handle:
+        return json_loads(handle.read())
 
 
 def json_ipc(doc="", text="", initialize=False, append=False):
     """
-    JSON IPC
-    Concurrent Interprocess Communication via Read and Write JSON
-    features to mitigate race condition:
-        open file using with statement
-        explicit close() in with statement
-        finally close()
-        json formatting required
-        postscript clipping prevents misread due to overwrite without erase
-        read and write to the text pipe with a single definition
-        growing delay between attempts prevents cpu leak
-    to view your live streaming database, navigate to the pipe folder in the terminal:
-        tail -F your_json_ipc_database.txt
-    :dependencies: os, traceback, json.loads, json.dumps
-    :warn: incessant read/write concurrency may damage older spinning platter drives
-    :warn: keeping a 3rd party file browser pointed to the pipe folder may consume RAM
+    JSON IPC, see qtradex.common.json_ipc
     :param str(doc): name of file to read or write
     :param str(text): json dumped list or dict to write; if empty string: then read
     :return: python list or dictionary if reading, else None
-    wtfpl2020 litepresence.com
-    """
-    # initialize variables
-    data = None
-    # file operation type for exception message
-    if text:
-        if append:
-            act = "appending"
-        else:
-            act = "writing"
-    else:
-        act = "reading"
-    # create a clipping tag for read and write operations
-    tag = ""
-    if not act == "appending":
-        tag = "<<< JSON IPC >>>"
-    # determine where we are in the file system; change directory to data folder
-    path = f"{PATH}/data"
-    # ensure we're writing json then add prescript and postscript for clipping
-    try:
-        if text:
-            # Only add tags if it's not a .json file
-            if doc.endswith(".json"):
-                text = json_dumps(json_loads(text))
-            else:
-                text = tag + json_dumps(json_loads(text)) + tag
-    except Exception as error:
-        print(text)
-        print(error)
-        raise ValueError
-    # move append operations to the comptroller folder and add new line
-    if append:
-        path += "/comptroller"
-        text = f"\n{text}"
-    # create the pipe subfolder
-    if initialize:
-        os.makedirs(path, exist_ok=True)
-        os.makedirs(f"{path}/comptroller", exist_ok=True)
-    if doc:
-        doc = f"{path}/{doc}"
-        # race read/write until satisfied
-        iteration = 0
-        while True:
-            # increment the delay between attempts exponentially
-            time.sleep(0.02 * iteration**2)
-            try:
-                if act == "appending":
-                    with open(doc, "a", encoding="utf-8") as handle:
-                        handle.write(text)
-                        handle.close()
-                        break
-                elif act == "writing":
-                    with open(doc, "w+", encoding="utf-8") as handle:
-                        handle.write(text)
-                        handle.close()
-                        break
-                elif act == "reading":
-                    with open(doc, "r", encoding="utf-8") as handle:
-                        # only accept legitimate json
-                        content = handle.read()
-                        if tag and tag in content:
-                            data = json_loads(content.split(tag)[1])
-                        else:
-                            data = json_loads(content)
-                        handle.close()
-                        break
-            except Exception:
-                if iteration == 1:
-                    if "json_ipc" in text:
-                        print("no json_ipc pipe found, initializing...")
-                    else:
-                        print(  # only if it happens more than once
-                            iteration,
-                            f"json_ipc failed while {act} to {doc} retrying...\n",
-                        )
-                elif iteration == 5:
-                    # maybe there is no pipe? auto initialize the pipe!
-                    json_ipc(initialize=True)
-                    print("json_ipc pipe initialized, retrying...\n")
-                elif iteration == 10:
-                    print("json_ipc unexplained failure\n", traceback.format_exc())
-                iteration += 1
-                continue
-            # deliberately double check that the file is closed
-            finally:
-                try:
-                    handle.close()
-                except Exception:
-                    pass
-    return data
+    """
+    return _json_ipc(doc, text or None, initialize, append)
 
 
 class NonceSafe:
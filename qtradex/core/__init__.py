@@ -1,8 +1,16 @@
-import qtradex.core.tune_manager
-from qtradex.core.auto_backtest import auto_backtest
-from qtradex.core.backtest import backtest
-from qtradex.core.base_bot import BaseBot
-from qtradex.core.dispatch import dispatch
-from qtradex.core.filltest import filltest
-from qtradex.core.live import live
-from qtradex.core.papertrade import papertrade
+from qtradex.common.lazy import lazy_exports
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "tune_manager": "qtradex.core.tune_manager",
+        "auto_backtest": "qtradex.core.auto_backtest:auto_backtest",
+        "backtest": "qtradex.core.backtest:backtest",
+        "BaseBot": "qtradex.core.base_bot:BaseBot",
+        "dispatch": "qtradex.core.dispatch:dispatch",
+        "filltest": "qtradex.core.filltest:filltest",
+        "live": "qtradex.core.live:live",
+        "papertrade": "qtradex.core.papertrade:papertrade",
+        "plan_warmup": "qtradex.core.warmup:plan_warmup",
+    },
+)
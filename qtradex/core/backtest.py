@@ -8,6 +8,7 @@ from qtradex.common.utilities import it, rotate, sigfig
 from qtradex.core.base_bot import Info
 from qtradex.core.quant import preprocess_states, slice_candles
 from qtradex.core.ui_utilities import logo
+from qtradex.indicators.cache_decorator import track_lookback
 from qtradex.private.signals import Buy, Hold, Sell, Thresholds
 from qtradex.private.wallet import PaperWallet
 
@@ -174,7 +175,6 @@ def backtest(
     end = data.end
     days = (end - begin) / 86400
     candle_size = data.candle_size
-    warmup = bot.autorange()
 
     orig_tune = bot.tune.copy()
 
@@ -182,6 +182,12 @@ def backtest(
     if range_periods:
         adjust_tuning_parameters(bot, candle_size)
 
+    # Trace the indicators' lookback so the first tick is the first valid one;
+    # autorange() stays a lower bound for indicators the trace cannot see
+    with track_lookback(data.values()) as lookback:
+        indicators = bot.indicators(data)
+    warmup = max(lookback.warmup, bot.autorange() or 0)
+
     now = begin + (candle_size * (warmup + 1))
     initial_data = slice_candles(now, data, candle_size, 1)
 
@@ -190,7 +196,6 @@ def backtest(
 
     indicator_states = []
     states = []
-    indicators = bot.indicators(data)
 
     # Ensure all indicators are of the same length
     minlen = min(map(len, indicators.values()))
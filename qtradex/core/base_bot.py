@@ -1,7 +1,5 @@
 from math import ceil, inf
 
-import matplotlib.pyplot as plt
-
 
 class BaseBot:
     def autorange(self):
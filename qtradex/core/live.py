@@ -5,12 +5,14 @@ from qtradex.common.utilities import it, trace
 from qtradex.core.backtest import backtest, trade
 from qtradex.core.base_bot import Info
 from qtradex.core.papertrade import print_trade
+from qtradex.core.warmup import plan_warmup
 from qtradex.plot.utilities import unix_to_stamp
 from qtradex.private.execution import Execution
 from qtradex.private.signals import Buy, Sell, Thresholds, Hold
 from qtradex.private.wallet import PaperWallet, Wallet
 from qtradex.public.data import Data
-from qtradex.public.utilities import fetch_composite_data
+from qtradex.public.utilities import (fetch_composite_data,
+                                      update_composite_data)
 
 # For dev/testing, place orders "wide" on the market;
 # selling price is *2 buying price is /2
@@ -68,8 +70,8 @@ def live(
     bot.info._set("start", now)
     
     # 1. Calcular quantos candles precisamos para aquecer os indicadores
-    # Prioridade: bot.warmup (definido pela estratégia) ou um default seguro (100)
-    warmup_candles = int(getattr(bot, 'warmup', 100)) + 5
+    # Derivado do lookback dos indicadores; bot.warmup (se definido) é o mínimo
+    warmup_candles = max(plan_warmup(bot), int(getattr(bot, 'warmup', 0))) + 5
     
     window = warmup_candles * tick_size
     data.begin = now - window
@@ -100,8 +102,6 @@ def live(
 
     # main tick loop
     tick = 0
-    # O buffer inicial define o tamanho da nossa janela de warmup constante em RAM
-    max_len = len(data["unix"])
     # CORREÇÃO: Inicializa com o candle ATUAL do relógio, não o último dos dados
     # Isso garante que o primeiro tick só dispare no PRÓXIMO fechamento
     last_candle_unix = (int(time.time()) // tick_size) * tick_size
@@ -116,11 +116,9 @@ def live(
         if current_candle_start > last_candle_unix:
             tick += 1
             
-            # 1. Buscar dados atualizados usando a janela completa de warmup (SEGURO)
+            # 1. Buscar só os candles novos; a janela de warmup fica num ring buffer
             try:
-                data.candle_size = data.base_size
-                data.update_candles(now - window, now)
-                data, raw_15m = fetch_composite_data(data, new_size=tick_size)
+                data, raw_15m = update_composite_data(data, tick_size, now)
                 last_candle_unix = current_candle_start
                 bot.info._set("live_trades", execution.fetch_my_trades())
                 bot.info._set("live_data", raw_15m)
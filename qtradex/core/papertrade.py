@@ -5,10 +5,12 @@ from matplotlib import pyplot as plt
 from qtradex.common.utilities import it
 from qtradex.core.backtest import backtest, trade
 from qtradex.core.base_bot import Info
+from qtradex.core.warmup import plan_warmup
 from qtradex.plot.utilities import unix_to_stamp
 from qtradex.private.signals import Thresholds, Hold, Buy, Sell
 from qtradex.private.wallet import PaperWallet
-from qtradex.public.utilities import fetch_composite_data
+from qtradex.public.utilities import (fetch_composite_data,
+                                      update_composite_data)
 
 
 def print_trade(data, initial_balances, new_balances, operation, now, last_trade_time):
@@ -96,8 +98,8 @@ def papertrade(bot, data, wallet=None, tick_size=60 * 15, tick_pause=60 * 5, **k
     bot.info._set("start", now)
     
     # 1. Calcular quantos candles precisamos para aquecer os indicadores
-    # Prioridade: bot.warmup (definido pela estratégia) ou um default seguro (100)
-    warmup_candles = int(getattr(bot, 'warmup', 100)) + 5
+    # Derivado do lookback dos indicadores; bot.warmup (se definido) é o mínimo
+    warmup_candles = max(plan_warmup(bot), int(getattr(bot, 'warmup', 0))) + 5
     
     window = warmup_candles * tick_size
     data.begin = now - window
@@ -129,8 +131,6 @@ def papertrade(bot, data, wallet=None, tick_size=60 * 15, tick_pause=60 * 5, **k
 
     # main tick loop
     tick = 0
-    # O buffer inicial define o tamanho da nossa janela de warmup constante em RAM
-    max_len = len(data["unix"])
     # CORREÇÃO: Inicializa com o candle ATUAL do relógio, não o último dos dados
     # Isso garante que o primeiro tick só dispare no PRÓXIMO fechamento
     last_candle_unix = (int(time.time()) // tick_size) * tick_size
@@ -144,11 +144,9 @@ def papertrade(bot, data, wallet=None, tick_size=60 * 15, tick_pause=60 * 5, **k
         if current_candle_start > last_candle_unix:
             tick += 1
             
-            # 1. Buscar dados atualizados usando a janela completa de warmup
+            # 1. Buscar só os candles novos; a janela de warmup fica num ring buffer
             try:
-                data.candle_size = data.base_size
-                data.update_candles(now - window, now)
-                data, raw_15m = fetch_composite_data(data, new_size=tick_size)
+                data, raw_15m = update_composite_data(data, tick_size, now)
                 last_candle_unix = current_candle_start
                 bot.info._set("live_data", raw_15m)
             except Exception as e:
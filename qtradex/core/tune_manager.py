@@ -286,6 +286,26 @@ def ast_to_hash(instance):
     return len(instance.__class__().tune)  # Use the length of the tune as a simple hash
 
 
+def source_hash(instance):
+    """
+    Generate a hash of the source code defining the bot.
+
+    The syntax tree of the bot's module is hashed, so editing comments or
+    formatting keeps the hash while changes to that module alter it.  Helpers the
+    bot imports from other modules are not part of the hash.
+
+    Parameters:
+    - instance: The bot instance.
+
+    Returns:
+    - A hex digest identifying the bot's code.
+    """
+    tree = ast.parse(read_file(inspect.getfile(type(instance))))
+    digest = hashlib.sha256(type(instance).__qualname__.encode())
+    digest.update(ast.dump(tree).encode())
+    return digest.hexdigest()
+
+
 def choose_tune(bot, kind="any"):
     """
     Allow the user to choose a tune from the available options.
@@ -0,0 +1,90 @@
+"""
+Derive the exact number of warmup candles a bot needs for its current tune.
+
+Every cached `ti`/`qi` indicator carries a `lookback` rule; running the bot's
+`indicators()` once on a synthetic probe while tracing those rules gives the
+warmup as a function of the tune alone, without touching the exchange.
+"""
+import time
+from math import ceil
+
+import numpy as np
+from qtradex.core.backtest import adjust_tuning_parameters
+from qtradex.indicators.cache_decorator import track_lookback
+from qtradex.public.data import Data
+
+# minimum number of candles in the probe series
+PROBE_DEPTH = 500
+
+
+def probe_data(depth, candle_size=86400):
+    """
+    Build a placeholder Data object holding a synthetic random walk.
+
+    Parameters:
+    - depth: The number of candles to synthesize.
+    - candle_size: The candle size in seconds.
+
+    Returns:
+    - A Data object with `depth` candles ending now.
+    """
+    rng = np.random.default_rng(0)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, depth)))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.01, depth)) * close
+    end = (int(time.time()) // candle_size) * candle_size
+    unix = end - candle_size * np.arange(depth)[::-1]
+
+    data = Data(
+        "synthetic",
+        "ASSET",
+        "CURRENCY",
+        begin=float(unix[0]),
+        end=float(unix[-1]),
+        candle_size=candle_size,
+        placeholder=True,
+    )
+    data.raw_candles = {
+        "unix": unix.astype(float),
+        "open": open_,
+        "high": np.maximum(open_, close) + spread,
+        "low": np.minimum(open_, close) - spread,
+        "close": close,
+        "volume": np.abs(rng.normal(1000, 100, depth)),
+    }
+    return data
+
+
+def plan_warmup(bot, candle_size=None, depth=None):
+    """
+    Trace the bot's indicators and return the candles they need to become valid.
+
+    Parameters:
+    - bot: The bot instance; its tune is restored afterwards.
+    - candle_size: Optional candle size; when given, `_period` tune values are
+      scaled to it exactly as `backtest(range_periods=True)` does.
+    - depth: Optional probe length, by default enough for the largest tune value.
+
+    Returns:
+    - The warmup in candles; never less than `bot.autorange()`, which covers
+      indicators that are not cached `ti`/`qi` ones.
+    """
+    orig_tune = bot.tune.copy()
+    try:
+        if candle_size is not None:
+            adjust_tuning_parameters(bot, candle_size)
+        if depth is None:
+            numeric = [
+                np.max(v)
+                for v in bot.tune.values()
+                if isinstance(v, (int, float, np.ndarray)) and not isinstance(v, bool)
+            ]
+            depth = max([PROBE_DEPTH] + [4 * ceil(i) for i in numeric if np.isfinite(i)])
+        data = probe_data(int(depth), candle_size or 86400)
+        with track_lookback(data.values()) as trace:
+            bot.indicators(data)
+        # as in backtest(), autorange() sees the tune scaled to the candle size
+        autorange = bot.autorange() or 0
+    finally:
+        bot.tune = orig_tune
+    return max(trace.warmup, autorange)
@@ -1,4 +1,13 @@
-import qtradex.indicators.fitness
-import qtradex.indicators.qi
-import qtradex.indicators.tulipy_wrapped as tulipy
-from qtradex.indicators.utilities import derivative, float_period, lag
+from qtradex.common.lazy import lazy_exports
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "fitness": "qtradex.indicators.fitness",
+        "qi": "qtradex.indicators.qi",
+        "tulipy": "qtradex.indicators.tulipy_wrapped",
+        "derivative": "qtradex.indicators.utilities:derivative",
+        "float_period": "qtradex.indicators.utilities:float_period",
+        "lag": "qtradex.indicators.utilities:lag",
+    },
+)
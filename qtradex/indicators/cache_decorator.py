@@ -1,5 +1,9 @@
 import hashlib
+import inspect
+import math
+import re
 import warnings
+from contextlib import contextmanager
 from functools import wraps
 
 import cachetools
@@ -7,6 +11,12 @@ import numpy as np
 
 from .utilities import float_period as cython_float_period
 
+# argument names that are treated as lookback periods by the default rule
+PERIOD_ARGS = re.compile(r"(period|window|length|span|lookback|^time\d|^fast$|^slow$|^auto_)")
+
+# active lookback traces, see `track_lookback`
+TRACES = []
+
 
 def make_hashable(*args, **kwargs):
     # Convert args to a hashable format
@@ -32,6 +42,43 @@ def make_hashable(*args, **kwargs):
     return tuple(hashable_args), frozenset(hashable_kwargs.items())
 
 
+def compact(args, kwargs):
+    """
+    Whether any array argument is in the compact float32 dtype.
+    """
+    return any(
+        isinstance(i, np.ndarray) and i.dtype == np.float32
+        for i in list(args) + list(kwargs.values())
+    )
+
+
+def widen(values):
+    """
+    Upcast float32 arrays in an args tuple or kwargs dict to float64.
+    """
+    if isinstance(values, dict):
+        return {k: widen((v,))[0] for k, v in values.items()}
+    return tuple(
+        i.astype(np.float64)
+        if isinstance(i, np.ndarray) and i.dtype == np.float32
+        else i
+        for i in values
+    )
+
+
+def narrow(result):
+    """
+    Downcast float64 arrays in an indicator result to float32.
+    """
+    if isinstance(result, np.ndarray):
+        return result.astype(np.float32) if result.dtype == np.float64 else result
+    if isinstance(result, (tuple, list)):
+        return type(result)(narrow(i) for i in result)
+    if isinstance(result, dict):
+        return {k: narrow(v) for k, v in result.items()}
+    return result
+
+
 def cache(func):
     # Create a cache with a specified size
     cache = cachetools.LRUCache(maxsize=256)
@@ -44,18 +91,29 @@ def cache(func):
 
         # Check if the result is in the cache
         if key in cache:
-            return cache[key]
+            result = cache[key]
+        elif compact(args, kwargs):
+            # Accumulate compact (float32) inputs in float64, return float32
+            result = narrow(func(*widen(args), **widen(kwargs)))
+            cache[key] = result
+        else:
+            # Call the function and store the result in the cache
+            result = func(*args, **kwargs)
+            cache[key] = result
 
-        # Call the function and store the result in the cache
-        result = func(*args, **kwargs)
-        cache[key] = result
+        # Report the call to any active warmup trace
+        for trace in TRACES:
+            trace.record(wrapper, args, kwargs, result)
         return result
 
+    if not hasattr(wrapper, "lookback"):
+        wrapper.lookback = make_lookback(func)
     return wrapper
 
 
 def float_period(*periods):
     def decorator(func):
+        @wraps(func)
         def wrapper(*args, **kwargs):
             with warnings.catch_warnings(record=True) as w:
                 warnings.simplefilter("always")  # Catch all warnings
@@ -73,3 +131,124 @@ def float_period(*periods):
             return result
         return wrapper
     return decorator
+
+
+def make_lookback(func, rule=None):
+    """
+    Build the `lookback` attribute of an indicator.
+
+    The returned callable takes the same arguments as the indicator and returns
+    the number of leading candles whose output is not yet valid.  Period-like
+    arguments (see PERIOD_ARGS) are rounded up before `rule` sees them, since
+    `float_period` blends the floor and the ceiling of fractional periods.
+
+    Parameters:
+    - func: The indicator function.
+    - rule: Optional callable receiving the bound arguments as keywords; when
+      omitted the largest period-like argument minus one is used.
+
+    Returns:
+    - A callable returning the lookback as a non-negative integer.
+    """
+    signature = inspect.signature(func)
+
+    def lookback(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        params = {}
+        for name, value in bound.arguments.items():
+            if (
+                PERIOD_ARGS.search(name)
+                and isinstance(value, (int, float, np.number))
+                and not isinstance(value, bool)
+            ):
+                value = int(math.ceil(value))
+            params[name] = value
+        if rule is not None:
+            return max(int(math.ceil(rule(**params))), 0)
+        periods = [
+            v
+            for k, v in params.items()
+            if PERIOD_ARGS.search(k) and isinstance(v, int)
+        ]
+        return max(max(periods) - 1, 0) if periods else 0
+
+    return lookback
+
+
+def lookback(rule):
+    """
+    Declare how many leading candles an indicator needs before it is valid.
+
+    Apply between `@cache` and `@float_period`:
+
+        @cache
+        @lookback(lambda period, **_: 2 * (period - 1))
+        @float_period(1,)
+        def dema(data, period):
+            ...
+
+    Parameters:
+    - rule: Callable receiving the indicator's arguments as keywords, with
+      period-like arguments rounded up to integers.
+    """
+    def decorator(func):
+        func.lookback = make_lookback(func, rule)
+        return func
+    return decorator
+
+
+class LookbackTrace:
+    """
+    Record of the indicator calls made while `track_lookback` is active.
+
+    Lookbacks are chained through the arrays passed between indicators, so
+    `sma(rsi(close, 14), 10)` needs 13 + 9 candles.  Arrays that are neither
+    source data nor indicator outputs (i.e. numpy arithmetic on indicators)
+    conservatively inherit the largest lookback seen so far.
+    """
+
+    def __init__(self, sources=()):
+        self.sources = [i for i in sources if isinstance(i, np.ndarray)]
+        self.source_ids = {id(i) for i in self.sources}
+        self.lineage = {}
+        self.warmup = 0
+        self.calls = 0
+
+    def inherited(self, value):
+        if id(value) in self.lineage:
+            return self.lineage[id(value)][1]
+        if id(value) in self.source_ids:
+            return 0
+        return self.warmup
+
+    def record(self, func, args, kwargs, result):
+        inputs = [i for i in list(args) + list(kwargs.values()) if isinstance(i, np.ndarray)]
+        total = max([self.inherited(i) for i in inputs], default=0)
+        total += func.lookback(*args, **kwargs)
+        outputs = result if isinstance(result, (tuple, list)) else (result,)
+        for output in outputs:
+            if isinstance(output, np.ndarray):
+                # keep a reference so the id is not recycled while tracing
+                self.lineage[id(output)] = (output, total)
+        self.warmup = max(self.warmup, total)
+        self.calls += 1
+
+
+@contextmanager
+def track_lookback(sources=()):
+    """
+    Trace the warmup required by every cached indicator called in this context.
+
+    Parameters:
+    - sources: The raw data arrays (i.e. `data.values()`) the indicators start from.
+
+    Yields:
+    - A LookbackTrace; its `warmup` attribute is the number of candles to skip.
+    """
+    trace = LookbackTrace(sources)
+    TRACES.append(trace)
+    try:
+        yield trace
+    finally:
+        TRACES.remove(trace)
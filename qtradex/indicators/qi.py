@@ -15,9 +15,10 @@ import qtradex
 from numpy import ndarray
 from qtradex.common.utilities import truncate
 from qtradex.indicators import tulipy_wrapped as ti
-from qtradex.indicators.cache_decorator import cache, float_period
+from qtradex.indicators.cache_decorator import cache, float_period, lookback
 
 cnp = np
+# accumulation dtype; compact (float32) inputs are widened to it by `cache`
 DATA_TYPE = np.float64
 MA_TYPES = {
     1: ti.dema,
@@ -37,6 +38,13 @@ MA_TYPES = {
 Array = npt.NDArray[DATA_TYPE]
 
 
+def ma_lookback(ma_type, period):
+    """
+    Lookback of the moving average selected by `ma_type` (see MA_TYPES).
+    """
+    return MA_TYPES[ma_type].lookback(None, period)
+
+
 def heikin_ashi(
     hlocv: Dict[str, npt.NDArray[DATA_TYPE]]
 ) -> Dict[str, npt.NDArray[DATA_TYPE]]:
@@ -153,6 +161,8 @@ def ichimoku(
     return (tenkan_sen, kijun_sen, senkou_span_a, senkou_span_b, chikou_span)
 
 
+@cache
+@lookback(lambda window, **_: window)
 def vortex(
     high: npt.NDArray[np.float64],
     low: npt.NDArray[np.float64],
@@ -203,6 +213,7 @@ def vortex(
 
 
 @cache
+@lookback(lambda roc1_period, roc2_period, roc3_period, roc4_period, kst_smoothing, **_: max(roc1_period, roc2_period, roc3_period, roc4_period) + kst_smoothing - 1)
 @float_period(1, 2, 3, 4, 5)
 def kst(
     close: cnp.ndarray,
@@ -466,6 +477,7 @@ def aema(
 
 
 @cache
+@lookback(lambda short_period, long_period, signal_period, ma_type, **_: ma_lookback(ma_type, max(short_period, long_period)) + ma_lookback(ma_type, signal_period))
 @float_period(1, 2, 3)
 def typed_macd(
     close: npt.NDArray[DATA_TYPE],
@@ -525,6 +537,7 @@ def typed_macd(
 
 
 @cache
+@lookback(lambda ma_period, ma_type, std_period, **_: max(ma_lookback(ma_type, ma_period), std_period - 1))
 @float_period(1, 3)
 def typed_bbands(
     close: npt.NDArray[DATA_TYPE],
@@ -574,6 +587,7 @@ def typed_bbands(
 
 
 @cache
+@lookback(lambda long_period, **_: long_period)
 @float_period(1, 2)
 def tsi(
     close: cnp.ndarray, long_period: int, short_period: int
@@ -628,6 +642,7 @@ def tsi(
 
 
 @cache
+@lookback(lambda k_period, d_period, **_: k_period + d_period - 2)
 @float_period(3, 4)
 def smi(
     close: npt.NDArray[DATA_TYPE],
@@ -678,6 +693,7 @@ def smi(
 
 
 @cache
+@lookback(lambda ma_period, ma_type, **_: ma_lookback(ma_type, ma_period))
 @float_period(3)
 def eri(
     high: cnp.ndarray,
@@ -732,6 +748,7 @@ def eri(
 
 
 @cache
+@lookback(lambda period, **_: period)
 @float_period(3)
 def supertrend(
     high: cnp.ndarray[DATA_TYPE],
@@ -784,6 +801,7 @@ def supertrend(
 
 
 @cache
+@lookback(lambda length, **_: length)
 @float_period(1)
 def arsi(
     close: npt.NDArray[DATA_TYPE], length: int = 14
@@ -819,6 +837,7 @@ def arsi(
 
 
 @cache
+@lookback(lambda atr_period, ma_period, ma_type, **_: max(atr_period, ma_lookback(ma_type, ma_period)))
 @float_period(3, 4)
 def keltner(
     high: npt.NDArray[DATA_TYPE],
@@ -1183,6 +1202,7 @@ def holt_winters_des(
 
 
 @cache
+@lookback(lambda window, **_: 2 * (window - 1))
 @float_period(1)
 def ulcer_index(
     close: npt.NDArray[np.float64],
@@ -1221,6 +1241,7 @@ def ulcer_index(
 
 
 @cache
+@lookback(lambda window, **_: 3 * (window - 1) + 1)
 @float_period(1)
 def trix(
     close: npt.NDArray[np.float64],
@@ -1257,6 +1278,7 @@ def trix(
 
 
 @cache
+@lookback(lambda auto_max, auto_avg, **_: auto_max + auto_avg)
 @float_period(1, 2, 3)
 def earsi(
     close: npt.NDArray[DATA_TYPE],
@@ -1386,6 +1408,7 @@ def earsi(
     return (np.array(adaptive_rsi),)
 
 
+@cache
 def vhf(
     data: npt.NDArray[np.float64],
     period: int,
@@ -6,10 +6,12 @@ It is now backed by `pandas_ta` and `numpy` to ensure 100% Windows compatibility
 
 RECOMMENDED: Use `qx.ti` (Technical Indicators) gateway for all new strategies.
 """
+import builtins
+
 import numpy as np
 import pandas as pd
 import pandas_ta as ta
-from qtradex.indicators.cache_decorator import cache, float_period
+from qtradex.indicators.cache_decorator import cache, float_period, lookback
 
 # -----------------------------------------------------------------------------
 # Math / Numpy Wrappers
@@ -141,26 +143,31 @@ def wma(data, period):
     return ta.wma(pd.Series(data), length=int(period)).to_numpy()
 
 @cache
+@lookback(lambda period, **_: 2 * (period - 1))
 @float_period(1,)
 def dema(data, period):
     return ta.dema(pd.Series(data), length=int(period)).to_numpy()
 
 @cache
+@lookback(lambda period, **_: 3 * (period - 1))
 @float_period(1,)
 def tema(data, period):
     return ta.tema(pd.Series(data), length=int(period)).to_numpy()
 
 @cache
+@lookback(lambda period, **_: period + int(period ** 0.5) - 2)
 @float_period(1,)
 def hma(data, period):
     return ta.hma(pd.Series(data), length=int(period)).to_numpy()
 
 @cache
+@lookback(lambda period, **_: period)
 @float_period(1,)
 def kama(data, period):
     return ta.kama(pd.Series(data), length=int(period)).to_numpy()
 
 @cache
+@lookback(lambda period, **_: period - 1 + (period - 1) // 2)
 @float_period(1,)
 def zlema(data, period):
     return ta.zlma(pd.Series(data), length=int(period)).to_numpy()
@@ -193,6 +200,7 @@ def linreg(data, period):
     return ta.linreg(pd.Series(data), length=int(period)).to_numpy()
 
 @cache
+@lookback(lambda period, **_: period - 1)
 @float_period(1,)
 def vwma(close, volume, period):
     return ta.vwma(pd.Series(close), pd.Series(volume), length=int(period)).to_numpy()
@@ -205,6 +213,7 @@ def adosc(high, low, close, volume, fast_period, slow_period):
     return df.to_numpy()
 
 @cache
+@lookback(lambda period, **_: 3 * period - 2)
 @float_period(3,)
 def adxr(high, low, close, period):
     adx_val = ta.adx(pd.Series(high), pd.Series(low), pd.Series(close), length=int(period))
@@ -220,6 +229,7 @@ def ao(high, low):
     return df.to_numpy()
 
 @cache
+@lookback(lambda period, **_: period)
 @float_period(1,)
 def decay(data, period):
     d = np.array(data, dtype=float)
@@ -232,6 +242,7 @@ def decay(data, period):
     return res
 
 @cache
+@lookback(lambda period, **_: period)
 @float_period(1,)
 def edecay(data, period):
     d = np.array(data, dtype=float)
@@ -244,6 +255,7 @@ def edecay(data, period):
     return res
 
 @cache
+@lookback(lambda period, **_: period)
 @float_period(3,)
 def di(high, low, close, period):
     df = ta.adx(pd.Series(high), pd.Series(low), pd.Series(close), length=int(period))
@@ -251,6 +263,7 @@ def di(high, low, close, period):
     return df.iloc[:, 1].to_numpy(), df.iloc[:, 2].to_numpy()
 
 @cache
+@lookback(lambda period, **_: period)
 @float_period(2,)
 def dm(high, low, period):
     df = ta.adx(pd.Series(high), pd.Series(low), pd.Series(pd.Series(high)), length=int(period))
@@ -258,6 +271,7 @@ def dm(high, low, period):
     return df.iloc[:, 1].to_numpy(), df.iloc[:, 2].to_numpy()
 
 @cache
+@lookback(lambda period, **_: period)
 @float_period(3,)
 def dx(high, low, close, period):
     df = ta.adx(pd.Series(high), pd.Series(low), pd.Series(close), length=int(period))
@@ -300,6 +314,7 @@ def qstick(open, close, period):
     return qs.fillna(0).to_numpy()
 
 @cache
+@lookback(lambda period, **_: period)
 @float_period(1,)
 def vhf(close, period):
     p = int(period)
@@ -312,6 +327,7 @@ def vhf(close, period):
     return vhf_val.fillna(0).to_numpy()
 
 @cache
+@lookback(lambda period, smooth_period, **_: period + smooth_period)
 @float_period(1, 2)
 def vidya(close, period, smooth_period):
     c = np.array(close)
@@ -336,11 +352,13 @@ def vidya(close, period, smooth_period):
 # Oscillators / Momentum
 # -----------------------------------------------------------------------------
 @cache
+@lookback(lambda period, **_: period)
 @float_period(1,)
 def rsi(data, period):
     return ta.rsi(pd.Series(data), length=int(period)).to_numpy()
 
 @cache
+@lookback(lambda fast_period, slow_period, signal_period, **_: builtins.max(fast_period, slow_period) + signal_period - 2)
 @float_period(1, 2, 3)
 def macd(data, fast_period, slow_period, signal_period):
     # Pandas-TA returns DF: [MACD, HIST, SIGNAL]
@@ -351,6 +369,7 @@ def macd(data, fast_period, slow_period, signal_period):
     return df[cols[0]].to_numpy(), df[cols[2]].to_numpy(), df[cols[1]].to_numpy()
 
 @cache
+@lookback(lambda k_period, k_slow_period, d_period, **_: k_period + k_slow_period + d_period - 3)
 @float_period(3, 4, 5)
 def stoch(high, low, close, k_period, k_slow_period, d_period):
     # Pandas-TA: stoch(high, low, close, k=..., d=..., smooth_k=...)
@@ -360,11 +379,13 @@ def stoch(high, low, close, k_period, k_slow_period, d_period):
     return df[cols[0]].to_numpy(), df[cols[1]].to_numpy()
 
 @cache
+@lookback(lambda period, **_: period)
 @float_period(1,)
 def roc(data, period):
     return ta.roc(pd.Series(data), length=int(period)).to_numpy()
 
 @cache
+@lookback(lambda period, **_: period)
 @float_period(1,)
 def mom(data, period):
     return ta.mom(pd.Series(data), length=int(period)).to_numpy()
@@ -375,6 +396,7 @@ def cci(high, low, close, period):
     return ta.cci(pd.Series(high), pd.Series(low), pd.Series(close), length=int(period)).to_numpy()
 
 @cache
+@lookback(lambda period, **_: 2 * (period - 1))
 @float_period(3,)
 def adx(high, low, close, period):
      # returns: adx
@@ -392,6 +414,7 @@ def bbands(data, period, stddev):
     return df.iloc[:, 0].to_numpy(), df.iloc[:, 1].to_numpy(), df.iloc[:, 2].to_numpy()
 
 @cache
+@lookback(lambda **_: 0)
 @float_period(1,)
 def bop(open, high, low, close):
     return ta.bop(pd.Series(open), pd.Series(high), pd.Series(low), pd.Series(close)).to_numpy()
@@ -432,6 +455,7 @@ def fosc(close, period):
     return fosc_val.fillna(0).to_numpy()
 
 @cache
+@lookback(lambda period, **_: period)
 @float_period(1,)
 def rocr(data, period):
     s = pd.Series(data)
@@ -439,6 +463,8 @@ def rocr(data, period):
     return res.fillna(0).to_numpy()
 
 @cache
+# rsi_length 14, then `period` for the stochastic and k=3 smoothing
+@lookback(lambda period, **_: 14 + period + 1)
 @float_period(1,)
 def stochrsi(data, period):
     df = ta.stochrsi(pd.Series(data), length=int(period))
@@ -451,6 +477,7 @@ def ultosc(high, low, close, time1, time2, time3):
     return ta.uo(pd.Series(high), pd.Series(low), pd.Series(close), p1=int(time1), p2=int(time2), p3=int(time3)).to_numpy()
 
 @cache
+@lookback(lambda period, **_: 3 * (period - 1) + 1)
 @float_period(1,)
 def trix(data, period):
     df = ta.trix(pd.Series(data), length=int(period))
@@ -461,6 +488,7 @@ def trix(data, period):
 # Volatility
 # -----------------------------------------------------------------------------
 @cache
+@lookback(lambda period, **_: period)
 @float_period(3,)
 def atr(high, low, close, period):
     result = ta.atr(pd.Series(high), pd.Series(low), pd.Series(close), length=int(period))
@@ -469,6 +497,7 @@ def atr(high, low, close, period):
     return result.to_numpy()
 
 @cache
+@lookback(lambda period, **_: period)
 @float_period(3,)
 def natr(high, low, close, period):
     result = ta.natr(pd.Series(high), pd.Series(low), pd.Series(close), length=int(period))
@@ -490,6 +519,7 @@ def stderr(data, period):
     return res.fillna(0).to_numpy()
 
 @cache
+@lookback(lambda period, **_: 2 * period - 1)
 @float_period(2,)
 def cvi(high, low, period):
     hl = pd.Series(high) - pd.Series(low)
@@ -499,6 +529,7 @@ def cvi(high, low, period):
     return cvi_val.fillna(0).to_numpy()
 
 @cache
+@lookback(lambda **_: 40)
 @float_period(2,)
 def mass(high, low, period):
     df = ta.massi(pd.Series(high), pd.Series(low), length=int(period))
@@ -506,6 +537,7 @@ def mass(high, low, period):
     return df.to_numpy()
 
 @cache
+@lookback(lambda **_: 1)
 def tr(high, low, close):
     df = ta.true_range(pd.Series(high), pd.Series(low), pd.Series(close))
     if df is None: return np.zeros_like(close)
@@ -534,6 +566,7 @@ def ad(high, low, close, volume):
     return ta.ad(pd.Series(high), pd.Series(low), pd.Series(close), pd.Series(volume)).to_numpy()
 
 @cache
+@lookback(lambda period, **_: period)
 @float_period(4,)
 def mfi(high, low, close, volume, period):
     res = ta.mfi(pd.Series(high), pd.Series(low), pd.Series(close), pd.Series(volume), length=int(period))
@@ -541,12 +574,14 @@ def mfi(high, low, close, volume, period):
     return res.to_numpy()
 
 @cache
+@lookback(lambda **_: 14)
 def emv(high, low, volume):
     res = ta.eom(pd.Series(high), pd.Series(low), pd.Series(high), pd.Series(volume), length=14)
     if res is None: return np.zeros_like(high)
     return res.to_numpy()
 
 @cache
+@lookback(lambda fast, slow, **_: builtins.max(fast, slow) - 1)
 @float_period(4, 5)
 def kvo(high, low, close, volume, fast, slow):
     df = ta.kvo(pd.Series(high), pd.Series(low), pd.Series(close), pd.Series(volume), fast=int(fast), slow=int(slow))
@@ -575,6 +610,7 @@ def vosc(volume, fast, slow):
     return res.fillna(0).to_numpy()
 
 @cache
+@lookback(lambda **_: 1)
 def wad(high, low, close):
     h = np.array(high)
     l = np.array(low)
@@ -596,12 +632,14 @@ def wad(high, low, close):
 # Other / Misc
 # -----------------------------------------------------------------------------
 @cache
+@lookback(lambda **_: 1)
 def psar(high, low, accel_step, accel_max):
     df = ta.psar(pd.Series(high), pd.Series(low), af=float(accel_step), max_af=float(accel_max))
     res = df.iloc[:, 0].fillna(0) + df.iloc[:, 1].fillna(0)
     return res.to_numpy()
 
 @cache
+@lookback(lambda period, **_: period)
 @float_period(2,)
 def aroon(high, low, period):
     df = ta.aroon(pd.Series(high), pd.Series(low), length=int(period))
@@ -609,11 +647,13 @@ def aroon(high, low, period):
     return df.iloc[:, 0].to_numpy(), df.iloc[:, 1].to_numpy()
 
 @cache
+@lookback(lambda period, **_: period)
 @float_period(2,)
 def aroonosc(high, low, period):
     return ta.aroonosc(pd.Series(high), pd.Series(low), length=int(period)).to_numpy()
 
 @cache
+@lookback(lambda **_: 1)
 def crossany(a, b):
     s1 = pd.Series(a)
     s2 = pd.Series(b)
@@ -621,6 +661,7 @@ def crossany(a, b):
     return cross.astype(int).to_numpy()
 
 @cache
+@lookback(lambda **_: 1)
 def crossover(a, b):
     s1 = pd.Series(a)
     s2 = pd.Series(b)
@@ -628,6 +669,7 @@ def crossover(a, b):
     return cross.astype(int).to_numpy()
 
 @cache
+@lookback(lambda period, **_: period)
 @float_period(1,)
 def lag(data, period):
     return pd.Series(data).shift(int(period)).fillna(0).to_numpy()
@@ -0,0 +1,95 @@
+import inspect
+import unittest
+
+import numpy as np
+from qtradex.indicators import tulipy_wrapped
+from qtradex.indicators.cache_decorator import PERIOD_ARGS
+
+# arguments that are not price arrays, by name; other period-like ones get PERIOD
+ARGUMENTS = {
+    "fast_period": 12,
+    "slow_period": 26,
+    "signal_period": 9,
+    "k_period": 14,
+    "k_slow_period": 3,
+    "d_period": 3,
+    "smooth_period": 5,
+    "fast": 34,
+    "slow": 55,
+    "accel_step": 0.02,
+    "accel_max": 0.2,
+}
+PERIOD = 14
+
+
+def leading_nans(values):
+    """
+    The number of NaNs before the first valid value of an indicator output.
+    """
+    invalid = np.isnan(np.asarray(values, dtype=float))
+    return int(np.argmin(invalid)) if not invalid.all() else len(invalid)
+
+
+def tagged():
+    """
+    The cached indicators declaring their lookback with `@lookback`.
+    """
+    return {
+        name: func
+        for name, func in vars(tulipy_wrapped).items()
+        if callable(func)
+        and getattr(func, "__module__", None) == tulipy_wrapped.__name__
+        and hasattr(getattr(func, "__wrapped__", None), "lookback")
+    }
+
+
+class TestLookback(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 400)))
+        spread = np.abs(rng.normal(0, 0.5, 400))
+        self.arrays = {
+            "open": np.roll(close, 1),
+            "high": close + spread,
+            "low": close - spread,
+            "close": close,
+            "volume": np.abs(rng.normal(1000, 100, 400)),
+        }
+
+    def arguments(self, func):
+        kwargs = {}
+        for name in inspect.signature(func).parameters:
+            if name in ARGUMENTS:
+                kwargs[name] = ARGUMENTS[name]
+            elif name in self.arrays:
+                kwargs[name] = self.arrays[name]
+            elif PERIOD_ARGS.search(name):
+                kwargs[name] = PERIOD
+            else:
+                # data, a, b, ...
+                kwargs[name] = self.arrays["close"]
+        return kwargs
+
+    def test_lookback_covers_leading_nans(self):
+        for name, func in tagged().items():
+            with self.subTest(indicator=name):
+                kwargs = self.arguments(func)
+                result = func(**kwargs)
+                outputs = result if isinstance(result, (tuple, list)) else (result,)
+                nans = max(leading_nans(output) for output in outputs)
+                self.assertGreaterEqual(func.lookback(**kwargs), nans)
+
+    def test_rsi_lookback(self):
+        close = self.arrays["close"]
+        result = tulipy_wrapped.rsi(close, PERIOD)
+        self.assertEqual(tulipy_wrapped.rsi.lookback(close, PERIOD), leading_nans(result))
+
+    def test_stochrsi_lookback(self):
+        close = self.arrays["close"]
+        result = tulipy_wrapped.stochrsi(close, PERIOD)
+        self.assertEqual(tulipy_wrapped.stochrsi.lookback(close, PERIOD), leading_nans(result))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,18 @@
-from qtradex.optimizers.ipse import IPSE, IPSEoptions
-from qtradex.optimizers.lsga import LSGA, LSGAoptions
-from qtradex.optimizers.mouse_wheel_optimizer import MouseWheelTuner
-from qtradex.optimizers.qpso import QPSO, QPSOoptions
-from qtradex.optimizers.aion import AION, AIONoptions
+from qtradex.common.lazy import lazy_exports
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "IPSE": "qtradex.optimizers.ipse:IPSE",
+        "IPSEoptions": "qtradex.optimizers.ipse:IPSEoptions",
+        "LSGA": "qtradex.optimizers.lsga:LSGA",
+        "LSGAoptions": "qtradex.optimizers.lsga:LSGAoptions",
+        "MouseWheelTuner": "qtradex.optimizers.mouse_wheel_optimizer:MouseWheelTuner",
+        "QPSO": "qtradex.optimizers.qpso:QPSO",
+        "QPSOoptions": "qtradex.optimizers.qpso:QPSOoptions",
+        "AION": "qtradex.optimizers.aion:AION",
+        "AIONoptions": "qtradex.optimizers.aion:AIONoptions",
+        "Evaluator": "qtradex.optimizers.evaluator:Evaluator",
+        "Fidelity": "qtradex.optimizers.fidelity:Fidelity",
+    },
+)
@@ -22,7 +22,8 @@
 import json
 import math
 import time
-from copy import deepcopy
+from collections import OrderedDict, deque
+from copy import copy, deepcopy
 from random import choice, randint, random, sample
 
 import matplotlib.pyplot as plt
@@ -31,20 +32,162 @@ import numpy as np
 from qtradex.common.utilities import it, print_table
 from qtradex.core import backtest
 from qtradex.core.base_bot import Info
-from qtradex.optimizers.utilities import bound_neurons, end_optimization, plot_scores
+from qtradex.optimizers.eval_cache import open_cache
+from qtradex.optimizers.evaluator import backtest_bots, open_evaluator
+from qtradex.optimizers.utilities import (bound_neurons, end_optimization,
+                                          plot_scores, seed_optimizer)
 
 
 # ══════════════════════════════════════════════════════════════════════════════
 # SHARED STATE - Communication hub between agents
 # ══════════════════════════════════════════════════════════════════════════════
 
+class BinnedStats:
+    """
+    Running score aggregates per parameter, binned over its clamp range.
+    
+    Keeps the last `memory` (bin, score) pairs of each parameter together with
+    each bin's count, sum and exponentially decayed mean, so the LEARNER adds an
+    evaluation in O(1) (the entry leaving the window is subtracted again) and the
+    FILTER reads a bin's mean in O(1) instead of re-binning the whole history.
+    With `alpha` (the weight of each new score) the decayed mean is the one read,
+    so recent scores count more; with 0 it is the plain mean of the window.
+    """
+    __slots__ = ('clamps', 'bins', 'memory', 'alpha', 'window', 'count', 'total', 'decayed')
+    
+    def __init__(self, clamps, bins=4, memory=50, alpha=0.2):
+        self.clamps = clamps
+        self.bins = bins
+        self.memory = memory
+        self.alpha = alpha
+        self.window = {}    # {param: deque of (bin, score)}
+        self.count = {}     # {param: [evaluations per bin]}
+        self.total = {}     # {param: [sum of scores per bin]}
+        self.decayed = {}   # {param: [decayed mean per bin, None while empty]}
+    
+    def bin(self, param, value):
+        """Bin of `value` in the clamp range of `param`, None if it has none."""
+        low, high = self.clamps[param][0], self.clamps[param][2]
+        rng = high - low
+        if rng <= 0:
+            return None
+        try:
+            return min(self.bins - 1, max(0, int((float(value) - low) / rng * self.bins)))
+        except (ValueError, TypeError):
+            return None
+    
+    def add(self, param, value, score):
+        """LEARNER: records the score of one evaluated value."""
+        if param not in self.clamps:
+            return
+        if param not in self.window:
+            self.window[param] = deque()
+            self.count[param] = [0] * self.bins
+            self.total[param] = [0.0] * self.bins
+            self.decayed[param] = [None] * self.bins
+        idx = self.bin(param, value)
+        self.window[param].append((idx, score))
+        if idx is not None:
+            self.count[param][idx] += 1
+            self.total[param][idx] += score
+            mean = self.decayed[param][idx]
+            self.decayed[param][idx] = score if mean is None else mean + self.alpha * (score - mean)
+        if len(self.window[param]) > self.memory:
+            self._drop(param)
+    
+    def _drop(self, param):
+        """Forgets the oldest evaluation of `param`."""
+        idx, score = self.window[param].popleft()
+        if idx is not None:
+            self.count[param][idx] -= 1
+            self.total[param][idx] -= score
+            if not self.count[param][idx]:
+                self.total[param][idx] = 0.0  # no rounding residue in empty bins
+                self.decayed[param][idx] = None
+    
+    def decay(self, keep=0.5):
+        """Soft memory decay: forgets the oldest part of every window."""
+        for param, window in self.window.items():
+            if len(window) > 5:
+                for _ in range(int(len(window) * (1 - keep))):
+                    self._drop(param)
+    
+    def size(self, param):
+        return len(self.window.get(param, ()))
+    
+    def mean(self, param, idx, minimum=3):
+        """Mean score of a bin, None with fewer than `minimum` evaluations."""
+        count = self.count[param][idx]
+        if count < minimum:
+            return None
+        if self.alpha:
+            return self.decayed[param][idx]
+        return self.total[param][idx] / count
+
+
+class Surrogate:
+    """
+    Online k-nearest-neighbour regressor of tune -> score (FILTER pre-screen).
+    
+    Tunes become vectors of their parameters scaled to the clamp ranges.  The
+    last `memory` evaluations live in a ring buffer, and a prediction is the
+    inverse-distance weighted score of the `k` nearest, computed for a whole
+    batch of candidates at once.
+    """
+    __slots__ = ('params', 'low', 'rng', 'k', 'memory', 'points', 'scores', 'size', 'head')
+    
+    def __init__(self, clamps, params, k=5, memory=2000):
+        self.params = [p for p in params if p in clamps]
+        self.low = np.array([float(clamps[p][0]) for p in self.params])
+        rng = np.array([float(clamps[p][2]) - float(clamps[p][0]) for p in self.params])
+        self.rng = np.where(rng > 0, rng, 1.0)
+        self.k = k
+        self.memory = memory
+        self.points = np.zeros((memory, len(self.params)))
+        self.scores = np.zeros(memory)
+        self.size = 0
+        self.head = 0
+    
+    def features(self, tune):
+        """Scaled parameter vector; values that are not scalars sit mid-range."""
+        row = np.full(len(self.params), 0.5)
+        for i, p in enumerate(self.params):
+            try:
+                row[i] = (float(tune[p]) - self.low[i]) / self.rng[i]
+            except (KeyError, ValueError, TypeError):
+                continue
+        return row
+    
+    def add(self, tune, score):
+        """LEARNER: trains on one evaluated tune."""
+        if not math.isfinite(score):
+            return
+        self.points[self.head] = self.features(tune)
+        self.scores[self.head] = score
+        self.head = (self.head + 1) % self.memory
+        self.size = min(self.size + 1, self.memory)
+    
+    def predict(self, tunes):
+        """Predicted scores of a list of tunes."""
+        rows = np.array([self.features(t) for t in tunes])
+        points = self.points[:self.size]
+        # squared distances without a (tunes x points x params) intermediate
+        dist = ((rows ** 2).sum(1)[:, None] + (points ** 2).sum(1)[None, :]
+                - 2 * rows @ points.T)
+        k = min(self.k, self.size)
+        nearest = np.argpartition(dist, k - 1, axis=1)[:, :k]
+        weights = 1.0 / (np.sqrt(np.maximum(np.take_along_axis(dist, nearest, 1), 0)) + 1e-9)
+        return (weights * self.scores[nearest]).sum(1) / weights.sum(1)
+
+
 class OptState:
     """Centralized state. All agents read/write here."""
     # AION v2025.16: Added 'promising_regions' for guided mutations
     __slots__ = ('iteration', 'improvements', 'stagnation', 'skips', 'evaluated',
-                 'cache', 'gradients', 'elite', 'param_hist', 'synapses', 
+                 'cache', 'gradients', 'elite', 'param_hist', 'pair_hist', 'synapses', 
                  'neuron_impacts', 'recent_impr', 'temperature', 'consecutive_skips',
-                 'skip_history', 'last_skip_reason', 'best_trophy', 'promising_regions')
+                 'skip_history', 'last_skip_reason', 'best_trophy', 'promising_regions',
+                 'surrogate', 'screened')
     
     def __init__(self, initial_temp=1.0):
         self.iteration = 0
@@ -53,10 +196,11 @@ class OptState:
         self.skips = 0
         self.evaluated = 0
         self.consecutive_skips = 0
-        self.cache = {}
+        self.cache = OrderedDict()  # LRU: {tune hash: score}, most recent last
         self.gradients = {}
         self.elite = []
-        self.param_hist = {}
+        self.param_hist = None      # BinnedStats, set up once the clamps are known
+        self.pair_hist = {}         # {(param, param): [((value, value), score)]}
         self.synapses = []
         self.neuron_impacts = {}
         self.recent_impr = []
@@ -65,6 +209,8 @@ class OptState:
         self.last_skip_reason = ''  # Debug: reason for last skip
         self.best_trophy = None     # Best result with MDD < 25% (The Trophy)
         self.promising_regions = {} # AION v2025.16: {param: [values that gave ROI > 1.0]}
+        self.surrogate = None       # Surrogate, if enabled; trained by the LEARNER
+        self.screened = 0           # Candidates the surrogate kept from backtesting
     
     @property
     def phase(self):
@@ -110,7 +256,10 @@ class AIONoptions:
                  'max_temperature', 'synapses', 'neurons', 'fitness_ratios',
                  'enable_cache', 'elite_preservation', 'smart_skip_threshold',
                  'bad_region_memory', 'pareto_mdd_threshold', 'hard_mdd_limit',
-                 'quantum_pulse_intensity', 'memory_decay_rate')
+                 'quantum_pulse_intensity', 'memory_decay_rate', 'processes',
+                 'batch_size', 'seed', 'persistent_cache', 'cache_size',
+                 'history_size', 'skip_bins', 'skip_decay', 'surrogate', 'surrogate_k',
+                 '_surrogate_keep', 'surrogate_memory', 'surrogate_warmup', 'fidelity')
     
     def __init__(self):
         self.epochs = math.inf
@@ -135,6 +284,31 @@ class AIONoptions:
         self.hard_mdd_limit = 0.25       # Limite de ferro (25%)
         self.quantum_pulse_intensity = 1.5
         self.memory_decay_rate = 0.9     # Taxa de sobrevivência da memória
+        self.processes = 1               # Backtest workers (1 = in-process)
+        self.batch_size = None           # Candidates per batch (default: processes)
+        self.seed = None                 # Seed for a repeatable run
+        self.persistent_cache = True     # Reuse backtests of earlier runs (SQLite)
+        self.cache_size = 10000          # In-memory cache entries (LRU eviction)
+        self.history_size = 1000         # Improvement snapshots kept for plotting
+        self.skip_bins = 4               # Bins per parameter range for Smart Skip
+        self.skip_decay = 0.2            # Weight of a new score in a bin's decayed mean (0 = window mean)
+        self.surrogate = False           # k-NN pre-screen of each batch before backtesting
+        self.surrogate_k = 5             # Neighbours per prediction
+        self.surrogate_keep = 0.5        # Fraction of the proposed candidates backtested
+        self.surrogate_memory = 2000     # Evaluations the surrogate learns from
+        self.surrogate_warmup = 30       # Evaluations before the surrogate screens
+        self.fidelity = None             # Successive halving on data windows (Fidelity)
+    
+    @property
+    def surrogate_keep(self):
+        return self._surrogate_keep
+    
+    @surrogate_keep.setter
+    def surrogate_keep(self, keep):
+        # Proposals per batch are batch_size / keep
+        if not 0 < keep <= 1:
+            raise ValueError(f"surrogate_keep must be in (0, 1], not {keep}")
+        self._surrogate_keep = keep
 
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -159,7 +333,7 @@ def printouts(ctx):
     table.append(curr_row)
     
     for c, (s, b) in ctx["best"].items():
-        row = [c] + [fmt(v) for v in b.tune.values()] + [""]
+        row = [c] + [fmt(v) for v in b.values()] + [""]
         row += [fmt(s.get(coord, 0)) for coord in ctx["coords"]] + ["###"]
         table.append(row)
     
@@ -177,13 +351,14 @@ def printouts(ctx):
     speed = max(1, st.evaluated) / (time.time() - ctx["start"])
     phase_map = {'exploration': '🔍 Exploring', 'exploitation': '🎯 Refining', 'balanced': '⚖️ Balanced'}
     temp_bar = "█" * int(st.temperature * 10) + "░" * (10 - int(st.temperature * 10))
+    pruned = f"  Pruned: {ctx['opts'].fidelity.pruned}" if ctx["opts"].fidelity else ""
     
     msg = "\033c"
     msg += it("cyan", f"🚀 AION v2025.13 | Intelligent Pipeline | {len(ctx['params'])}D | https://github.com/cjsgarbi\n\n")
     msg += print_table(table, render=True, colors=colors, pallete=[0, 34, 33, 178]) + "\n"
     msg += it("white", "═" * 60 + "\n")
     msg += it("white", f"• Backtests: {st.evaluated}  Improvements: {st.improvements}  Synapses: {len(st.synapses)}\n")
-    msg += it("white", f"• Speed: {speed:.1f}/s  Cache: {len(st.cache)}  Skip: {st.skip_rate*100:.0f}%\n")
+    msg += it("white", f"• Speed: {speed:.1f}/s  Cache: {len(st.cache)}  Skip: {st.skip_rate*100:.0f}%  Screened: {st.screened}{pruned}\n")
     msg += it("white", f"• Phase: {phase_map[st.phase]}  {temp_bar}  Stagnation: {st.stagnation}\n")
     msg += it("white", "═" * 60 + "\n")
     
@@ -233,6 +408,16 @@ class AION:
             return 0.0 if len(v) == 0 else float(v[0])
         return float(v)
     
+    def _copy_tune(self, tune):
+        """Tune-only snapshot: a new dict with its arrays copied."""
+        return {k: v.copy() if isinstance(v, np.ndarray) else v for k, v in tune.items()}
+    
+    def _spawn(self, template, tune):
+        """Lightweight candidate: shallow copy of the template bot with its own tune."""
+        bot = copy(template)
+        bot.tune = self._copy_tune(tune)
+        return bot
+    
     def _hash_tune(self, tune):
         """Numpy-safe hash for caching."""
         try:
@@ -396,10 +581,10 @@ class AION:
         if st.consecutive_skips > 50:
             st.consecutive_skips = 0
             # SOFT DECAY: Instead of resetting to {}, we decay the impact of old memory
-            if isinstance(st.param_hist, dict):
-                for p in st.param_hist:
-                    if len(st.param_hist[p]) > 5:
-                        st.param_hist[p] = st.param_hist[p][int(len(st.param_hist[p]) * 0.5):]
+            st.param_hist.decay(0.5)
+            for p in st.pair_hist:
+                if len(st.pair_hist[p]) > 5:
+                    st.pair_hist[p] = st.pair_hist[p][int(len(st.pair_hist[p]) * 0.5):]
             st.temperature = min(3.0, st.temperature * self.options.quantum_pulse_intensity)
             st.last_skip_reason = 'soft_memory_decay'
             return False
@@ -417,34 +602,19 @@ class AION:
             threshold = best_roi * 0.90 # If failing, only accept things near the "best failure"
 
         for param, value in tune.items():
-            hist = st.param_hist.get(param, [])
-            if len(hist) < 5 or param not in clamps:
+            if param not in clamps or st.param_hist.size(param) < 5:
                 continue
             
             total_analyzed += 1
-            rng = clamps[param][2] - clamps[param][0]
-            if rng <= 0:
+            # Divide range into bins (constant-time lookup of the running stats)
+            bin_idx = st.param_hist.bin(param, value)
+            if bin_idx is None:
                 continue
             
-            try:
-                v_float = float(value)
-                # Divide range into 4 bins
-                bin_idx = min(3, max(0, int((v_float - clamps[param][0]) / rng * 4)))
-                
-                # Collect ROIs from this region
-                bin_rois = []
-                for hist_val, hist_roi in hist:
-                    hist_bin = min(3, max(0, int((float(hist_val) - clamps[param][0]) / rng * 4)))
-                    if hist_bin == bin_idx:
-                        bin_rois.append(hist_roi)
-                
-                # Bad region: average < threshold
-                if len(bin_rois) >= 3:
-                    avg_roi = sum(bin_rois) / len(bin_rois)
-                    if avg_roi < threshold:
-                        bad_params += 1
-            except (ValueError, TypeError):
-                continue
+            # Bad region: average of the recent ROIs in this bin < threshold
+            avg_roi = st.param_hist.mean(param, bin_idx)
+            if avg_roi is not None and avg_roi < threshold:
+                bad_params += 1
         
         # ═══ FINAL DECISION ═══
         
@@ -477,27 +647,24 @@ class AION:
         
         # ═══ ALWAYS UPDATE HISTORY (using Balanced Score for Smart Skip) ═══
         for param, value in new_tune.items():
-            hist = st.param_hist.setdefault(param, [])
-            try:
-                hist.append((float(value), roi)) # Note: Using passed roi/balanced score
-            except (ValueError, TypeError):
-                hist.append((value, roi))
+            st.param_hist.add(param, value, roi) # Note: Using passed roi/balanced score
             
             # Synaptic Interaction Memory: Learn which pairs are bad
             if len(new_tune) > 1:
                 for other_p, other_v in new_tune.items():
                     if other_p == param: continue
                     pair_key = tuple(sorted([param, other_p]))
-                    pair_hist = st.param_hist.setdefault(pair_key, [])
+                    pair_hist = st.pair_hist.setdefault(pair_key, [])
                     try:
                         pair_hist.append(((float(value), float(other_v)), roi))
                     except:
                         pass
                     if len(pair_hist) > opts.bad_region_memory:
-                        st.param_hist[pair_key] = pair_hist[-opts.bad_region_memory:]
-
-            if len(hist) > opts.bad_region_memory:
-                st.param_hist[param] = hist[-opts.bad_region_memory:]
+                        st.pair_hist[pair_key] = pair_hist[-opts.bad_region_memory:]
+        
+        # Surrogate model learns the same Balanced Score
+        if st.surrogate is not None and not was_skipped:
+            st.surrogate.add(new_tune, roi)
         
         # Reset skip streak when backtest was executed
         if not was_skipped:
@@ -532,7 +699,7 @@ class AION:
         # ═══ IF IMPROVED: Update elite, synapses, impacts ═══
         if improved:
             # Elite pool
-            st.elite.append((roi, deepcopy(new_tune)))
+            st.elite.append((roi, self._copy_tune(new_tune)))
             st.elite.sort(key=lambda x: x[0], reverse=True)
             st.elite = st.elite[:opts.elite_preservation]
             
@@ -580,6 +747,190 @@ class AION:
             if st.phase == 'exploration':
                 st.temperature = min(opts.max_temperature, st.temperature * 1.05)
 
+    # ══════════════════════════════════════════════════════════════════════
+    # EVALUATOR AGENT - Backtests candidates and judges their scores
+    # ══════════════════════════════════════════════════════════════════════
+    
+    def _evaluate(self, bots, evaluator, cache, kwargs):
+        """
+        Backtests a batch of candidates, on the worker pool when there is one.
+        Yields scores in order, each as soon as it is ready; cached and repeated
+        tunes are not backtested again, nor are those earlier runs stored in the
+        persistent cache.  Candidates pruned by the fidelity rounds yield None.
+        """
+        st = self.state
+        memory = st.cache if self.options.enable_cache else {}
+        hashes = [self._hash_tune(b.tune) for b in bots]
+        known = {}
+        for h in hashes:
+            if h in memory:
+                memory.move_to_end(h)
+                known[h] = memory[h]
+        todo = {}
+        for h, b in zip(hashes, bots):
+            if h not in known:
+                todo.setdefault(h, b)
+        scores = backtest_bots(list(todo.values()), self.data, self.wallet, evaluator, cache,
+                               self.options.fidelity, **kwargs)
+        for h in hashes:
+            if h not in known:
+                known[h] = next(scores)
+                # Pruned tunes are not remembered, a later batch may promote them
+                if self.options.enable_cache and known[h] is not None:
+                    st.cache[h] = known[h]
+                    # Evict the least recently used score
+                    if len(st.cache) > self.options.cache_size:
+                        st.cache.popitem(last=False)
+            yield known[h]
+    
+    def _pool_size(self, batch_size):
+        """Candidates to propose per batch: more once the surrogate can screen them."""
+        st = self.state
+        if st.surrogate is None or st.surrogate.size < self.options.surrogate_warmup:
+            return batch_size
+        return max(batch_size, math.ceil(batch_size / self.options.surrogate_keep))
+    
+    def _screen(self, batch, batch_size):
+        """
+        Surrogate pre-screen: keeps the `batch_size` candidates with the best
+        predicted score (in proposal order) and drops the rest unevaluated.
+        """
+        st = self.state
+        if len(batch) <= batch_size:
+            return batch
+        predicted = st.surrogate.predict([b.tune for b, _, _ in batch])
+        order = [int(i) for i in np.argsort(-predicted, kind='stable')]
+        keep, rest = order[:batch_size], order[batch_size:]
+        # Forced exploration: 20% of the time a rejected candidate gets the last seat
+        if random() < 0.20:
+            keep[-1] = choice(rest)
+        st.screened += len(batch) - batch_size
+        return [batch[i] for i in sorted(keep)]
+    
+    def _judge(self, score, bot, best):
+        """
+        Compares a backtest against the best bots, updating them and the Trophy.
+        Returns (improved, boom, balanced score for the LEARNER).
+        """
+        st = self.state
+        opts = self.options
+        # Check for improvement using Balanced Score (ROI vs Risk vs WinRate)
+        improved, boom = False, []
+        new_roi = self._scalar(score.get('roi', 1.0))
+        new_mdd = self._scalar(score.get('maximum_drawdown', 0.01))
+        new_wr = self._scalar(score.get('trade_win_rate', 0.0))
+
+        # ════════════════════════════════════════════════════════════════
+        # 🛡️ BALANCED SCORE COM BARREIRA DUPLA (SUAVE + FERRO)
+        # ════════════════════════════════════════════════════════════════
+
+        # HARD LIMIT: Immediate rejection if MDD > Limit
+        if new_mdd > opts.hard_mdd_limit:
+            new_balanced = -1.0
+            mdd_penalty = 0.0
+        else:
+            # Sigmoidal MDD Penalty (Safe Barrier at pareto_mdd_threshold)
+            # 1.0 until threshold, then drops exponentially
+            mdd_penalty = 1.0 / (1.0 + math.exp(20.0 * (new_mdd - opts.pareto_mdd_threshold)))
+
+            # WinRate Penalty (Threshold at 45%)
+            wr_penalty = 1.0
+            if new_wr < 0.45:
+                wr_penalty = 1.0 / (1.0 + math.exp(20.0 * (0.45 - new_wr)))
+
+            # Balanced Score: ROI weighted by Risk/WR penalties (ROI is already Net Return)
+            new_balanced = (new_roi * (new_wr + 0.01) * mdd_penalty * wr_penalty)
+
+        best_roi_val = self._scalar(best['roi'][0].get('roi', 1.0))
+        best_mdd_val = self._scalar(best['roi'][0].get('maximum_drawdown', 0.1))
+        best_wr_val = self._scalar(best['roi'][0].get('trade_win_rate', 0.0))
+
+        # Same formula for the current best
+        best_mdd_penalty = 1.0 / (1.0 + math.exp(20.0 * (best_mdd_val - opts.pareto_mdd_threshold)))
+        best_wr_penalty = 1.0 / (1.0 + math.exp(20.0 * (0.45 - best_wr_val))) if best_wr_val < 0.45 else 1.0
+        best_balanced = (best_roi_val * (best_wr_val + 0.01) * best_mdd_penalty * best_wr_penalty)
+
+        # 🔒 ELITE PROTECTION: ROI can NEVER decrease unless MDD improved significantly
+        roi_improved = new_roi > best_roi_val
+        mdd_improved = new_mdd < (best_mdd_val * 0.90) # 10% relative improvement in risk
+        balanced_improved = new_balanced > best_balanced
+
+        # USER CONSTRAINT: "Dynamic ROI/WR evolution as long as MDD < 25%"
+        # If we are in the SAFE ZONE (MDD < 25%), we accept ROI gains more aggressively.
+        is_safe_zone = new_mdd <= 0.25
+
+        # Risk Explosion only applies if we breach the hard limit
+        # We relax the "relative increase" check if we are still safely under 25%
+        risk_breach = new_mdd > 0.25
+
+        if risk_breach:
+            # If we breach 25%, we only accept if it's a massive ROI gain that might justify it (rare)
+            # or if we are just moving from a huge breach to a smaller breach
+             accept_roi = False
+        else:
+            # In Safe Zone: Accept if ROI improves, OR if Balanced Score improves (covers Win Rate)
+            # CRITICAL: ROI MUST BE POSITIVE. We do not accept improvements in "losing less".
+            accept_roi = (roi_improved or balanced_improved) and new_roi > 0
+
+        # Special Case: Reducing Risk significantly while keeping similar ROI (must be positive)
+        risk_optimization = mdd_improved and new_roi >= (best_roi_val * 0.95) and new_roi > 0
+
+        if (accept_roi and not risk_breach) or risk_optimization:
+            best['roi'] = (score, self._copy_tune(bot.tune))
+            boom.append('roi')
+            improved = True
+
+        # 🏆 BEST ROI MEMORY (The Trophy - Glass Zone 0-25% MDD)
+        # CRITÉRIO: ROI > 1.0 (lucro positivo) E MDD < 25%
+        # NÃO aceita ROI negativo, apenas resultados com lucro real
+        if new_mdd <= 0.25 and new_roi > 1.0:
+            if st.best_trophy is None:
+                st.best_trophy = {'score': deepcopy(score), 'tune': self._copy_tune(bot.tune)}
+            else:
+                trophy_roi = self._scalar(st.best_trophy['score'].get('roi', 0))
+                trophy_mdd = self._scalar(st.best_trophy['score'].get('maximum_drawdown', 1.0))
+
+                # Case 1: Better ROI (Primary goal)
+                if new_roi > (trophy_roi + 1e-6):
+                    st.best_trophy = {'score': deepcopy(score), 'tune': self._copy_tune(bot.tune)}
+
+                # Case 2: Lower MDD (Better risk)
+                # If MDD is significantly better and ROI is not ruined, we update
+                elif new_mdd < (trophy_mdd - 0.001) and new_roi >= (trophy_roi - 0.001):
+                    st.best_trophy = {'score': deepcopy(score), 'tune': self._copy_tune(bot.tune)}
+
+        # Other coords: Updated individually (preserve diversity)
+
+        for c, (s, _) in list(best.items()):
+            if c == 'roi':
+                continue  # Already handled above
+            try:
+                new_val = self._scalar(score.get(c, 0))
+                best_val = self._scalar(s.get(c, 0))
+
+                # LOGIC FIX: Minimize Bad Metrics, Maximize Good Metrics
+                is_bad_metric = c in ['maximum_drawdown', 'drawdown_duration', 'risk', 'ulcer_index']
+
+                improved_metric = False
+                if is_bad_metric:
+                    # MINIMIZE (Lower is better)
+                    # Must be > 0 to be valid risk metric usually, but let's assume raw value
+                    if new_val < best_val:
+                        improved_metric = True
+                else:
+                    # MAXIMIZE (Higher is better)
+                    if new_val > best_val:
+                        improved_metric = True
+
+                if improved_metric:
+                    best[c] = (score, self._copy_tune(bot.tune))
+                    boom.append(c)
+                    improved = True
+            except:
+                continue
+        
+        return improved, boom, new_balanced
+    
     # ══════════════════════════════════════════════════════════════════════
     # MAIN LOOP - Orchestrates the pipeline
     # ══════════════════════════════════════════════════════════════════════
@@ -599,6 +950,10 @@ class AION:
         """
         bot.info = Info({"mode": "optimize"})
         bot.reset()
+        seed_optimizer(self.options.seed)
+        if self.options.fidelity is not None:
+            # Its windows and warmup belong to the previous bot and data
+            self.options.fidelity.reset()
         st = self.state
         opts = self.options
         
@@ -609,7 +964,15 @@ class AION:
         bot = bound_neurons(bot)
         coords = list(initial.keys())
         params = list(bot.tune.keys())
-        best = {c: [initial.copy(), deepcopy(bot)] for c in coords}
+        # Best records and the Trophy hold tunes only; candidates are spawned
+        # from this template instead of deep copying whole bots
+        template = deepcopy(bot)
+        best = {c: [initial.copy(), self._copy_tune(bot.tune)] for c in coords}
+        
+        # Binned running stats of the LEARNER, read by the FILTER
+        st.param_hist = BinnedStats(bot.clamps, opts.skip_bins, opts.bad_region_memory, opts.skip_decay)
+        if opts.surrogate:
+            st.surrogate = Surrogate(bot.clamps, params, opts.surrogate_k, opts.surrogate_memory)
         
         # Feed LEARNER with initial result
         self._learn(bot.tune, bot.tune, self._scalar(initial.get('roi', 0)), False, list(params))
@@ -619,7 +982,7 @@ class AION:
         init_roi = self._scalar(initial.get('roi', 1.0))
         init_mdd = self._scalar(initial.get('maximum_drawdown', 0.5))
         if init_mdd <= 0.25 and init_roi > 1.0:
-            self.state.best_trophy = {'score': deepcopy(initial), 'bot': deepcopy(bot)}
+            self.state.best_trophy = {'score': deepcopy(initial), 'tune': self._copy_tune(bot.tune)}
         
         if opts.fitness_ratios is None:
             opts.fitness_ratios = {c: 0 for c in coords}
@@ -631,202 +994,103 @@ class AION:
         historical = []
         start = time.time()
         
+        batch = []
+        # Candidates per batch, all mutated from the best bots known at the time
+        batch_size = opts.batch_size or max(1, opts.processes or 1)
+        
         try:
-            while True:
-                st.iteration += 1
+            with open_evaluator(bot, self.data, self.wallet, opts.processes, **kwargs) as evaluator, \
+                    open_cache(opts.persistent_cache, bot, self.data, self.wallet, **kwargs) as cache:
+                while True:
+                    st.iteration += 1
                 
-                # ═══ SAFEGUARDS ═══
-                if st.iteration > 50000:
-                    print(it("red", f"\n⚠️ 50k LIMIT! Backtests:{st.evaluated} ROI:{self._scalar(best['roi'][0]['roi']):.4f}"))
-                    break
+                    # ═══ SAFEGUARDS ═══
+                    if st.iteration > 50000:
+                        print(it("red", f"\n⚠️ 50k LIMIT! Backtests:{st.evaluated} ROI:{self._scalar(best['roi'][0]['roi']):.4f}"))
+                        break
                 
-                if opts.cooldown:
-                    time.sleep(opts.cooldown)
+                    if opts.cooldown:
+                        time.sleep(opts.cooldown)
                 
-                # Periodic plotting
-                if opts.plot_period and st.iteration % opts.plot_period == 0 and historical:
-                    plot_scores(historical, [], st.iteration)
+                    # Periodic plotting
+                    if opts.plot_period and st.iteration % opts.plot_period == 0 and historical:
+                        plot_scores(historical, [], st.iteration)
                 
-                # ═══ MUTATOR AGENT ═══
-                # Seed from Trophy (20% chance) to overcome records
-                if st.best_trophy and random() < 0.20:
-                    bot = deepcopy(st.best_trophy['bot'])
-                else:
-                    bot = deepcopy(best.get('roi', list(best.values())[0])[1])
+                    # ═══ MUTATOR AGENT ═══
+                    # Seed from Trophy (20% chance) to overcome records
+                    if st.best_trophy and random() < 0.20:
+                        bot = self._spawn(template, st.best_trophy['tune'])
+                    else:
+                        bot = self._spawn(template, best.get('roi', list(best.values())[0])[1])
                 
-                bot, old_tune, neurons = self._mutate(bot, params)
+                    bot, old_tune, neurons = self._mutate(bot, params)
                 
-                # ═══ FILTER AGENT (Smart Skip) ═══
-                # Uses state: param_hist, skip_rate, phase, consecutive_skips
-                best_roi = self._scalar(best['roi'][0]['roi'])
-                if self._should_skip(bot.tune, best_roi, bot.clamps):
-                    # Skip recorded inside _should_skip via st.record_skip()
-                    # Temperature already adjusted automatically
+                    # ═══ FILTER AGENT (Smart Skip) ═══
+                    # Uses state: param_hist, skip_rate, phase, consecutive_skips
+                    best_roi = self._scalar(best['roi'][0]['roi'])
+                    if self._should_skip(bot.tune, best_roi, bot.clamps):
+                        # Skip recorded inside _should_skip via st.record_skip()
+                        # Temperature already adjusted automatically
                     
-                    # Micro-Reheat Pulse: If stuck, increase temperature instead
-                    if st.consecutive_skips > 20:
-                        st.temperature = min(self.options.max_temperature, 
-                                            st.temperature * self.options.quantum_pulse_intensity)
+                        # Micro-Reheat Pulse: If stuck, increase temperature instead
+                        if st.consecutive_skips > 20:
+                            st.temperature = min(self.options.max_temperature, 
+                                                st.temperature * self.options.quantum_pulse_intensity)
                         
-                    continue
-
-                
-                # ═══ EVALUATOR AGENT ═══
-                h = self._hash_tune(bot.tune)
-                if opts.enable_cache and h in st.cache:
-                    score = st.cache[h]
-                else:
-                    score = backtest(bot, self.data, self.wallet.copy(), plot=False, **kwargs)
-                    if opts.enable_cache:
-                        st.cache[h] = score
-                
-                # Check for improvement using Balanced Score (ROI vs Risk vs WinRate)
-                improved, boom = False, []
-                new_roi = self._scalar(score.get('roi', 1.0))
-                new_mdd = self._scalar(score.get('maximum_drawdown', 0.01))
-                new_wr = self._scalar(score.get('trade_win_rate', 0.0))
-                
-                # ════════════════════════════════════════════════════════════════
-                # 🛡️ BALANCED SCORE COM BARREIRA DUPLA (SUAVE + FERRO)
-                # ════════════════════════════════════════════════════════════════
-                
-                # HARD LIMIT: Immediate rejection if MDD > Limit
-                if new_mdd > opts.hard_mdd_limit:
-                    new_balanced = -1.0
-                    mdd_penalty = 0.0
-                else:
-                    # Sigmoidal MDD Penalty (Safe Barrier at pareto_mdd_threshold)
-                    # 1.0 until threshold, then drops exponentially
-                    mdd_penalty = 1.0 / (1.0 + math.exp(20.0 * (new_mdd - opts.pareto_mdd_threshold)))
-                    
-                    # WinRate Penalty (Threshold at 45%)
-                    wr_penalty = 1.0
-                    if new_wr < 0.45:
-                        wr_penalty = 1.0 / (1.0 + math.exp(20.0 * (0.45 - new_wr)))
-                    
-                    # Balanced Score: ROI weighted by Risk/WR penalties (ROI is already Net Return)
-                    new_balanced = (new_roi * (new_wr + 0.01) * mdd_penalty * wr_penalty)
-                
-                best_roi_val = self._scalar(best['roi'][0].get('roi', 1.0))
-                best_mdd_val = self._scalar(best['roi'][0].get('maximum_drawdown', 0.1))
-                best_wr_val = self._scalar(best['roi'][0].get('trade_win_rate', 0.0))
-                
-                # Same formula for the current best
-                best_mdd_penalty = 1.0 / (1.0 + math.exp(20.0 * (best_mdd_val - opts.pareto_mdd_threshold)))
-                best_wr_penalty = 1.0 / (1.0 + math.exp(20.0 * (0.45 - best_wr_val))) if best_wr_val < 0.45 else 1.0
-                best_balanced = (best_roi_val * (best_wr_val + 0.01) * best_mdd_penalty * best_wr_penalty)
-                
-                # 🔒 ELITE PROTECTION: ROI can NEVER decrease unless MDD improved significantly
-                roi_improved = new_roi > best_roi_val
-                mdd_improved = new_mdd < (best_mdd_val * 0.90) # 10% relative improvement in risk
-                balanced_improved = new_balanced > best_balanced
-                
-                # USER CONSTRAINT: "Dynamic ROI/WR evolution as long as MDD < 25%"
-                # If we are in the SAFE ZONE (MDD < 25%), we accept ROI gains more aggressively.
-                is_safe_zone = new_mdd <= 0.25
-                
-                # Risk Explosion only applies if we breach the hard limit
-                # We relax the "relative increase" check if we are still safely under 25%
-                risk_breach = new_mdd > 0.25
-                
-                if risk_breach:
-                    # If we breach 25%, we only accept if it's a massive ROI gain that might justify it (rare)
-                    # or if we are just moving from a huge breach to a smaller breach
-                     accept_roi = False
-                else:
-                    # In Safe Zone: Accept if ROI improves, OR if Balanced Score improves (covers Win Rate)
-                    # CRITICAL: ROI MUST BE POSITIVE. We do not accept improvements in "losing less".
-                    accept_roi = (roi_improved or balanced_improved) and new_roi > 0
-
-                # Special Case: Reducing Risk significantly while keeping similar ROI (must be positive)
-                risk_optimization = mdd_improved and new_roi >= (best_roi_val * 0.95) and new_roi > 0
+                        continue
 
-                if (accept_roi and not risk_breach) or risk_optimization:
-                    best['roi'] = (score, deepcopy(bot))
-                    boom.append('roi')
-                    improved = True
                 
-                # 🏆 BEST ROI MEMORY (The Trophy - Glass Zone 0-25% MDD)
-                # CRITÉRIO: ROI > 1.0 (lucro positivo) E MDD < 25%
-                # NÃO aceita ROI negativo, apenas resultados com lucro real
-                if new_mdd <= 0.25 and new_roi > 1.0:
-                    if st.best_trophy is None:
-                        st.best_trophy = {'score': deepcopy(score), 'bot': deepcopy(bot)}
-                    else:
-                        trophy_roi = self._scalar(st.best_trophy['score'].get('roi', 0))
-                        trophy_mdd = self._scalar(st.best_trophy['score'].get('maximum_drawdown', 1.0))
-                        
-                        # Case 1: Better ROI (Primary goal)
-                        if new_roi > (trophy_roi + 1e-6):
-                            st.best_trophy = {'score': deepcopy(score), 'bot': deepcopy(bot)}
-                        
-                        # Case 2: Lower MDD (Better risk)
-                        # If MDD is significantly better and ROI is not ruined, we update
-                        elif new_mdd < (trophy_mdd - 0.001) and new_roi >= (trophy_roi - 0.001):
-                            st.best_trophy = {'score': deepcopy(score), 'bot': deepcopy(bot)}
-
-                # Other coords: Updated individually (preserve diversity)
-
-                # Other coords: Updated individually (preserve diversity)
-                for c, (s, _) in list(best.items()):
-                    if c == 'roi':
-                        continue  # Already handled above
-                    try:
-                        new_val = self._scalar(score.get(c, 0))
-                        best_val = self._scalar(s.get(c, 0))
-                        
-                        # LOGIC FIX: Minimize Bad Metrics, Maximize Good Metrics
-                        is_bad_metric = c in ['maximum_drawdown', 'drawdown_duration', 'risk', 'ulcer_index']
-                        
-                        improved_metric = False
-                        if is_bad_metric:
-                            # MINIMIZE (Lower is better)
-                            # Must be > 0 to be valid risk metric usually, but let's assume raw value
-                            if new_val < best_val:
-                                improved_metric = True
-                        else:
-                            # MAXIMIZE (Higher is better)
-                            if new_val > best_val:
-                                improved_metric = True
-                        
-                        if improved_metric:
-                            best[c] = (score, deepcopy(bot))
-                            boom.append(c)
-                            improved = True
-                    except:
+                    # ═══ EVALUATOR AGENT ═══
+                    # Candidates are gathered into a batch and backtested together
+                    batch.append((bot, old_tune, neurons))
+                    if len(batch) < self._pool_size(batch_size):
                         continue
+                    batch = self._screen(batch, batch_size)
+                    scores = self._evaluate([b for b, _, _ in batch], evaluator, cache, kwargs)
                 
-                # ═══ LEARNER AGENT ═══
-                # Updates: param_hist, gradients, elite, synapses, neuron_impacts, temperature
-                # CRITICAL: We pass 'new_balanced' instead of 'new_roi'. 
-                # If MDD > Limit, new_balanced is low/negative. This teaches AION that this region is BAD.
-                self._learn(old_tune, bot.tune, new_balanced, improved, neurons)
-                
-                if improved:
-                    historical.append((st.iteration, deepcopy(best)))
+                    # Results are fed back in order, as they complete
+                    finished = False
+                    for (bot, old_tune, neurons), score in zip(batch, scores):
+                        # Pruned on a window of the data, never backtested in full
+                        if score is None:
+                            continue
+                        improved, boom, new_balanced = self._judge(score, bot, best)
+                    
+                        # ═══ LEARNER AGENT ═══
+                        # Updates: param_hist, gradients, elite, synapses, neuron_impacts, temperature
+                        # CRITICAL: We pass 'new_balanced' instead of 'new_roi'. 
+                        # If MDD > Limit, new_balanced is low/negative. This teaches AION that this region is BAD.
+                        self._learn(old_tune, bot.tune, new_balanced, improved, neurons)
                 
-                # ═══ DISPLAY ═══
-                if opts.show_terminal and st.iteration % 10 == 0:
-                    printouts({"params": params, "coords": coords, "bot": bot, "score": score,
-                               "best": best, "boom": boom, "opts": opts, "state": st, "start": start})
+                        if improved:
+                            # Scores only, thinned out as it grows (plot_scores needs no bots)
+                            historical.append((st.iteration, {c: (s, None) for c, (s, _) in best.items()}))
+                            if len(historical) > opts.history_size:
+                                historical[:] = historical[:-1:2] + historical[-1:]
                 
-                # ═══ EXIT CONDITIONS ═══
-                if st.evaluated > opts.epochs:
-                    print(it("green", f"\n🎯 COMPLETED! Backtests:{st.evaluated} ROI:{self._scalar(best['roi'][0]['roi']):.4f}"))
-                    break
+                        # ═══ DISPLAY ═══
+                        if opts.show_terminal and st.evaluated % 10 == 0:
+                            printouts({"params": params, "coords": coords, "bot": bot, "score": score,
+                                       "best": best, "boom": boom, "opts": opts, "state": st, "start": start})
                 
-                # AION v2025.15: Increased Convergence Limit (was 500)
-                if st.stagnation > 1000:
-                    print(it("cyan", f"\n🏁 CONVERGED (Stagnation Limit Reached > 1000)! Backtests:{st.evaluated} ROI:{self._scalar(best['roi'][0]['roi']):.4f}"))
-                    break
+                        # ═══ EXIT CONDITIONS ═══
+                        if st.evaluated > opts.epochs:
+                            print(it("green", f"\n🎯 COMPLETED! Backtests:{st.evaluated} ROI:{self._scalar(best['roi'][0]['roi']):.4f}"))
+                            finished = True
+                            break
                 
-                # AION v2025.15: Memory Leak Protection
-                if len(st.cache) > 10000:
-                    st.cache = {} # Flush cache to prevent RAM accumulation
+                        # AION v2025.15: Increased Convergence Limit (was 500)
+                        if st.stagnation > 1000:
+                            print(it("cyan", f"\n🏁 CONVERGED (Stagnation Limit Reached > 1000)! Backtests:{st.evaluated} ROI:{self._scalar(best['roi'][0]['roi']):.4f}"))
+                            finished = True
+                            break
                 
-                # Dynamic Reheat (Quantum Pulse) during exploitation if stagnant
-                if st.stagnation > 20 and st.phase == 'exploitation':
-                    st.temperature = min(opts.max_temperature, st.temperature * 1.1)
+                        # Dynamic Reheat (Quantum Pulse) during exploitation if stagnant
+                        if st.stagnation > 20 and st.phase == 'exploitation':
+                            st.temperature = min(opts.max_temperature, st.temperature * 1.1)
+                    batch = []
+                    if finished:
+                        break
         
         except KeyboardInterrupt:
             print(it("yellow", f"\n⏹️ INTERRUPTED! Backtests:{st.evaluated} ROI:{self._scalar(best['roi'][0]['roi']):.4f}"))
@@ -843,12 +1107,14 @@ class AION:
             for coord in roi_coords:
                 current_val = self._scalar(best[coord][0].get('roi', 0))
                 if t_roi > (current_val + 1e-6):
-                    best[coord] = (deepcopy(t_score), deepcopy(st.best_trophy['bot']))
+                    best[coord] = (deepcopy(t_score), st.best_trophy['tune'])
                     replaced = True
             
             if replaced:
                 final_roi_pct = (t_roi - 1.0) * 100
                 print(it("green", f"🏆 Replacing Output with BEST ROI MEMORY (Trophy ROI: {final_roi_pct:.2f}%)"))
 
+        # Rebuild bots from the tune-only records for the caller
+        best = {c: (s, self._spawn(template, tune)) for c, (s, tune) in best.items()}
         end_optimization(best, opts.print_tune, asset=self.data.asset, currency=self.data.currency, begin_ts=self.data.begin, end_ts=self.data.end)
         return best
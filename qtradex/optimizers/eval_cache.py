@@ -0,0 +1,223 @@
+"""
+Persistent evaluation cache shared by the optimizers.
+
+Backtest results are stored in an SQLite database in the bot's tunes folder,
+keyed by the evaluation context and the tune.  The context is a digest of
+everything else a result depends on: the source of the bot's module and of the
+backtest engine and indicators, the dataset, the starting balances and fee, and
+the backtest options.  A restarted or repeated optimization finds the tunes
+earlier runs evaluated instead of backtesting them again, while editing the bot's
+module or the engine, or changing the data or the wallet, starts from an empty
+context.  Code the bot imports from elsewhere is not hashed; clear the cache (or
+delete the database) after changing it.
+
+    with open_cache(True, bot, data, wallet) as cache:
+        results = cache.get_many(tunes)    # None where not evaluated yet
+        cache.put(tune, result)
+"""
+
+# STANDARD MODULES
+import functools
+import glob
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import nullcontext
+
+# 3RD PARTY MODULES
+import numpy as np
+# QTRADEX MODULES
+from qtradex.common.utilities import NdarrayDecoder, NdarrayEncoder
+from qtradex.core.tune_manager import get_path, source_hash
+
+DETAIL = False
+FILENAME = "evaluations.sqlite"
+# Data attributes that, with the candles, identify a dataset
+DATA_KEYS = ("exchange", "asset", "currency", "begin", "end", "candle_size", "base_size")
+# modules of the qtradex package a backtest result depends on
+ENGINE = (
+    "core/backtest.py",
+    "core/base_bot.py",
+    "core/quant.py",
+    "private/signals.py",
+    "private/wallet.py",
+    "indicators/*.py",
+)
+
+
+class CacheEncoder(NdarrayEncoder):
+    """
+    NdarrayEncoder that also accepts numpy scalars.
+    """
+
+    def default(self, obj):
+        if isinstance(obj, np.generic):
+            return obj.item()
+        return super().default(obj)
+
+
+def canonical(obj):
+    """
+    Deterministic json text for tunes, results and context keys.
+    """
+    return json.dumps(obj, cls=CacheEncoder, sort_keys=True, separators=(",", ":"))
+
+
+def data_fingerprint(data):
+    """
+    Hash a Data object's identity and its candles.
+
+    Returns:
+    - A hex digest that changes whenever the candles a backtest would see do.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(canonical([getattr(data, key, None) for key in DATA_KEYS]).encode())
+    for group in (data.raw_candles, getattr(data, "fine_data", None) or {}):
+        for key in sorted(group):
+            values = np.ascontiguousarray(group[key])
+            digest.update(f"{key}:{values.dtype.str}:{values.shape}".encode())
+            digest.update(values)
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def engine_hash():
+    """
+    Hash the source of the backtest engine and the indicators (see ENGINE).
+
+    Returns:
+    - A hex digest that changes whenever qtradex's backtest code does.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    digest = hashlib.blake2b(digest_size=16)
+    for pattern in ENGINE:
+        for path in sorted(glob.glob(os.path.join(root, pattern))):
+            if path.endswith("_tests.py"):
+                continue
+            digest.update(os.path.relpath(path, root).encode())
+            with open(path, "rb") as handle:
+                digest.update(handle.read())
+    return digest.hexdigest()
+
+
+class EvalCache:
+    """
+    Backtest results of one evaluation context, persisted across runs.
+    """
+
+    def __init__(self, bot, data, wallet, path=None, **kwargs):
+        """
+        Parameters:
+        - bot: The bot being optimized; its module's source code is part of the
+          context, as is qtradex's backtest engine (see engine_hash).
+        - data: The Data object backtested on.
+        - wallet: The initial wallet; its balances and fee are part of the context.
+        - path: The database file, by default in the bot's tunes folder.
+        - kwargs: The options passed to backtest().
+        """
+        context = [
+            source_hash(bot),
+            engine_hash(),
+            data_fingerprint(data),
+            getattr(wallet, "balances", None),
+            getattr(wallet, "fee", None),
+            kwargs,
+        ]
+        self.context = hashlib.blake2b(
+            canonical(context).encode(), digest_size=16
+        ).hexdigest()
+        self.path = path or os.path.join(get_path(bot), FILENAME)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # results arrive on the evaluator's callback threads as well
+        self.connection = sqlite3.connect(
+            self.path, timeout=30, check_same_thread=False
+        )
+        with self.lock, self.connection:
+            # WAL lets concurrent runs read while one writes
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS evaluations ("
+                " context TEXT, tune TEXT, result TEXT, created REAL,"
+                " PRIMARY KEY (context, tune)) WITHOUT ROWID"
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def key(self, tune):
+        return hashlib.blake2b(canonical(tune).encode(), digest_size=16).hexdigest()
+
+    def get_many(self, tunes):
+        """
+        Look up tunes.
+
+        Returns:
+        - A list with the stored result of each tune, or None where there is none.
+        """
+        keys = [self.key(tune) for tune in tunes]
+        found = {}
+        with self.lock:
+            # stay well below SQLite's limit on bound parameters
+            for start in range(0, len(keys), 500):
+                chunk = keys[start : start + 500]
+                found.update(
+                    self.connection.execute(
+                        "SELECT tune, result FROM evaluations WHERE context = ?"
+                        f" AND tune IN ({','.join('?' * len(chunk))})",
+                        [self.context, *chunk],
+                    ).fetchall()
+                )
+        results = [
+            json.loads(found[key], cls=NdarrayDecoder) if key in found else None
+            for key in keys
+        ]
+        hits = sum(result is not None for result in results)
+        self.hits += hits
+        self.misses += len(results) - hits
+        return results
+
+    def get(self, tune):
+        return self.get_many([tune])[0]
+
+    def put(self, tune, result):
+        """
+        Store the result of a tune; results that are not json are not cached.
+        """
+        try:
+            text = canonical(result)
+        except (TypeError, ValueError):
+            if DETAIL:
+                print(f"Not caching a result that is not json: {result}")
+            return
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO evaluations VALUES (?, ?, ?, ?)",
+                (self.context, self.key(tune), text, time.time()),
+            )
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+def open_cache(enabled, bot, data, wallet, **kwargs):
+    """
+    An EvalCache, or a null context if disabled or the bot's source is unreadable.
+    """
+    if not enabled:
+        return nullcontext()
+    try:
+        return EvalCache(bot, data, wallet, **kwargs)
+    except (OSError, TypeError, SyntaxError, sqlite3.Error) as error:
+        if DETAIL:
+            print(f"Evaluation cache disabled: {error}")
+        return nullcontext()
@@ -0,0 +1,296 @@
+"""
+Shared backtest executor for the optimizers.
+
+An Evaluator is a pool of worker processes, each set up once with the bot, the
+wallet and zero-copy shared views of the data (see qtradex.public.shared_data),
+that backtests tunes submitted in batches:
+
+    with Evaluator(bot, data, wallet, processes=8, **kwargs) as evaluator:
+        scores = evaluator.map([tune_a, tune_b, ...])     # blocking, in order
+        futures = evaluator.submit([tune_c, tune_d])      # one Future per tune
+
+Jobs and results travel over the executor's pipes, so nothing polls; a batch
+holds several tunes to amortize the round trip.  If a worker dies (i.e. killed
+by the OS for memory) the pool is restarted and the batches it lost are
+resubmitted before their futures fail.
+
+Given a Fidelity (see qtradex.optimizers.fidelity), backtest_bots() screens a
+batch on short windows of the data first and only backtests the survivors in full.
+"""
+
+# STANDARD MODULES
+import math
+import os
+import signal
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import nullcontext
+
+# QTRADEX MODULES
+from qtradex.core import backtest
+from qtradex.optimizers.fidelity import window_data
+from qtradex.public.shared_data import SharedData
+
+DETAIL = False
+# stands in for the results of candidates pruned by a Fidelity
+PRUNED = object()
+# batches per worker that map() splits a set of tunes into
+BATCHES_PER_WORKER = 4
+
+# per worker process state, set up by start_worker()
+WORKER = {}
+
+
+def start_worker(bot, handle, wallet, kwargs):
+    """
+    Pool initializer: attach to the shared data and keep the bot around.
+    """
+    # the parent handles Ctrl+C and shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    WORKER.update(bot=bot, data=handle.attach(), wallet=wallet, kwargs=kwargs)
+
+
+def evaluate_batch(tunes, window=None):
+    """
+    Backtest every tune of a batch in a worker.
+
+    Parameters:
+    - tunes: List of tune dictionaries.
+    - window: Optional (fraction, multiple, overlap) arguments of window_data()
+      to backtest on a window of the data instead of all of it.
+
+    Returns:
+    - A list of backtest results, in the order of `tunes`.
+    """
+    bot = WORKER["bot"]
+    data = WORKER["data"]
+    if window is not None:
+        windows = WORKER.setdefault("windows", {})
+        if window not in windows:
+            windows[window] = window_data(data, *window)
+        data = windows[window]
+    results = []
+    for tune in tunes:
+        bot.tune = tune
+        results.append(
+            backtest(bot, data, WORKER["wallet"].copy(), plot=False, **WORKER["kwargs"])
+        )
+    return results
+
+
+def backtest_bots(bots, data, wallet, evaluator=None, cache=None, fidelity=None, **kwargs):
+    """
+    Backtest a batch of candidate bots, on the evaluator's workers if given.
+
+    Parameters:
+    - bots: List of bots; only their tunes travel to the workers.
+    - data, wallet, kwargs: As for backtest(), used when evaluating in-process.
+    - evaluator: An open Evaluator, or None to backtest in this process.
+    - cache: An open EvalCache; tunes found there are not backtested again and
+      new results are added to it.
+    - fidelity: A Fidelity; the tunes not in the cache are screened on windows
+      of the data first and only the survivors are backtested in full.
+
+    Returns:
+    - A generator of backtest results in the order of `bots`, each yielded as
+      soon as it is ready, so callers act on early results while later ones run.
+      Candidates pruned by the fidelity rounds yield None.
+    """
+    if cache is None:
+        known = [None] * len(bots)
+    else:
+        known = cache.get_many([bot.tune for bot in bots])
+    todo = [bot for bot, result in zip(bots, known) if result is None]
+    if fidelity is not None and todo:
+        promoted = iter(fidelity.screen(todo, data, wallet, evaluator, **kwargs))
+        # cached results stand; pruned candidates are not backtested in full
+        known = [
+            PRUNED if result is None and not next(promoted) else result
+            for result in known
+        ]
+        todo = [bot for bot, result in zip(bots, known) if result is None]
+    if evaluator is None:
+        scores = (
+            backtest(bot, data, wallet.copy(), plot=False, **kwargs) for bot in todo
+        )
+    else:
+        scores = (
+            future.result() for future in evaluator.submit([bot.tune for bot in todo])
+        )
+    return merge_scores(bots, known, scores, cache)
+
+
+def merge_scores(bots, known, scores, cache):
+    """
+    Yield cached results and fresh `scores` in the order of `bots`, caching the latter.
+    """
+    for bot, result in zip(bots, known):
+        if result is PRUNED:
+            result = None
+        elif result is None:
+            # the in-process backtest restores bot.tune, so the key is unchanged
+            result = next(scores)
+            if cache is not None:
+                cache.put(bot.tune, result)
+        yield result
+
+
+def open_evaluator(bot, data, wallet, processes, **kwargs):
+    """
+    An Evaluator for more than one process, else a null context (in-process).
+    """
+    if processes and processes > 1:
+        return Evaluator(bot, data, wallet, processes, **kwargs)
+    return nullcontext()
+
+
+class Evaluator:
+    """
+    Pool of backtest worker processes with batched submission and result futures.
+    """
+
+    def __init__(
+        self, bot, data, wallet, processes=None, batch_size=None, retries=2, **kwargs
+    ):
+        """
+        Parameters:
+        - bot: The bot to backtest; workers receive a copy once, at startup.
+        - data: The Data object to backtest on, shared with the workers.
+        - wallet: The initial wallet; every backtest starts from a copy.
+        - processes: Number of workers, by default the number of CPUs.
+        - batch_size: Tunes per job; by default map() splits its tunes into
+          BATCHES_PER_WORKER jobs per worker.
+        - retries: How many times a batch lost to a dead worker is resubmitted.
+        - kwargs: Passed on to backtest().
+        """
+        self.processes = processes or os.cpu_count() or 3
+        self.batch_size = batch_size
+        self.retries = retries
+        self.shared = SharedData(data)
+        self.initargs = (bot, self.shared.handle, wallet, kwargs)
+        self.lock = threading.Lock()
+        self.closed = False
+        self.restarts = 0
+        self.pool = self.start_pool()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def start_pool(self):
+        return ProcessPoolExecutor(
+            max_workers=self.processes,
+            initializer=start_worker,
+            initargs=self.initargs,
+        )
+
+    def restart(self, broken):
+        """
+        Replace the pool if it is still the broken one; returns False once closed.
+        """
+        with self.lock:
+            if self.closed:
+                return False
+            if self.pool is broken:
+                self.restarts += 1
+                if DETAIL:
+                    print(f"Backtest worker died, restarting the pool ({self.restarts})...")
+                broken.shutdown(wait=False, cancel_futures=True)
+                self.pool = self.start_pool()
+            return True
+
+    def submit(self, tunes, batch_size=None, window=None):
+        """
+        Queue tunes for backtesting.
+
+        Parameters:
+        - tunes: List of tune dictionaries.
+        - batch_size: Tunes per job, overriding the default.
+        - window: Optional window of the data to backtest on, see evaluate_batch().
+
+        Returns:
+        - A list of Futures, one per tune, resolving to its backtest result.
+        """
+        tunes = list(tunes)
+        batch_size = (
+            batch_size
+            or self.batch_size
+            or max(1, math.ceil(len(tunes) / (self.processes * BATCHES_PER_WORKER)))
+        )
+        futures = [Future() for _ in tunes]
+        for start in range(0, len(tunes), batch_size):
+            self.submit_batch(
+                tunes[start : start + batch_size],
+                futures[start : start + batch_size],
+                0,
+                window,
+            )
+        return futures
+
+    def submit_batch(self, tunes, futures, attempt, window=None):
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("Evaluator is closed")
+            pool = self.pool
+        try:
+            job = pool.submit(evaluate_batch, tunes, window)
+        except BrokenProcessPool:
+            # broke between the lock and the submission
+            job = Future()
+            job.set_exception(BrokenProcessPool("pool broke before submission"))
+        job.add_done_callback(
+            lambda job: self.resolve(job, pool, tunes, futures, attempt, window)
+        )
+
+    def resolve(self, job, pool, tunes, futures, attempt, window=None):
+        """
+        Hand a finished batch's results to its futures, resubmitting it if its
+        worker died.
+        """
+        if job.cancelled():
+            for future in futures:
+                future.cancel()
+            return
+        error = job.exception()
+        if isinstance(error, BrokenProcessPool) and attempt < self.retries:
+            if self.restart(pool):
+                self.submit_batch(tunes, futures, attempt + 1, window)
+                return
+        for future, result in zip(futures, job.result() if error is None else futures):
+            # a caller may have cancelled its future meanwhile
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    def map(self, tunes, batch_size=None, window=None):
+        """
+        Backtest tunes in parallel and wait for all of them.
+
+        Returns:
+        - A list of backtest results, in the order of `tunes`.
+        """
+        return [future.result() for future in self.submit(tunes, batch_size, window)]
+
+    def alive(self):
+        """
+        Return the number of live worker processes.
+        """
+        processes = getattr(self.pool, "_processes", None) or {}
+        return sum(process.is_alive() for process in processes.values())
+
+    def close(self):
+        """
+        Cancel queued batches, stop the workers and free the shared data.
+        """
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        self.shared.close()
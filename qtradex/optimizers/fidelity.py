@@ -0,0 +1,220 @@
+"""
+Multi-fidelity evaluation of candidate tunes by successive halving.
+
+Most of the candidates an optimizer proposes are clearly worse than their peers
+long before the end of the data.  Given a Fidelity, backtest_bots() first scores
+a batch of candidates on short, recent windows of the data, promotes the best
+`keep` fraction of each round to the next, longer, window and only backtests the
+survivors on the full range; the others come back as None (pruned):
+
+    options = QPSOoptions()
+    options.batch_size = 16
+    options.fidelity = Fidelity(budgets=(0.25, 0.5), keep=1 / 3)
+
+With those settings 16 candidates cost 16 * 0.25 + 6 * 0.5 + 2 = 9 full backtests
+instead of 16, and larger batches or smaller budgets screen more per CPU-hour.
+Every window begins early enough to cover the warmup of the bot's indicators for
+any tune within its clamps (see qtradex.core.warmup.plan_warmup), so it is scored
+on exactly its share of the data.  The reduced rounds can also run on candles
+resampled to a multiple of the candle size, which cuts their ticks further.
+"""
+
+# STANDARD MODULES
+import math
+from copy import deepcopy
+
+# 3RD PARTY MODULES
+import numpy as np
+# QTRADEX MODULES
+from qtradex.core.backtest import backtest
+from qtradex.core.warmup import plan_warmup
+from qtradex.optimizers.eval_cache import DATA_KEYS
+
+DETAIL = False
+
+
+def window_data(data, fraction=1.0, multiple=1, overlap=0):
+    """
+    A view of the most recent part of a Data object.
+
+    Parameters:
+    - data: The Data object to take the window from; it is not modified.
+    - fraction: The share of the candles, counted from the end, to backtest on.
+    - multiple: Resample the candles to this multiple of the candle size.
+    - overlap: Candles to prepend to the window for the indicators' warmup.
+
+    Returns:
+    - A Data object whose candles are slices of `data`'s (or of its resampled
+      timeframe), with `begin` and `end` set to the window.
+    """
+    candle_size = int(data.candle_size * multiple)
+    candles = data.raw_candles if multiple == 1 else data.timeframe(candle_size)
+    total = len(candles["unix"])
+    start = max(0, total - math.ceil(total * fraction) - int(overlap))
+    # a shallow copy without going through Data's pickling hooks
+    window = data.__class__.__new__(data.__class__)
+    window.__dict__.update(data.__dict__)
+    window.raw_candles = {k: v[start:] for k, v in candles.items()}
+    window.candle_size = candle_size
+    window.begin = float(window.raw_candles["unix"][0])
+    window.end = float(window.raw_candles["unix"][-1])
+    window.days = (window.end - window.begin) / 86400
+    window.timeframes = {}
+    window.store = window.views = window.ring = None
+    if data.fine_data is not None:
+        first = np.searchsorted(data.fine_data["unix"], window.begin, side="left")
+        window.fine_data = {k: v[first:] for k, v in data.fine_data.items()}
+    return window
+
+
+def data_identity(data):
+    """
+    A cheap key telling datasets apart, unlike id() which a new object can reuse.
+    """
+    unix = data.raw_candles["unix"]
+    return (
+        *(getattr(data, key, None) for key in DATA_KEYS),
+        len(unix),
+        float(unix[0]) if len(unix) else None,
+        float(unix[-1]) if len(unix) else None,
+        float(data.raw_candles["close"][-1]) if len(unix) else None,
+    )
+
+
+def plan_overlap(bot, candle_size=None):
+    """
+    Warmup candles a window needs for the bot's tune and for its clamp maxima.
+
+    Parameters:
+    - bot: The bot being optimized; it is not modified.
+    - candle_size: As for plan_warmup(), the candle size `_period` values are
+      scaled to, or None when backtesting with range_periods=False.
+
+    Returns:
+    - The number of candles to prepend to every window.
+    """
+    probe = deepcopy(bot)
+    warmup = plan_warmup(probe, candle_size)
+    widest = {}
+    for key, value in probe.tune.items():
+        maxv = probe.clamps[key][2] if key in probe.clamps else None
+        if maxv is None or isinstance(value, bool):
+            widest[key] = value
+        elif isinstance(value, np.ndarray):
+            widest[key] = np.full_like(value, maxv)
+        else:
+            widest[key] = type(value)(maxv)
+    try:
+        probe.tune = widest
+        warmup = max(warmup, plan_warmup(probe, candle_size))
+    except Exception as error:
+        # the clamp maxima are not necessarily a valid tune for every bot
+        if DETAIL:
+            print(f"Window warmup planned for the current tune only: {error}")
+    return int(warmup) + 1
+
+
+class Fidelity:
+    """
+    Successive halving settings and counters, shared by the optimizers' options.
+    """
+
+    def __init__(self, budgets=(0.25, 0.5), keep=1 / 3, multiple=1, key="roi", minimum=3):
+        """
+        Parameters:
+        - budgets: Fractions of the data, from its end, that the reduced rounds
+          backtest on; the full range is always the last round.
+        - keep: Fraction of the candidates promoted from each round to the next.
+        - multiple: Candle size multiple the reduced rounds are resampled to,
+          i.e. 4 scores a 1h dataset on 4h candles first.
+        - key: The backtest result key candidates are ranked by, or a function
+          of the result returning the rank (higher is better).
+        - minimum: Smallest batch worth screening; smaller batches are only
+          backtested in full.
+        """
+        self.budgets = sorted(budget for budget in budgets if 0 < budget < 1)
+        self.keep = keep
+        self.multiple = int(multiple)
+        self.key = key
+        self.minimum = max(2, minimum)
+        self.reset()
+
+    def reset(self):
+        """
+        Forget the planned warmup, the windows and the counters, i.e. before
+        optimizing another bot or dataset; the optimizers call it on start.
+        """
+        self.overlap = None
+        self.windows = {}
+        # reduced backtests run and candidates pruned so far
+        self.backtests = 0
+        self.pruned = 0
+
+    def rank(self, result):
+        """
+        The value a result is ranked by; unusable values rank last.
+        """
+        try:
+            value = self.key(result) if callable(self.key) else result[self.key]
+            value = float(np.mean(value))
+        except (KeyError, TypeError, ValueError):
+            return -math.inf
+        return value if math.isfinite(value) else -math.inf
+
+    def rounds(self, bot, data, range_periods=True):
+        """
+        The (fraction, multiple, overlap) window of each reduced round.
+        """
+        if self.overlap is None:
+            candle_size = data.candle_size * self.multiple
+            self.overlap = plan_overlap(bot, candle_size if range_periods else None)
+        return [(budget, self.multiple, self.overlap) for budget in self.budgets]
+
+    def window(self, data, spec):
+        """
+        window_data() for one round, built once per dataset.
+        """
+        identity = data_identity(data)
+        key = (identity, spec)
+        if key not in self.windows:
+            self.windows = {k: v for k, v in self.windows.items() if k[0] == identity}
+            self.windows[key] = window_data(data, *spec)
+        return self.windows[key]
+
+    def screen(self, bots, data, wallet, evaluator=None, **kwargs):
+        """
+        Run the reduced rounds on a batch of candidates.
+
+        Parameters:
+        - bots: The candidates, none of them evaluated yet.
+        - data, wallet, kwargs: As for backtest().
+        - evaluator: An open Evaluator, or None to backtest in this process.
+
+        Returns:
+        - A list of booleans, True for the candidates promoted to the full backtest.
+        """
+        alive = list(range(len(bots)))
+        if len(bots) < self.minimum:
+            return [True] * len(bots)
+        for spec in self.rounds(bots[0], data, kwargs.get("range_periods", True)):
+            if len(alive) < 2:
+                break
+            if evaluator is None:
+                window = self.window(data, spec)
+                results = [
+                    backtest(bots[i], window, wallet.copy(), plot=False, **kwargs)
+                    for i in alive
+                ]
+            else:
+                results = evaluator.map([bots[i].tune for i in alive], window=spec)
+            self.backtests += len(alive)
+            ranks = [self.rank(result) for result in results]
+            order = sorted(range(len(alive)), key=lambda j: -ranks[j])
+            count = max(1, math.ceil(len(alive) * self.keep))
+            # promoted candidates keep their order in the batch
+            alive = sorted(alive[j] for j in order[:count])
+            if DETAIL:
+                print(f"Fidelity {spec[0]:.0%}: promoted {count} of {len(ranks)}")
+        self.pruned += len(bots) - len(alive)
+        alive = set(alive)
+        return [i in alive for i in range(len(bots))]
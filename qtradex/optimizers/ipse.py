@@ -25,7 +25,7 @@ Main Components:
 - IPSE class: core of the optimization logic
 - IPSEoptions: configuration for optimization
 - printouts: live optimization update display
-- retest_process: multiprocessing evaluation function
+- Evaluator: shared pool of backtest worker processes (optimizers/evaluator.py)
 
 Dependencies include qtradex for bot logic, numpy for numerical operations, and
 multiprocessing for parallelism.
@@ -36,8 +36,7 @@ import json
 import math
 import os
 import time
-from copy import deepcopy
-from multiprocessing import Manager, Process
+from copy import copy, deepcopy
 
 # 3RD PARTY MODULES
 import numpy as np
@@ -45,6 +44,8 @@ import numpy as np
 from qtradex.common.utilities import NonceSafe, it, print_table, sigfig
 from qtradex.core import backtest
 from qtradex.core.base_bot import Info
+from qtradex.optimizers.eval_cache import open_cache
+from qtradex.optimizers.evaluator import Evaluator, backtest_bots
 from qtradex.optimizers.utilities import (bound_neurons, end_optimization,
                                           plot_scores, print_tune)
 from qtradex.private.wallet import PaperWallet
@@ -61,6 +62,8 @@ class IPSEoptions:
         self.processes = os.cpu_count() or 3  # number of parallel processes
         self.show_terminal = True  # whether to print optimization stats
         self.print_tune = False  # whether to print final tuned parameters
+        self.persistent_cache = True  # reuse backtests of earlier runs (SQLite)
+        self.fidelity = None  # screen each space on windows of the data (Fidelity)
 
 
 def printouts(kwargs):
@@ -111,33 +114,6 @@ def printouts(kwargs):
     print(msg)
 
 
-def retest_process(bot, data, wallet, todo, done, **kwargs):
-    """
-    Worker process that pulls jobs from the todo queue, runs backtests, and saves results.
-    
-    Args:
-        bot: Trading bot instance
-        data: Historical data object
-        wallet: Wallet instance for simulation
-        todo: Shared list of jobs
-        done: Shared dict for completed results
-    """
-    try:
-        while True:
-            try:
-                work = todo.pop(0)  # Get work item
-            except IndexError:
-                time.sleep(0.02)  # Wait for work
-                continue
-
-            bot.tune = work["tune"]  # Set bot parameters
-
-            # Run backtest and store result
-            done[work["id"]] = backtest(bot, data, wallet.copy(), plot=False, **kwargs)
-    except KeyboardInterrupt:
-        print("Compute process ending...")
-
-
 class IPSE:
     """
     Core optimizer class implementing the IPSE algorithm.
@@ -154,32 +130,39 @@ class IPSE:
         self.data = data
         self.wallet = wallet
 
-    def retest(self, todo, done, bot, space, parameter):
+    def retest(self, evaluator, cache, bot, space, parameter, **kwargs):
         """
         Distributes backtests across worker processes and collects the results.
 
         Args:
-            todo: Shared list of pending jobs
-            done: Shared dictionary for completed results
+            evaluator: Evaluator running the worker processes
+            cache: EvalCache of earlier backtests, or None
             bot: Trading bot instance
             space: List of values to test for the given parameter
             parameter: Parameter name being optimized
+            kwargs: Options passed on to backtest()
 
         Returns:
-            List of backtest result dictionaries in order of space
+            List of backtest result dictionaries in order of space, None for
+            the values pruned by the fidelity rounds
         """
-        for bot_id, test in enumerate(space):
-            # Enqueue jobs with modified tune value for parameter
-            todo.append({"id": bot_id, "tune": {**bot.tune, parameter: test}})
-
-        while len(done) < len(space):
-            time.sleep(0.02)  # Wait for all results
-
-        # Collect and sort results by original order
-        new_scores = [(bot_id, result) for bot_id, result in done.items()]
-        done.clear()  # Clear shared dictionary
-
-        return [i[1] for i in sorted(new_scores, key=lambda x: x[0])]
+        # One candidate per value of the parameter, submitted in batches
+        candidates = []
+        for test in space:
+            candidate = copy(bot)
+            candidate.tune = {**bot.tune, parameter: test}
+            candidates.append(candidate)
+        return list(
+            backtest_bots(
+                candidates,
+                self.data,
+                self.wallet,
+                evaluator,
+                cache,
+                self.options.fidelity,
+                **kwargs,
+            )
+        )
 
     def optimize(self, bot, **kwargs):
         """
@@ -193,6 +176,9 @@ class IPSE:
         """
         bot.info = Info({"mode": "optimize"})
         bot.reset()
+        if self.options.fidelity is not None:
+            # its windows and warmup belong to the previous bot and data
+            self.options.fidelity.reset()
         bot = bound_neurons(bot)  # Apply bounds to tune parameters
 
         coords = backtest(deepcopy(bot), self.data, deepcopy(self.wallet), plot=False, **kwargs)
@@ -211,23 +197,12 @@ class IPSE:
         epoch = 0
         expansions = 0
 
-        # Start multiprocessing manager for communication between processes
-        with Manager() as manager:
-            todo = manager.list()
-            done = manager.dict()
-
-            # Launch worker processes
-            children = [
-                Process(
-                    target=retest_process,
-                    args=(bot, self.data, self.wallet, todo, done),
-                    kwargs=kwargs,
-                )
-                for _ in range(self.options.processes)
-            ]
-            for child in children:
-                child.start()
-
+        # Launch worker processes sharing one copy of the data
+        with Evaluator(
+            bot, self.data, self.wallet, self.options.processes, **kwargs
+        ) as evaluator, open_cache(
+            self.options.persistent_cache, bot, self.data, self.wallet, **kwargs
+        ) as cache:
             try:
                 while True:
                     epoch += 1
@@ -244,14 +219,16 @@ class IPSE:
                             ).astype(type(bot.tune[parameter])).tolist() + [bot.tune[parameter]]  # Add current value
 
 
-                            scores = self.retest(todo, done, bot, space, parameter)
+                            scores = self.retest(evaluator, cache, bot, space, parameter, **kwargs)
                             idx += len(space)
 
                             improved = []
 
                             # Find best score for this coordinate
                             for check_coord in coords:
-                                best_idx = np.argmax([i[check_coord] for i in scores])
+                                best_idx = np.argmax([
+                                    -np.inf if i is None else i[check_coord] for i in scores
+                                ])
                                 score = scores[best_idx]
                                 best = space[best_idx]
 
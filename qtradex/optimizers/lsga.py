@@ -35,7 +35,6 @@ import shutil
 import time
 from copy import deepcopy
 from json import dumps as json_dumps
-from multiprocessing import Manager, Process
 from random import choice, choices, randint, random, sample
 from statistics import median
 from typing import Any, Dict, List
@@ -48,9 +47,11 @@ from qtradex.common.json_ipc import json_ipc
 from qtradex.common.utilities import NonceSafe, it, print_table, sigfig
 from qtradex.core import backtest
 from qtradex.core.base_bot import Info
+from qtradex.optimizers.eval_cache import open_cache
+from qtradex.optimizers.evaluator import Evaluator, backtest_bots
 from qtradex.optimizers.qpso import QPSO, QPSOoptions
 from qtradex.optimizers.utilities import (bound_neurons, end_optimization,
-                                          merge, print_tune)
+                                          merge, print_tune, seed_optimizer)
 from qtradex.private.wallet import PaperWallet
 
 
@@ -153,24 +154,6 @@ def printouts(kwargs):
     print(msg)
 
 
-def retest_process(bot, data, wallet, todo, done, **kwargs):
-    try:
-        while True:
-            try:
-                # get the work
-                work = todo.pop(0)
-            except IndexError:
-                # wait for work
-                time.sleep(0.02)
-                continue
-            # assign the tune
-            bot.tune = work["tune"]
-            # backtest and put in the done dictionary
-            done[work["id"]] = backtest(bot, data, wallet.copy(), plot=False, **kwargs)
-    except KeyboardInterrupt:
-        print("Compute process ending...")
-
-
 class LSGA(QPSO):
     def __init__(self, data, wallet=None, options=None):
         if wallet is None:
@@ -181,24 +164,14 @@ class LSGA(QPSO):
 
     # check_improved and enthogen are inherited from QPSO
 
-    def retest(self, todo, done, bots):
-        # give jobs
-        for bot_id, bot in enumerate(bots):
-            todo.append({"id": bot_id, "tune": bot.tune})
-
-        # wait for them to finish
-        while len(done) < self.options.population:
-            time.sleep(0.02)
-
-        # gather results
-        new_scores = []
-        for bot_id, result in done.items():
-            new_scores.append((result, bots[bot_id]))
-
-        # clear the pipe
-        done.clear()
-
-        return new_scores
+    def retest(self, evaluator, cache, bots, **kwargs):
+        # backtest the whole population in parallel, in batches, skipping
+        # tunes already evaluated by this or an earlier run; those pruned by
+        # the fidelity rounds are left out.  kwargs are the backtest() options.
+        results = backtest_bots(
+            bots, self.data, self.wallet, evaluator, cache, self.options.fidelity, **kwargs
+        )
+        return [(result, bot) for result, bot in zip(results, bots) if result is not None]
 
     def optimize(self, bot, **kwargs):
         """
@@ -216,6 +189,10 @@ class LSGA(QPSO):
         dict: The best bots and their associated performance metrics.
         """
         bot.info = Info({"mode": "optimize"})
+        seed_optimizer(self.options.seed)
+        if self.options.fidelity is not None:
+            # its windows and warmup belong to the previous bot and data
+            self.options.fidelity.reset()
         improvements = 0
         iteration = 0  # Tracks iterations during optimization
         idx = 0  # Index for fitness evaluation
@@ -245,20 +222,11 @@ class LSGA(QPSO):
             self.options.fitness_ratios[coords[0]] = 1
 
         # Using multiprocessing to handle bot testing across processes
-        with Manager() as manager:
-            todo = manager.list()
-            done = manager.dict()
-            children = [
-                Process(
-                    target=retest_process,
-                    args=(bot, self.data, self.wallet, todo, done),
-                    kwargs=kwargs,
-                )
-                for _ in range(self.options.processes)
-            ]
-            for child in children:
-                child.start()
-
+        with Evaluator(
+            bot, self.data, self.wallet, self.options.processes, **kwargs
+        ) as evaluator, open_cache(
+            self.options.persistent_cache, bot, self.data, self.wallet, **kwargs
+        ) as cache:
             try:
                 # Track start time for performance metrics
                 lsga_start = time.time()
@@ -300,8 +268,8 @@ class LSGA(QPSO):
                         synapse_msg = it("red", "synapse")
                         neurons = choice(synapses)
 
-                    # Limit synapse count through pruning
-                    synapses = list(set(synapses))[-self.options.synapses :]
+                    # Limit synapse count through pruning, keeping the newest distinct ones
+                    synapses = list(dict.fromkeys(reversed(synapses)))[: self.options.synapses][::-1]
 
                     # Select a random coordinate based on fitness ratio
                     coord = choices(
@@ -339,7 +307,7 @@ class LSGA(QPSO):
                         # Bound neurons to reasonable values
                         bound_neurons(bot)
 
-                    new_scores = self.retest(todo, done, bots)
+                    new_scores = self.retest(evaluator, cache, bots, **kwargs)
 
                     # Sort bots by fitness score for the selected coordinate
                     coordx = randint(0, len(self.options.fitness_ratios) - 1)
@@ -351,7 +319,10 @@ class LSGA(QPSO):
                     n_top = max(
                         int(self.options.population * self.options.top_ratio), 2
                     )
-                    good_performers = sample(new_scores[:n_top], n_top)
+                    # fewer may have survived the fidelity rounds
+                    good_performers = sample(
+                        new_scores[:n_top], min(n_top, len(new_scores))
+                    )
 
                     # Merge best performers to create offspring
                     merged = [
@@ -362,7 +333,7 @@ class LSGA(QPSO):
                     for bot, tune in zip(bots, merged):
                         bot.tune = tune
 
-                    merged_scores = self.retest(todo, done, bots)
+                    merged_scores = self.retest(evaluator, cache, bots, **kwargs)
 
                     # Merge new scores with previous ones
                     new_scores.extend(merged_scores)
@@ -398,6 +369,3 @@ class LSGA(QPSO):
             except KeyboardInterrupt:
                 end_optimization(best_bots, self.options.print_tune, asset=self.data.asset, currency=self.data.currency, begin_ts=self.data.begin, end_ts=self.data.end)
                 return best_bots
-            finally:
-                for child in children:
-                    child.terminate()
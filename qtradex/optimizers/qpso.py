@@ -45,7 +45,6 @@ import shutil
 import time
 from copy import deepcopy
 from json import dumps as json_dumps
-from multiprocessing import Process
 from random import choice, choices, randint, random, sample
 from statistics import median
 from typing import Any, Dict, List
@@ -58,8 +57,11 @@ from qtradex.common.json_ipc import json_ipc
 from qtradex.common.utilities import NonceSafe, it, print_table, sigfig
 from qtradex.core import backtest
 from qtradex.core.base_bot import Info
+from qtradex.optimizers.eval_cache import open_cache
+from qtradex.optimizers.evaluator import backtest_bots, open_evaluator
 from qtradex.optimizers.utilities import (bound_neurons, end_optimization,
-                                          plot_scores, print_tune)
+                                          plot_scores, print_tune,
+                                          seed_optimizer)
 from qtradex.private.wallet import PaperWallet
 
 NIL = 10 / 10**10
@@ -88,6 +90,17 @@ class QPSOoptions:
         self.neurons = []
         self.show_terminal = True
         self.print_tune = True
+        # backtest worker processes; 1 evaluates in this process, more opt in to
+        # a pool of workers sharing the data (see optimizers/evaluator.py)
+        self.processes = 1
+        # candidates mutated and evaluated together, by default one per process
+        self.batch_size = None
+        # seed for a repeatable run, see seed_optimizer()
+        self.seed = None
+        # reuse backtests of earlier runs, see optimizers/eval_cache.py
+        self.persistent_cache = True
+        # screen each batch on windows of the data first, see optimizers/fidelity.py
+        self.fidelity = None
 
 
 def printouts(kwargs):
@@ -300,6 +313,10 @@ class QPSO:
         dict: Dictionary of the best bots found per evaluation coordinate.
         """
         bot.info = Info({"mode": "optimize"})
+        seed_optimizer(self.options.seed)
+        if self.options.fidelity is not None:
+            # its windows and warmup belong to the previous bot and data
+            self.options.fidelity.reset()
         improvements = 0
         iteration = 0  # Tracks exploration loop; decremented on improvements to allow more trials
         idx = 0  # Tracks total iterations, always incremented
@@ -332,127 +349,151 @@ class QPSO:
         historical = []  # Stores improvement snapshots
         historical_tests = []  # Stores near-optimal attempts
 
+        # Candidates per batch, all mutated from the best bots known at the time
+        batch_size = self.options.batch_size or max(1, self.options.processes or 1)
+
         if self.options.plot_period:
             plt.ion()  # Enable interactive plotting
 
         try:
             qpso_start = time.time()
-            while True:
-                if self.options.cooldown:
-                    time.sleep(
-                        self.options.cooldown
-                    )  # Optional delay to reduce CPU load
-
-                iteration += 1
-                idx += 1
-
-                # Plot score evolution periodically
-                if self.options.plot_period and not idx % self.options.plot_period:
-                    plot_scores(historical, historical_tests, idx)
-
-                # Periodically invert fitness preferences (for diversity)
-                if not idx % self.options.fitness_period:
-                    self.options.fitness_ratios = self.options.fitness_inversion(
-                        self.options.fitness_ratios
-                    )
-
-                # Allow exploration in suboptimal directions
-                if iteration % self.options.digress_freq == 0:
-                    best_bots = {
-                        coord: [
-                            {k: v * self.options.digress for k, v in score.items()},
-                            bot,
+            with open_evaluator(
+                bot, self.data, self.wallet, self.options.processes, **kwargs
+            ) as evaluator, open_cache(
+                self.options.persistent_cache, bot, self.data, self.wallet, **kwargs
+            ) as cache:
+                while True:
+                    if self.options.cooldown:
+                        time.sleep(
+                            self.options.cooldown
+                        )  # Optional delay to reduce CPU load
+
+                    candidates = []
+                    for _ in range(batch_size):
+                        iteration += 1
+                        idx += 1
+
+                        # Plot score evolution periodically
+                        if self.options.plot_period and not idx % self.options.plot_period:
+                            plot_scores(historical, historical_tests, idx)
+
+                        # Periodically invert fitness preferences (for diversity)
+                        if not idx % self.options.fitness_period:
+                            self.options.fitness_ratios = self.options.fitness_inversion(
+                                self.options.fitness_ratios
+                            )
+
+                        # Allow exploration in suboptimal directions
+                        if iteration % self.options.digress_freq == 0:
+                            best_bots = {
+                                coord: [
+                                    {k: v * self.options.digress for k, v in score.items()},
+                                    bot,
+                                ]
+                                for coord, (score, bot) in best_bots.items()
+                            }
+
+                        # Choose neurons to mutate
+                        neurons = self.options.neurons or [
+                            i for i in parameters if bot.clamps[i][3]
                         ]
-                        for coord, (score, bot) in best_bots.items()
-                    }
-
-                # Choose neurons to mutate
-                neurons = self.options.neurons or [
-                    i for i in parameters if bot.clamps[i][3]
-                ]
-                for _ in range(3):
-                    neurons = sample(population=neurons, k=randint(1, len(neurons)))
-                neurons.sort()
-
-                # If past synapses exist, reuse them occasionally (mimics synaptic memory)
-                synapse_msg = ""
-                if randint(0, 2):
-                    if len(synapses) > 2:
-                        synapse_msg = it("red", "synapse")
-                        neurons = choice(synapses)
-
-                # Limit memory size of synapses (synaptic pruning)
-                synapses = (
-                    list(set(synapses))[-self.options.synapses :]
-                    if self.options.synapses
-                    else []
-                )
-
-                # Select which coordinate to optimize
-                coord = choices(
-                    population=list(self.options.fitness_ratios.keys()),
-                    weights=list(self.options.fitness_ratios.values()),
-                    k=1,
-                )[0]
-                bot = deepcopy(
-                    best_bots[coord][1]
-                )  # Start from best bot in selected coordinate
-
-                # Mutate parameters using QPSO mechanisms
-                for neuron in neurons:
-                    if not bot.clamps[neuron][3]:
-                        continue
-                    aegir, path = self.entheogen(
-                        iteration,
-                        parameters.index(neuron) / len(parameters),
-                        bot.tune[neuron].shape
-                        if isinstance(bot.tune[neuron], np.ndarray)
-                        else 1,
-                        bot.clamps[neuron][0],  # min
-                        bot.clamps[neuron][2],  # max
-                        # is it a numpy array of ints?
-                        np.issubdtype(bot.tune[neuron].dtype, np.integer)
-                        # if it is a numpy array,
-                        if isinstance(bot.tune[neuron], np.ndarray)
-                        # else is it a single int?
-                        else isinstance(bot.tune[neuron], int),
+                        for _ in range(3):
+                            neurons = sample(population=neurons, k=randint(1, len(neurons)))
+                        neurons.sort()
+
+                        # If past synapses exist, reuse them occasionally (mimics synaptic memory)
+                        synapse_msg = ""
+                        if randint(0, 2):
+                            if len(synapses) > 2:
+                                synapse_msg = it("red", "synapse")
+                                neurons = choice(synapses)
+
+                        # Limit memory size of synapses (synaptic pruning), keeping the newest distinct ones
+                        synapses = (
+                            list(dict.fromkeys(reversed(synapses)))[: self.options.synapses][::-1]
+                            if self.options.synapses
+                            else []
+                        )
+
+                        # Select which coordinate to optimize
+                        coord = choices(
+                            population=list(self.options.fitness_ratios.keys()),
+                            weights=list(self.options.fitness_ratios.values()),
+                            k=1,
+                        )[0]
+                        bot = deepcopy(
+                            best_bots[coord][1]
+                        )  # Start from best bot in selected coordinate
+
+                        # Mutate parameters using QPSO mechanisms
+                        for neuron in neurons:
+                            if not bot.clamps[neuron][3]:
+                                continue
+                            aegir, path = self.entheogen(
+                                iteration,
+                                parameters.index(neuron) / len(parameters),
+                                bot.tune[neuron].shape
+                                if isinstance(bot.tune[neuron], np.ndarray)
+                                else 1,
+                                bot.clamps[neuron][0],  # min
+                                bot.clamps[neuron][2],  # max
+                                # is it a numpy array of ints?
+                                np.issubdtype(bot.tune[neuron].dtype, np.integer)
+                                # if it is a numpy array,
+                                if isinstance(bot.tune[neuron], np.ndarray)
+                                # else is it a single int?
+                                else isinstance(bot.tune[neuron], int),
+                            )
+                            bot.tune[neuron] += path
+
+                        bot = bound_neurons(bot)  # Ensure parameter validity
+                        candidates.append((idx, bot, neurons))
+
+                    # Evaluate the batch of configurations, in parallel
+                    scores = backtest_bots(
+                        [bot for _, bot, _ in candidates],
+                        self.data,
+                        self.wallet,
+                        evaluator,
+                        cache,
+                        self.options.fidelity,
+                        **kwargs,
                     )
-                    bot.tune[neuron] += path
-
-                bot = bound_neurons(bot)  # Ensure parameter validity
-
-                # Evaluate new configuration
-                new_score = backtest(
-                    bot, self.data, self.wallet.copy(), plot=False, **kwargs
-                )
 
-                boom = []
-                improved = False
-                for coord, (check_score, _) in best_bots.copy().items():
-                    if new_score[coord] > check_score[coord]:
-                        best_bots[coord] = (new_score, bot)
-                        boom.append(coord)
-                        improved = True
-
-                # Optional terminal printout
-                if self.options.show_terminal and not idx % 10:
-                    printouts(locals())
-
-                # Record successful synapse and save snapshot
-                if improved:
-                    synapses.append(tuple(neurons))
-                    historical.append((idx, deepcopy(best_bots)))
-                    iteration -= 1  # Grant extra iterations for progress
-
-                # Log near-optimal scores
-                for coord, (score, _) in best_bots.items():
-                    if new_score[coord] >= score[coord] * self.options.top_percent:
-                        historical_tests.append((idx, new_score.copy()))
-                        break
-
-                # Exit if iteration or improvement limits are reached
-                if idx > self.options.epochs or iteration > self.options.improvements:
-                    raise KeyboardInterrupt
+                    # Feed results back in order, as they complete
+                    for (idx, bot, neurons), new_score in zip(candidates, scores):
+                        # pruned on a window of the data, never backtested in full
+                        if new_score is None:
+                            if idx > self.options.epochs:
+                                raise KeyboardInterrupt
+                            continue
+                        boom = []
+                        improved = False
+                        for coord, (check_score, _) in best_bots.copy().items():
+                            if new_score[coord] > check_score[coord]:
+                                best_bots[coord] = (new_score, bot)
+                                boom.append(coord)
+                                improved = True
+
+                        # Optional terminal printout
+                        if self.options.show_terminal and not idx % 10:
+                            printouts(locals())
+
+                        # Record successful synapse and save snapshot
+                        if improved:
+                            synapses.append(tuple(neurons))
+                            historical.append((idx, deepcopy(best_bots)))
+                            iteration -= 1  # Grant extra iterations for progress
+
+                        # Log near-optimal scores
+                        for coord, (score, _) in best_bots.items():
+                            if new_score[coord] >= score[coord] * self.options.top_percent:
+                                historical_tests.append((idx, new_score.copy()))
+                                break
+
+                        # Exit if iteration or improvement limits are reached
+                        if idx > self.options.epochs or iteration > self.options.improvements:
+                            raise KeyboardInterrupt
 
         except KeyboardInterrupt:
             end_optimization(best_bots, self.options.print_tune, asset=self.data.asset, currency=self.data.currency, begin_ts=self.data.begin, end_ts=self.data.end)
@@ -3,15 +3,10 @@ import math
 import random
 from copy import deepcopy
 
-import matplotlib.pyplot as plt
-import matplotlib.style as mplstyle
 import numpy as np
 import qtradex as qx
 from qtradex.common.utilities import NdarrayEncoder
 
-mplstyle.use("dark_background")
-plt.rcParams["figure.raise_window"] = False
-
 
 def bound_neurons(bot):
     def clamp(value, minv, maxv, strength):
@@ -175,6 +170,19 @@ def merge(tune1, tune2):
     return tune3
 
 
+def seed_optimizer(seed):
+    """
+    Seed python's and numpy's random generators so an optimization can be replayed.
+
+    Results from parallel workers are consumed in submission order, so a seeded run
+    repeats exactly as long as the batch size stays the same.  None leaves the
+    generators alone.
+    """
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+
+
 import gc  # AION v2025.15: Explicit Garbage Collection
 
 def plot_scores(historical, historical_tests, cdx):
@@ -193,6 +201,13 @@ def plot_scores(historical, historical_tests, cdx):
     """
     if not historical:
         return
+
+    # matplotlib is only loaded (and styled) once there is something to plot
+    import matplotlib.pyplot as plt
+    import matplotlib.style as mplstyle
+
+    mplstyle.use("dark_background")
+    plt.rcParams["figure.raise_window"] = False
         
     # AION v2025.15: Force Garbage Collection to prevent MemLeak
     gc.collect()
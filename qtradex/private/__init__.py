@@ -1,2 +1,14 @@
-import qtradex.private.signals
-from qtradex.private.wallet import PaperWallet, Wallet
+from qtradex.common.lazy import lazy_exports
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "execution": "qtradex.private.execution",
+        "AsyncExecution": "qtradex.private.execution:AsyncExecution",
+        "Execution": "qtradex.private.execution:Execution",
+        "signals": "qtradex.private.signals",
+        "wallet": "qtradex.private.wallet",
+        "PaperWallet": "qtradex.private.wallet:PaperWallet",
+        "Wallet": "qtradex.private.wallet:Wallet",
+    },
+)
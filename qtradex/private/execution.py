@@ -50,13 +50,18 @@ Methods:
 
     top_of_book(self, self.symbol, side, total_amount):
         Places a market order at the top of the order book, continuously monitoring bid/ask prices.
+
+AsyncExecution offers the same order and query methods as coroutines on the shared
+ccxt.async_support session of the exchange (see qtradex.common.aio); Execution's
+ccxt calls are blocking wrappers around that same session.
 """
 
 
+import asyncio
 import threading
 import time
 
-import ccxt
+from qtradex.common.aio import BlockingExchange, session
 from qtradex.private.bitshares_exchange import BitsharesExchange
 
 
@@ -69,12 +74,7 @@ class Execution:
         if exchange_id == "bitshares":
             self.exchange = BitsharesExchange(user=api_key, wif=api_secret)
         else:
-            self.exchange = getattr(ccxt, exchange_id)(
-                {
-                    "apiKey": api_key,
-                    "secret": api_secret,
-                }
-            )
+            self.exchange = BlockingExchange(exchange_id, api_key, api_secret)
         self.killswitch = [False]
 
     def create_order(self, side, order_type, amount, price):
@@ -356,3 +356,79 @@ class Execution:
 
         self.top_of_book_thread = threading.Thread(target=place_order, args=(self,))
         self.top_of_book_thread.start()
+
+
+class AsyncExecution:
+    def __init__(self, exchange_id, asset, currency, api_key=None, api_secret=None):
+        """
+        Coroutine counterpart of Execution for use on an event loop.
+
+        The exchange session is opened on first use and shared with every other
+        coroutine trading or fetching data on the same exchange and credentials.
+        """
+        self.symbol = f"{asset}/{currency}"
+        self.exchange_id = exchange_id
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.bitshares = None
+        if exchange_id == "bitshares":
+            self.bitshares = BitsharesExchange(user=api_key, wif=api_secret)
+
+    async def call(self, method, *args):
+        """
+        Await an exchange method, returning the error message on failure like
+        Execution does.
+        """
+        try:
+            if self.bitshares is not None:
+                # the bitshares client is blocking; keep it off the event loop
+                return await asyncio.to_thread(getattr(self.bitshares, method), *args)
+            exchange = await session(self.exchange_id, self.api_key, self.api_secret)
+            return await getattr(exchange, method)(*args)
+        except Exception as e:
+            return str(e)
+
+    async def create_order(self, side, order_type, amount, price):
+        return await self.call(
+            "create_order", self.symbol, order_type, side, amount, price
+        )
+
+    async def cancel_order(self, order_id):
+        return await self.call("cancel_order", order_id, self.symbol)
+
+    async def cancel_orders(self, order_ids):
+        return await self.call("cancel_orders", order_ids, self.symbol)
+
+    async def cancel_all_orders(self):
+        return await self.call("cancel_all_orders", self.symbol)
+
+    async def fetch_open_order(self, order_id):
+        return await self.call("fetch_open_order", order_id, self.symbol)
+
+    async def fetch_open_orders(self):
+        return await self.call("fetch_open_orders", self.symbol)
+
+    async def fetch_my_trades(self):
+        return await self.call("fetch_my_trades", self.symbol)
+
+    async def fetch_ticker(self, symbol=None, params=None):
+        return await self.call("fetch_ticker", symbol or self.symbol, params or {})
+
+    async def fetch_balance(self):
+        return await self.call("fetch_balance")
+
+    async def create_market_order(self, side, amount, depth_percent=50):
+        """
+        Places a limit order at a specified depth percentage through the current
+        market price, as Execution.create_market_order.
+        """
+        ticker = await self.fetch_ticker()
+        if isinstance(ticker, str):
+            return ticker
+        price = ticker["ask"] if side == "buy" else ticker["bid"]
+        adjusted_price = (
+            price * (1 - depth_percent / 100)
+            if side == "buy"
+            else price * (1 + depth_percent / 100)
+        )
+        return await self.create_order(side, "limit", amount, adjusted_price)
@@ -1,7 +1,5 @@
 from copy import deepcopy
 
-import ccxt
-
 
 BASE_FEE = 1 # in percent
 
@@ -85,3 +83,17 @@ class Wallet(WalletBase):
 
     def refresh(self):
         self.balances = self.exchange.fetch_balance()["free"]
+
+    async def refresh_async(self):
+        """
+        Refresh the balances from a coroutine without blocking the event loop.
+        """
+        import asyncio
+
+        if hasattr(self.exchange, "connect"):
+            exchange = await self.exchange.connect()
+            self.balances = (await exchange.fetch_balance())["free"]
+        else:
+            self.balances = (await asyncio.to_thread(self.exchange.fetch_balance))[
+                "free"
+            ]
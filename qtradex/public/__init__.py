@@ -1,2 +1,14 @@
-from qtradex.public.data import Data
-from qtradex.public.file_loader import load_csv
+from qtradex.common.lazy import lazy_exports
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "data": "qtradex.public.data",
+        "utilities": "qtradex.public.utilities",
+        "Data": "qtradex.public.data:Data",
+        "import_csv": "qtradex.public.file_loader:import_csv",
+        "load_csv": "qtradex.public.file_loader:load_csv",
+        "prefetch": "qtradex.public.prefetch:prefetch",
+        "SharedData": "qtradex.public.shared_data:SharedData",
+    },
+)
@@ -0,0 +1,406 @@
+"""
+Binary columnar candle store.
+
+Every cached series lives in its own folder under qtradex/common/data/candles:
+
+    header.json     {"key": ..., "rows": n, "generation": g, "columns": {"unix": "<f8", ...}}
+    metadata.json   optional, i.e. the source file of an imported series
+    unix.g.bin      raw column data, one file per column
+    open.g.bin
+    ...
+
+`header.json` is the commit point.  Appends write the new rows to the end of each
+column file and then bump "rows"; anything else is written to a new generation of
+column files and the header switches over to it with an atomic rename.  The
+previous generation is kept until the rewrite after, so a reader that has just
+read the old header can still open its columns.  Reads memory-map the column
+files, so a time range costs two binary searches and no parsing or copying.
+
+Pages of a download in progress are journaled as small `journal/*.npz` segments
+(see journal_candles) so an interrupted download keeps what it fetched; the
+next write of the series folds them into the columns in one rewrite, and reads
+until then merge them in memory.
+
+Writers hold STORE_LOCK, which is also an advisory file lock, so any number of
+threads and processes (i.e. optimizer workers) can share the store; readers
+take no lock, since nothing they can see is ever modified in place.
+"""
+
+# STANDARD MODULES
+import json
+import os
+import re
+import threading
+import time
+
+# 3RD PARTY MODULES
+import numpy as np
+# QTRADEX MODULES
+from qtradex.common.json_ipc import atomic_write, file_lock, json_ipc
+from qtradex.common.utilities import PATH
+from qtradex.public.utilities import merge_candles
+
+DETAIL = False
+STORE = os.path.join(PATH, "data", "candles")
+
+
+class StoreLock:
+    """
+    Reentrant lock serializing writers to the store across threads and processes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.thread_lock = threading.RLock()
+        self.file_locks = threading.local()
+
+    def __enter__(self):
+        self.thread_lock.acquire()
+        try:
+            lock = file_lock(self.path)
+            lock.__enter__()
+            self.file_locks.__dict__.setdefault("stack", []).append(lock)
+        except BaseException:
+            self.thread_lock.release()
+            raise
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            self.file_locks.stack.pop().__exit__(*exc_info)
+        finally:
+            self.thread_lock.release()
+
+
+STORE_LOCK = StoreLock(os.path.join(STORE, "store"))
+
+
+def store_path(index_key):
+    """
+    Folder holding the series for `index_key`, i.e.
+    "('binance', None, 86400, 'BTC', 'USDT')" -> ".../candles/binance_None_86400_BTC_USDT"
+    """
+    return os.path.join(STORE, re.sub(r"[^\w.-]+", "_", index_key).strip("_"))
+
+
+def read_header(index_key):
+    """
+    Return the header of a stored series, or None if it is not in the store.
+    """
+    try:
+        with open(os.path.join(store_path(index_key), "header.json"), "r") as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return None
+
+
+def write_header(index_key, header):
+    """
+    Atomically replace the header of a stored series.
+    """
+    atomic_write(os.path.join(store_path(index_key), "header.json"), json.dumps(header))
+
+
+def read_metadata(index_key):
+    """
+    Return the metadata record stored alongside a series, or None.
+    """
+    try:
+        with open(os.path.join(store_path(index_key), "metadata.json"), "r") as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return None
+
+
+def write_metadata(index_key, metadata):
+    """
+    Atomically replace the metadata record of a stored series, i.e. a description of
+    the file it was imported from.
+    """
+    os.makedirs(store_path(index_key), exist_ok=True)
+    atomic_write(os.path.join(store_path(index_key), "metadata.json"), json.dumps(metadata))
+
+
+def column_path(index_key, header, column):
+    return os.path.join(store_path(index_key), f"{column}.{header['generation']}.bin")
+
+
+def open_columns(index_key, header):
+    """
+    Memory-map every column of a stored series.
+
+    Returns:
+    - Dictionary of read-only arrays, each of length header["rows"].
+    """
+    columns = {}
+    for column, dtype in header["columns"].items():
+        if header["rows"]:
+            columns[column] = np.memmap(
+                column_path(index_key, header, column),
+                dtype=np.dtype(dtype),
+                mode="r",
+                shape=(header["rows"],),
+            )
+        else:
+            columns[column] = np.empty(0, dtype=np.dtype(dtype))
+    return columns
+
+
+def migrate_json(index_key):
+    """
+    Move a legacy `"{index_key} candles.json"` cache into the binary store.
+
+    Returns:
+    - The new header, or None if there is no legacy cache either.
+    """
+    if not os.path.exists(os.path.join(PATH, "data", f"{index_key} candles.json")):
+        return None
+    try:
+        cache = json_ipc(f"{index_key} candles.json")
+    except FileNotFoundError:
+        return None
+    if DETAIL:
+        print(f"Migrating {index_key} candles.json to the binary candle store...")
+    rewrite_columns(index_key, None, {k: np.array(v) for k, v in cache.items()})
+    return read_header(index_key)
+
+
+def read_candles(index_key, begin=None, end=None):
+    """
+    Zero-copy read of a stored series, optionally limited to a time range.
+
+    Parameters:
+    - index_key: The data index key of the series.
+    - begin, end: Optional inclusive unix bounds.
+
+    Returns:
+    - Dictionary of memory-mapped column slices, or None if nothing is stored.
+      Pages of an interrupted download that are not compacted yet are merged
+      in, in which case the columns are copies.
+    """
+    pages, candle_size = read_journal(index_key)
+    header = read_header(index_key)
+    if header is None:
+        header = migrate_json(index_key)
+        if header is None:
+            if not pages:
+                return None
+            header = {"rows": 0, "columns": {k: v.dtype.str for k, v in pages[0].items()}}
+    try:
+        columns = open_columns(index_key, header)
+    except FileNotFoundError:
+        # a writer replaced the generation twice since the header was read
+        header = read_header(index_key)
+        columns = open_columns(index_key, header)
+    unix = columns["unix"]
+    start = 0 if begin is None else int(np.searchsorted(unix, begin, side="left"))
+    stop = len(unix) if end is None else int(np.searchsorted(unix, end, side="right"))
+    columns = {k: v[start:stop] for k, v in columns.items()}
+    if pages:
+        columns = merge_candles([columns, *pages], candle_size)
+        unix = columns["unix"]
+        start = 0 if begin is None else int(np.searchsorted(unix, begin, side="left"))
+        stop = len(unix) if end is None else int(np.searchsorted(unix, end, side="right"))
+        columns = {k: v[start:stop] for k, v in columns.items()}
+    return columns
+
+
+def rewrite_columns(index_key, header, candles):
+    """
+    Write `candles` as a new generation of column files and switch the header to it.
+    """
+    path = store_path(index_key)
+    os.makedirs(path, exist_ok=True)
+    new_header = {
+        "key": index_key,
+        "rows": int(len(candles["unix"])),
+        "generation": 0 if header is None else header["generation"] + 1,
+        "columns": {k: np.asarray(v).dtype.str for k, v in candles.items()},
+    }
+    for column, values in candles.items():
+        with open(column_path(index_key, new_header, column), "wb") as handle:
+            handle.write(np.ascontiguousarray(values).tobytes())
+            handle.flush()
+            os.fsync(handle.fileno())
+    write_header(index_key, new_header)
+    # readers may still hold the header of the outgoing generation, but nothing
+    # can reach the ones before it any more
+    for name in os.listdir(path):
+        match = re.fullmatch(r".+\.(\d+)\.bin", name)
+        if match and int(match.group(1)) < new_header["generation"] - 1:
+            try:
+                os.remove(os.path.join(path, name))
+            except OSError:
+                # i.e. still memory-mapped on Windows; the next rewrite retries
+                pass
+
+
+def append_columns(index_key, header, candles):
+    """
+    Append rows that are all newer than the stored series.
+    """
+    rows = header["rows"]
+    for column, dtype in header["columns"].items():
+        dtype = np.dtype(dtype)
+        with open(column_path(index_key, header, column), "r+b") as handle:
+            # drop anything a crashed append wrote past the committed rows
+            handle.truncate(rows * dtype.itemsize)
+            handle.seek(0, os.SEEK_END)
+            handle.write(np.ascontiguousarray(candles[column], dtype=dtype).tobytes())
+            handle.flush()
+            os.fsync(handle.fileno())
+    write_header(index_key, {**header, "rows": rows + int(len(candles["unix"]))})
+
+
+def write_candles(index_key, candles, candle_size, replace=False):
+    """
+    Upsert candles into the store.
+
+    Candles newer than everything stored are appended in place, as long as the
+    ones overlapping the store match it; otherwise the stored series and
+    `candles` are merged (fresh candles win on close) and written as a new
+    generation.
+
+    Parameters:
+    - index_key: The data index key of the series.
+    - candles: Dictionary of candle arrays sorted by "unix".
+    - candle_size: The candle size of the series, used when merging.
+    - replace: Discard whatever is stored instead of merging with it.
+    """
+    candles = {k: np.asarray(v) for k, v in candles.items()}
+    if not len(candles["unix"]):
+        return
+    with STORE_LOCK:
+        if replace:
+            discard_journal(index_key)
+        else:
+            compact_journal(index_key)
+        upsert_candles(index_key, candles, candle_size, replace)
+
+
+def upsert_candles(index_key, candles, candle_size, replace):
+    header = read_header(index_key)
+    if header is None and not replace:
+        header = migrate_json(index_key)
+
+    if header is not None and header["rows"] and not replace:
+        stored = open_columns(index_key, header)
+        if set(stored) == set(candles):
+            # if the candles overlapping the store match it, only append the rest
+            split = int(np.searchsorted(candles["unix"], stored["unix"][-1], "right"))
+            start = int(np.searchsorted(stored["unix"], candles["unix"][0]))
+            stop = start + split
+            if stop <= header["rows"] and all(
+                np.array_equal(stored[k][start:stop], candles[k][:split])
+                for k in candles
+            ):
+                if split < len(candles["unix"]):
+                    append_columns(
+                        index_key, header, {k: v[split:] for k, v in candles.items()}
+                    )
+                return
+        candles = merge_candles(
+            [{k: np.array(v) for k, v in stored.items()}, candles], candle_size
+        )
+    rewrite_columns(index_key, header, candles)
+
+
+def journal_path(index_key):
+    return os.path.join(store_path(index_key), "journal")
+
+
+def journal_segments(index_key):
+    """
+    Return the journaled segment files of a series, oldest first.
+    """
+    try:
+        names = os.listdir(journal_path(index_key))
+    except FileNotFoundError:
+        return []
+    return [
+        os.path.join(journal_path(index_key), name)
+        for name in sorted(names, key=lambda name: int(name.split(".")[0]))
+        if name.endswith(".npz")
+    ]
+
+
+def journal_candles(index_key, candles, candle_size):
+    """
+    Durably record one page of a download without rewriting the stored series.
+
+    Parameters:
+    - index_key: The data index key of the series.
+    - candles: Dictionary of candle arrays sorted by "unix".
+    - candle_size: The candle size of the series, used when compacting.
+    """
+    if not len(candles["unix"]):
+        return
+    with STORE_LOCK:
+        os.makedirs(journal_path(index_key), exist_ok=True)
+        path = os.path.join(journal_path(index_key), f"{time.time_ns()}.npz")
+        with open(f"{path}.tmp", "wb") as handle:
+            np.savez(
+                handle,
+                _candle_size=candle_size,
+                **{k: np.asarray(v) for k, v in candles.items()},
+            )
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(f"{path}.tmp", path)
+
+
+def read_journal(index_key):
+    """
+    Load the journaled pages of a series.
+
+    Returns:
+    - A list of candle dictionaries, oldest first, and the largest candle size
+      they were journaled with.
+    """
+    pages = []
+    candle_size = 0
+    for path in journal_segments(index_key):
+        try:
+            with np.load(path) as page:
+                candle_size = max(candle_size, float(page["_candle_size"]))
+                pages.append({k: page[k] for k in page.files if k != "_candle_size"})
+        except FileNotFoundError:
+            # compacted meanwhile; its candles are in the columns by now
+            continue
+    return pages, candle_size
+
+
+def discard_journal(index_key):
+    for path in journal_segments(index_key):
+        os.remove(path)
+
+
+def compact_journal(index_key):
+    """
+    Fold any journaled segments into the stored series with a single rewrite.
+    """
+    if not journal_segments(index_key):
+        return
+    with STORE_LOCK:
+        pages, candle_size = read_journal(index_key)
+        if not pages:
+            return
+        if DETAIL:
+            print(f"Compacting {len(pages)} journaled pages of {index_key}...")
+        header = read_header(index_key) or migrate_json(index_key)
+        if header is not None and header["rows"]:
+            stored = open_columns(index_key, header)
+            pages.insert(0, {k: np.array(v) for k, v in stored.items()})
+        rewrite_columns(index_key, header, merge_candles(pages, candle_size))
+        discard_journal(index_key)
+
+
+def candle_span(index_key):
+    """
+    Return the [first, last] unix timestamps stored for `index_key`, or None.
+    """
+    header = read_header(index_key)
+    if header is None or not header["rows"]:
+        return None
+    unix = open_columns(index_key, header)["unix"]
+    return [float(unix[0]), float(unix[-1])]
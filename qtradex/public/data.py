@@ -1,14 +1,17 @@
-import json
 import math
 import os
 import time
+from functools import partial
 from datetime import datetime
 
 import ccxt
 import numpy as np
-from qtradex.common.json_ipc import json_ipc
+from qtradex.common.json_ipc import json_ipc, json_update
 from qtradex.common.utilities import it
 from qtradex.core.quant import filter_glitches
+from qtradex.public.candle_store import (STORE_LOCK, compact_journal,
+                                         journal_candles, read_candles,
+                                         write_candles)
 from qtradex.public.klines_alphavantage import (klines_alphavantage_crypto,
                                                 klines_alphavantage_forex,
                                                 klines_alphavantage_stocks)
@@ -18,11 +21,54 @@ from qtradex.public.klines_cryptocompare import klines_cryptocompare
 from qtradex.public.klines_fdr import klines_fdr
 from qtradex.public.klines_synthetic import klines_synthetic
 from qtradex.public.klines_yahoo import klines_yahoo
-from qtradex.public.utilities import (clip_to_time_range, implied, invert,
-                                      merge_candles, quantize_unix,
-                                      reaggregate)
+from qtradex.public.utilities import (CandleRing, build_pyramid,
+                                      clip_to_time_range, compact_candles,
+                                      implied, index_intervals, invert,
+                                      merge_candles, merge_intervals,
+                                      missing_intervals, quantize_unix,
+                                      reaggregate, resample)
 
 DETAIL = False
+# serializes updates to the data index, min_time and candle store between threads
+# and processes
+CACHE_LOCK = STORE_LOCK
+
+
+def read_cache_json(doc):
+    """
+    Read a json_ipc cache document, or {} if it does not exist.
+    """
+    try:
+        return json_ipc(doc)
+    except FileNotFoundError:
+        return {}
+
+
+def set_coverage(index_key, intervals, candle_size):
+    """
+    Merge `intervals` into what the data index holds for `index_key`, atomically
+    with respect to every other thread and process updating the index.
+    """
+
+    def update(index):
+        index[index_key] = [
+            [float(i), float(j)]
+            for i, j in merge_intervals(
+                index_intervals(index.get(index_key, []), candle_size)
+                + [list(i) for i in intervals],
+                candle_size,
+            )
+        ]
+        return index
+
+    json_update("data_index.json", update)
+
+
+def add_coverage(index_key, begin, end, candle_size):
+    """
+    Mark [begin, end] as cached for `index_key` in the data index.
+    """
+    set_coverage(index_key, [[begin, end]], candle_size)
 
 
 def parse_date(date_str):
@@ -56,9 +102,27 @@ class Data:
         api_key=None,
         intermediary=None,
         placeholder=False,
+        compact=False,
+        pyramid=None,
+        lazy=False,
     ):
         """
         See type(self) for accurate signature.
+
+        With `compact=True` timestamps are stored as int64 and prices/volume as
+        float32, halving the memory held per candle.
+
+        With `lazy=True` the candles are zero-copy memory-mapped views of the
+        [begin, end] slice of the candle store (fetching only what it is missing
+        first), so creating a Data for a cached window costs a header read, and
+        every backtest and optimizer worker reading it shares the OS page cache.
+        The views are read-only; see Data.materialize().  Series that need
+        converting (cached inverted, implied through an intermediary or compact)
+        are loaded as usual.
+
+        With `pyramid=True` (or a list of candle sizes) the candles are also resampled
+        to every larger timeframe of qtradex.public.utilities.PYRAMID up front; see
+        Data.timeframe().
         """
         # Parse begin and end timestamps as given by user
         if days is not None and end is not None:
@@ -85,7 +149,16 @@ class Data:
         self.begin = math.ceil(self.begin / candle_size) * candle_size
         self.end = math.ceil(self.end / candle_size) * candle_size
         self.fine_data = None
+        self.high_res = None
         self.api_key = api_key
+        self.compact = compact
+        self.pyramid = pyramid
+        self.timeframes = {}
+        self.ring = None
+        self.lazy = lazy
+        # (index_key, begin, end) of the store slice raw_candles views, if any
+        self.store = None
+        self.views = None
 
         if self.pool is not None and exchange != "bitshares":
             raise ValueError(
@@ -95,7 +168,9 @@ class Data:
         self.raw_candles = {}
 
         self.intermediary = intermediary
-        if not placeholder:
+        if not placeholder and lazy and intermediary is None and not compact:
+            self.map_candles()
+        if not placeholder and self.store is None:
             if intermediary is None:
                 self.raw_candles = self.retrieve_and_cache_candles(
                     self.candle_size, self.asset, self.currency
@@ -103,12 +178,15 @@ class Data:
             else:
                 if DETAIL:
                     print(f"Using {intermediary} to create implied price...")
+                # ASSET/INTERMEDIARY over CURRENCY/INTERMEDIARY
                 self.raw_candles = implied(
                     self.retrieve_and_cache_candles(
                         self.candle_size, self.asset, self.intermediary
                     ),
-                    self.retrieve_and_cache_candles(
-                        self.candle_size, self.intermediary, self.currency
+                    invert(
+                        self.retrieve_and_cache_candles(
+                            self.candle_size, self.intermediary, self.currency
+                        )
                     ),
                 )
 
@@ -119,11 +197,71 @@ class Data:
 
                 self.begin = np.min(self.raw_candles["unix"])
                 self.end = np.max(self.raw_candles["unix"])
+
+            if self.compact:
+                self.raw_candles = compact_candles(self.raw_candles)
+            if self.pyramid:
+                self.build_pyramid()
             # else:
             #     raise RuntimeError(
             #         f"{self.exchange} does not provide {self.asset}/{self.currency} for this time range."
             #     )
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self.store is not None and self.raw_candles is self.views:
+            # pickle where the candles are, not the candles themselves
+            state["raw_candles"] = state["views"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.store is not None and self.raw_candles is None:
+            self.views = read_candles(*self.store)
+            self.raw_candles = self.views
+
+    def map_candles(self):
+        """
+        Point raw_candles at memory-mapped views of the [begin, end] slice of the
+        candle store, first gathering whatever the store is missing of it.
+
+        Returns:
+        - True if the candles are now views of the store; False if this series
+          cannot be viewed without converting it, i.e. it is cached inverted.
+        """
+        index = read_cache_json("data_index.json")
+        index_key, inverted = self.index_key(
+            index, self.candle_size, self.asset, self.currency
+        )
+        if inverted:
+            return False
+        intervals = index_intervals(index.get(index_key, []), self.candle_size)
+        if missing_intervals(intervals, self.begin, self.end, self.candle_size):
+            self.retrieve_and_cache_candles(self.candle_size, self.asset, self.currency)
+        views = read_candles(index_key, self.begin, self.end)
+        if views is None or not len(views["unix"]):
+            return False
+        self.store = (index_key, self.begin, self.end)
+        self.views = views
+        self.raw_candles = views
+        # sorted, so this touches two pages rather than the whole column
+        self.begin = float(views["unix"][0])
+        self.end = float(views["unix"][-1])
+        if self.pyramid:
+            self.build_pyramid()
+        return True
+
+    def materialize(self):
+        """
+        Copy memory-mapped candles into memory, i.e. before modifying them in place.
+
+        Returns:
+        - This Data object.
+        """
+        self.raw_candles = {k: np.array(v) for k, v in self.raw_candles.items()}
+        self.store = self.views = None
+        return self
+
     def __repr__(self):
         """
         <Data object>({candles} candles of data from {exchange}; {begin} to {end}; last price is {last})
@@ -150,7 +288,7 @@ class Data:
         Re-initialize this class with new start and end.  This method is provided mostly
         for papertrade and live modes where the backend needs to get fresh data.
         """
-        self.raw_candles = Data(
+        fresh = Data(
             exchange=self.exchange,
             asset=self.asset,
             currency=self.currency,
@@ -160,9 +298,128 @@ class Data:
             pool=self.pool,
             api_key=self.api_key,
             intermediary=self.intermediary,
-        ).raw_candles
+            compact=self.compact,
+            lazy=self.lazy,
+        )
+        self.raw_candles = fresh.raw_candles
+        self.store = fresh.store
+        self.views = fresh.views
         self.begin = begin
         self.end = end
+        self.ring = None
+        self.timeframes = {}
+        if self.pyramid:
+            self.build_pyramid()
+
+    def append_latest(self, now=None):
+        """
+        Fetch only the candles newer than the last one held and append them to a
+        fixed length ring buffer of the current window (see CandleRing), persisting
+        them with an append-only write to the candle store.  This is the cheap
+        per-tick counterpart of update_candles() for papertrade and live modes.
+
+        Parameters:
+        - now: Optional unix time to fetch up to; defaults to the current time.
+
+        Returns:
+        - Dictionary of the candles appended, possibly empty.
+        """
+        now = int(time.time()) if now is None else int(now)
+        if self.ring is None:
+            self.ring = CandleRing(self.raw_candles)
+        since = float(self.raw_candles["unix"][-1])
+
+        if self.intermediary is None:
+            new = self.fetch_latest(since, now, self.asset, self.currency)
+        else:
+            # ASSET/INTERMEDIARY over CURRENCY/INTERMEDIARY, as in __init__
+            new = implied(
+                self.fetch_latest(since, now, self.asset, self.intermediary),
+                invert(self.fetch_latest(since, now, self.intermediary, self.currency)),
+            )
+        if not len(new["unix"]):
+            return new
+
+        if "candle_size" in self.ring.columns:
+            new["candle_size"] = np.full(len(new["unix"]), self.candle_size)
+        if self.compact:
+            new = compact_candles(new)
+        self.ring.extend(new)
+        self.raw_candles = self.ring.view()
+        self.begin = self.raw_candles["unix"][0]
+        self.end = self.raw_candles["unix"][-1]
+        self.timeframes = {}
+        if self.pyramid:
+            self.build_pyramid()
+        return new
+
+    def fetch_latest(self, since, now, asset, currency):
+        """
+        Gather the complete candles after `since` for one pair and append them to
+        the candle store.
+
+        Returns:
+        - Dictionary of candle arrays, in the orientation asked for.
+        """
+        candle_size = self.candle_size
+        last_complete = (now // candle_size - 1) * candle_size
+        new = self.gather_data(candle_size, since + candle_size, now, asset, currency)
+        new = {k: np.asarray(v) for k, v in new.items()}
+        if len(new["unix"]):
+            new["unix"] = quantize_unix(new["unix"], candle_size)
+        keep = (new["unix"] > since) & (new["unix"] <= last_complete)
+        new = {k: v[keep] for k, v in new.items()}
+        if not len(new["unix"]):
+            return new
+
+        with CACHE_LOCK:
+            index_key, inverted = self.index_key(
+                read_cache_json("data_index.json"), candle_size, asset, currency
+            )
+            # newer than everything stored, so this is an append in place
+            write_candles(index_key, invert(new) if inverted else new, candle_size)
+            add_coverage(index_key, new["unix"][0], new["unix"][-1], candle_size)
+        return new
+
+    def build_pyramid(self, sizes=None):
+        """
+        Resample the candles to a pyramid of larger timeframes in one pass and cache it.
+
+        Parameters:
+        - sizes: Optional list of candle sizes; by default the `pyramid` option if it
+          is a list, else qtradex.public.utilities.PYRAMID.
+
+        Returns:
+        - Dictionary of {candle_size: candles}.
+        """
+        if sizes is None and not isinstance(self.pyramid, bool):
+            sizes = self.pyramid
+        self.timeframes = build_pyramid(self.raw_candles, self.candle_size, sizes)
+        return self.timeframes
+
+    def timeframe(self, candle_size):
+        """
+        Return these candles at a larger resolution, resampling at most once per size.
+
+        Parameters:
+        - candle_size: A multiple of this Data's candle size.
+
+        Returns:
+        - A candle dictionary labeled by the start of each candle.
+        """
+        candle_size = int(candle_size)
+        if candle_size % self.candle_size:
+            raise ValueError(
+                f"Cannot build {candle_size} candles from {self.candle_size} candles."
+            )
+        self.timeframes.setdefault(self.candle_size, self.raw_candles)
+        if candle_size not in self.timeframes:
+            # resample from the largest cached timeframe that divides this one
+            source = max(i for i in self.timeframes if candle_size % i == 0)
+            self.timeframes[candle_size] = resample(
+                self.timeframes[source], candle_size
+            )
+        return self.timeframes[candle_size]
 
     def keys(self):
         return self.raw_candles.keys()
@@ -173,188 +430,204 @@ class Data:
     def items(self):
         return self.raw_candles.items()
 
+    def index_key(self, index, candle_size, asset, currency):
+        """
+        Return the data index key of a series and whether it is cached inverted,
+        reusing the key of the inverse pair if that is what has been cached.
+        """
+        index_key = str((self.exchange, self.pool, candle_size, asset, currency))
+        rev_index_key = str((self.exchange, self.pool, candle_size, currency, asset))
+        inverted = rev_index_key in index and index_key not in index
+        return (rev_index_key if inverted else index_key), inverted
+
     def retrieve_and_cache_candles(self, candle_size, asset, currency):
         """
         Retrieves and caches candlestick data for the specified exchange, asset, and currency
-        over a given time range. If the data for the requested time range already exists in cache,
-        it will either merge the cached data with new data or use the cache entirely, depending on
-        the overlap between the cached and requested time ranges. The method ensures that only the
-        relevant data is gathered, merged, and returned, while also maintaining a persistent index
-        for future reference.
+        over a given time range.  The data index stores, for every (exchange, pool,
+        candle_size, pair), the sorted set of time intervals that have already been
+        fetched; only the sub-ranges of the request that fall outside of those intervals
+        are gathered from the exchange, and they are merged with the cached candles
+        without discarding anything.
 
         Steps:
-        1. Check if the data index exists and load it. If not, initialize a new index.
-        2. Construct a unique key based on the exchange, asset, and currency.
-        3. If data for the given key is not in the cache, gather new data.
-        4. If data is cached, determine the overlap with the requested time range and handle merging
-           or retrieving the necessary data.
-        5. Merge new and cached data if needed, clip the data to the requested time range,
-           and update the cache.
-        6. Update the data index to reflect the time range of the newly fetched data.
+        1. Load the data index and the minimum time cache, initializing them if needed.
+        2. Construct a unique key based on the exchange, pool, candle size and pair,
+           reusing the key of the inverse pair if that is what has been cached.
+        3. Read the cached candles for the requested range from the candle store.
+        4. Compute the sub-ranges of the request missing from the covered intervals and
+           gather only those, respecting the minimum time the exchange provides.
+        5. Merge new and cached data, write the new candles to the store, and clip the
+           data to the requested time range.
+        6. Add the newly covered intervals to the data index.
 
         Side Effects:
-        - Writes new or updated data to `data_index.json` and `"{index_key} candles.json"`.
+        - Writes new or updated data to `data_index.json` and the binary candle store
+          (see qtradex.public.candle_store).
         - The `self.raw_candles` attribute is updated with the relevant data.
 
         Raises:
-        - RuntimeError: If an unexpected condition occurs during the time range checks (should not happen).
+        - TimeoutError: If the exchange does not provide any data for this time range.
         """
-        # try to get the index, otherwise initialize it
-        try:
-            index = json_ipc("data_index.json")
-        except FileNotFoundError:
-            json_ipc("data_index.json", "{}")
-            index = {}
-        # try to get the minimum time period cache, otherwise initialize it
-        try:
-            min_time = json_ipc("min_time.json")
-        except FileNotFoundError:
-            json_ipc("min_time.json", "{}")
-            min_time = {}
-        index_key = str((self.exchange, self.pool, candle_size, asset, currency))
-        rev_index_key = str((self.exchange, self.pool, candle_size, currency, asset))
-        total_time = [self.begin, self.end]
-        raw_candles = None
-        # if the exchange hasn't been queried before for this pair or its inverse
-        if index_key not in index and rev_index_key not in index:
-            # gather data
-            if DETAIL:
-                print(
-                    f"gather: {total_time}  use_cache: N/A  @ {candle_size}, {index_key}"
-                )
-            raw_candles = self.gather_data(
-                candle_size, self.begin, self.end, asset, currency
+        # get the index and the minimum time period cache
+        index = read_cache_json("data_index.json")
+        min_time = read_cache_json("min_time.json")
+        index_key, inverted = self.index_key(index, candle_size, asset, currency)
+
+        # the intervals we have already fetched
+        intervals = index_intervals(index.get(index_key, []), candle_size)
+        cached = None
+        if intervals:
+            # memory-mapped read of only the cached candles we need
+            cached = read_candles(
+                index_key, self.begin - candle_size, self.end + candle_size
             )
-        else:
-            inverted = rev_index_key in index
-            index_key = rev_index_key if inverted else index_key
-            # localize
-            time_range = [quantize_unix(i, candle_size) for i in index[index_key]]
-            if DETAIL:
-                print(time_range)
-                print(total_time)
-            gather = None
-            use_cache = False
-            erase_cache = False
-            # completely before or after what we need
-            if time_range[1] < self.begin or time_range[0] > self.end:
-                gather = [[self.begin, self.end]]
-                # TODO if we don't erase the cache here it would leave data gaps
-                #      but that should be detected and filled, not overwritten
-                #      The difficulty is only filling that gap when it is actually
-                #      asked for.
-                erase_cache = True
-
-            # within the range of what we need
-            elif time_range[0] > self.begin and time_range[1] < self.end:
-                # Make two queries to get the data "around" what we already have
-                gather = [
-                    [self.begin, time_range[0] + candle_size],
-                    [time_range[1] - candle_size, self.end],
-                ]
-                use_cache = True # time_range[:]
-
-            # covers the end of what we need but not the beginning
-            elif time_range[0] > self.begin and time_range[1] >= self.end:
-                gather = [[self.begin, time_range[0] + candle_size]]
-                use_cache = True # [time_range[0], self.end]
-
-            # covers the beginning of what we need but not the end
-            elif time_range[0] <= self.begin and time_range[1] < self.end:
-                gather = [[time_range[1] - candle_size, self.end]]
-                use_cache = True # [self.begin, time_range[1]]
-
-            # all of what we need and potentially more
-            elif time_range[0] <= self.begin and time_range[1] >= self.end:
-                use_cache = True # [self.begin, self.end]
-
-            else:
-                raise RuntimeError(
-                    f"THIS SHOULD NOT HAPPEN!  Debug info: {time_range}, {self.begin} {self.end}"
+            if cached is None:
+                # indexed but missing from the store, start over
+                intervals = []
+            elif inverted:
+                cached = invert(cached)
+
+        gather = missing_intervals(intervals, self.begin, self.end, candle_size)
+        if DETAIL:
+            print(f"covered: {intervals}  gather: {gather}  @ {candle_size}, {index_key}")
+
+        # gather up only the missing data
+        fetched = []
+        covered = []
+        last_complete = (time.time() // candle_size - 1) * candle_size
+        for raw_batch in gather:
+            # overlap a candle on either side so the edges merge cleanly
+            raw_batch = [raw_batch[0] - candle_size, raw_batch[1] + candle_size]
+            batch = [max(i, min_time.get(index_key, 0)) for i in raw_batch]
+            if batch[0] == batch[1]:
+                if DETAIL:
+                    print(
+                        f"Cannot fetch {raw_batch}, cache says this exchange does not go this far back"
+                    )
+                continue
+            fetched.append(
+                self.gather_data(
+                    candle_size,
+                    *batch,
+                    asset,
+                    currency,
+                    on_page=partial(
+                        self.journal_page,
+                        index_key,
+                        (currency, asset) if inverted else (asset, currency),
+                        candle_size,
+                    ),
                 )
+            )
+            if np.any(fetched[-1]["unix"]):
+                if batch[0] + candle_size < (mindata := min(fetched[-1]["unix"])):
+                    min_time[index_key] = float(
+                        max(min_time.get(index_key, 0), mindata)
+                    )
+            # the exchange has been asked for all of this, up to the last complete candle
+            covered.append([raw_batch[0], min(raw_batch[1], last_complete)])
 
-            data = []
+        data = fetched + ([cached] if cached is not None else [])
+        if not data:
+            raise TimeoutError(
+                f"{self.exchange} does not provide data for this time range."
+            )
+        if len(data) > 1:
             if DETAIL:
-                print(
-                    f"gather: {gather}  use_cache: {use_cache}  @ {candle_size}, {index_key}"
-                )
-            # gather up data from the two sources
-            if gather is not None:
-                for raw_batch in gather:
-                    batch = [max(i, min_time.get(index_key, 0)) for i in raw_batch]
-                    if batch[0] == batch[1]:
-                        if DETAIL:
-                            print(
-                                f"Cannot fetch {raw_batch}, cache says this exchange does not go this far back"
-                            )
-                        continue
-                    data.append(self.gather_data(candle_size, *batch, asset, currency))
-                    if np.any(data[-1]["unix"]):
-                        if batch[0] + candle_size < (mindata := min(data[-1]["unix"])):
-                            min_time[index_key] = float(
-                                max(min_time.get(index_key, 0), mindata)
-                            )
-            if use_cache is not None:
-                data.append(
-                    {
-                        k: np.array(v)
-                        for k, v in json_ipc(f"{index_key} candles.json").items()
-                    }
-                )
-                if inverted:
-                    data[-1] = invert(data[-1])
-
-            candles = dict()
-            if len(data) > 1:
-                if DETAIL:
-                    print(f"Merging {len(data)} candlesets into one...")
-                # merge the two data sources
-                # this will implicitly never happen if erase_cache is True, though
-                # an explicit check might be prudent
-                candles = merge_candles(data, candle_size)
-            else:
-                candles = data[0]
-
-            raw_candles = candles
-            if not erase_cache:
-                total_time = [
-                    min(time_range[0], self.begin),
-                    max(time_range[1], self.end),
-                ]
-            else:
-                total_time = [self.begin, self.end]
-
-        # write the new cache with all the data
+                print(f"Merging {len(data)} candlesets into one...")
+            raw_candles = merge_candles(data, candle_size)
+        else:
+            raw_candles = data[0]
 
-        # if the last candle is incomplete, don't cache it
-        crop = -1 if time.time() - self.end < candle_size else None
-        if crop is not None and DETAIL:
-            print("Cropping last (incomplete) candle from the cache...")
-        # convert numpy arrays to lists and crop if required
-        cache = {k: v[:crop].tolist() for k, v in raw_candles.items()}
-        # find the actual start and end of the cached data
-        try:
-            total_time = [min(cache["unix"]), max(cache["unix"])]
-        except:
+        if not len(raw_candles["unix"]):
             raise TimeoutError(
                 f"{self.exchange} does not provide data for this time range."
             )
-        # cache it
-        json_ipc(f"{index_key} candles.json", json.dumps(cache))
 
         # clip the return data to the requested amount
         raw_candles = clip_to_time_range(raw_candles, self.begin, self.end)
+        if not fetched:
+            return raw_candles
+
+        with CACHE_LOCK:
+            # other threads (i.e. the prefetcher) may have cached this series since
+            # the index was read, so re-read it and merge rather than overwrite
+            fresh_index = read_cache_json("data_index.json")
+            if fresh_index.get(index_key) != index.get(index_key):
+                intervals = merge_intervals(
+                    intervals
+                    + index_intervals(fresh_index.get(index_key, []), candle_size),
+                    candle_size,
+                )
+            # upsert what was fetched into the binary store, in the orientation it
+            # is indexed by; candles read from the store are already there
+            for batch in fetched:
+                # if the last candle is incomplete, don't cache it
+                complete = np.asarray(batch["unix"]) <= last_complete
+                if not np.any(complete):
+                    continue
+                batch = {k: np.asarray(v)[complete] for k, v in batch.items()}
+                write_candles(
+                    index_key,
+                    invert(batch) if inverted else batch,
+                    candle_size,
+                    replace=not intervals,
+                )
+                intervals = intervals or [[batch["unix"][0], batch["unix"][0]]]
 
-        json_ipc("min_time.json", json.dumps(min_time))
+            if index_key in min_time:
+
+                def update(fresh_min_time):
+                    fresh_min_time[index_key] = max(
+                        fresh_min_time.get(index_key, 0), min_time[index_key]
+                    )
+                    return fresh_min_time
 
-        # stow the start and end in the index
-        if total_time is not None:
-            index[index_key] = total_time
-            json_ipc("data_index.json", json.dumps(index))
+                json_update("min_time.json", update)
+
+            # fold the journaled pages of this download into the columns
+            compact_journal(index_key)
+
+            # stow the covered intervals in the index
+            intervals = intervals + [i for i in covered if i[0] <= i[1]]
+            if intervals:
+                set_coverage(index_key, intervals, candle_size)
 
         return raw_candles
 
-    def gather_data(self, candle_size, begin, end, asset, currency, inverted=False):
+    def journal_page(self, index_key, key_pair, candle_size, page, asset, currency):
+        """
+        Persist one page of a download in progress and mark it as covered, so an
+        interrupted download resumes where it stopped instead of starting over.
+
+        Parameters:
+        - index_key: The data index key the page belongs to.
+        - key_pair: The (asset, currency) orientation of `index_key`.
+        - candle_size: The candle size of the series.
+        - page: Dictionary of candle arrays as returned by the exchange.
+        - asset, currency: The pair the page was actually requested as.
+        """
+        # if the last candle is incomplete, don't cache it
+        complete = page["unix"] <= (time.time() // candle_size - 1) * candle_size
+        if not np.any(complete):
+            return
+        page = {k: np.asarray(v)[complete] for k, v in page.items()}
+        if (asset, currency) != tuple(key_pair):
+            page = invert(page)
+        with CACHE_LOCK:
+            journal_candles(index_key, page, candle_size)
+            add_coverage(index_key, page["unix"][0], page["unix"][-1], candle_size)
+
+    def gather_data(
+        self,
+        candle_size,
+        begin,
+        end,
+        asset,
+        currency,
+        inverted=False,
+        on_page=None,
+    ):
         """
         Gathers historical candlestick data for a specified asset and currency pair
         from a variety of supported exchanges and APIs. The method checks the
@@ -368,6 +641,8 @@ class Data:
                          typically a Unix timestamp.
             end (int): The end of the time range for the candlestick data,
                        typically a Unix timestamp.
+            on_page (callable): Optional `on_page(page, asset=, currency=)` called
+                       with every page of a paginated (ccxt) download as it arrives.
 
         Returns:
             dict: A dictionary containing the raw candlestick data, where the
@@ -431,6 +706,9 @@ class Data:
                     begin,
                     end,
                     candle_size,
+                    on_page=None
+                    if on_page is None
+                    else partial(on_page, asset=asset, currency=currency),
                 )
             else:
                 raise ValueError(f"Invalid exchange {self.exchange}")
@@ -470,6 +748,12 @@ class Data:
             asset, currency = currency, asset
             return invert(
                 self.gather_data(
-                    candle_size, begin, end, asset, currency, inverted=True
+                    candle_size,
+                    begin,
+                    end,
+                    asset,
+                    currency,
+                    inverted=True,
+                    on_page=on_page,
                 )
             )
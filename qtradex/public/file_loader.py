@@ -1,13 +1,14 @@
-import hashlib
-import json
+import os
+import time
 from typing import Optional
 
-import jsonpickle
 import numpy as np
-from qtradex.common.utilities import (PATH, json_ipc, parse_date, read_file,
-                                      write_file)
-from qtradex.public.data import Data
-from qtradex.public.utilities import clip_to_time_range
+from qtradex.common.json_ipc import json_update
+from qtradex.common.utilities import parse_date
+from qtradex.public.candle_store import (read_candles, read_metadata,
+                                         write_candles, write_metadata)
+from qtradex.public.data import CACHE_LOCK, Data, add_coverage
+from qtradex.public.utilities import reaggregate
 
 DETAIL = True
 
@@ -26,12 +27,16 @@ def load_csv(
     end: Optional[str] = None,
     candle_size: int = 86400,  # Default to daily candles, as in load_csv
     stride: int = None,
+    keys=("unix", "price", "volume"),
 ) -> Data:
     """
     Retrieves and caches candlestick data from a CSV file. If the data is already cached for the given parameters,
-    it returns the cached version. Otherwise, it loads the data using load_csv, caches it, and returns it.
+    it returns the cached version. Otherwise, it loads the data using load_fresh_data, caches it, and returns it.
 
-    This function uses a unique key and handles persistence via JSON files, similar to the original caching mechanism.
+    The cache is the binary candle store (see qtradex.public.candle_store): the file is
+    imported once as memory-mappable columns, with a small metadata record of the
+    file's size, modification time, keys and imported range, and every call after
+    that reads only the slice of columns it asks for.
 
     Args:
     - exchange: The exchange name (e.g., 'kraken').
@@ -41,205 +46,263 @@ def load_csv(
     - begin: Start time for data (e.g., '2019-07-01').
     - end: End time for data (e.g., '2020-01-01').
     - candle_size: The size of each candle in seconds.
+    - stride: Optional step between candles in seconds, see load_fresh_data.
+    - keys: Name of every column of the file, see import_csv.
 
     Returns:
     - A Data object containing the candlestick data.
 
     Raises:
-    - FileNotFoundError: If the CSV file or cache files are inaccessible.
-    - ValueError: If there's an issue with parameters or serialization.
+    - FileNotFoundError: If the CSV file is inaccessible.
+    - ValueError: If there's an issue with parameters or the file holds no rows in range.
     """
-    begin, end = parse_date(begin), parse_date(end)
-    # Generate a unique index key, similar to the original function
-    index_key = hashlib.md5(
-        str((exchange, asset, currency, candle_size, stride, filepath)).encode()
-    ).hexdigest()
+    begin = float("-inf") if begin is None else parse_date(begin)
+    end = float("inf") if end is None else parse_date(end)
+    stride = candle_size if stride is None else stride
+    index_key = csv_index_key(exchange, asset, currency, filepath, stride)
+
+    metadata = read_metadata(index_key)
+    source = source_metadata(filepath, keys)
+    if (
+        metadata is None
+        or metadata["source"] != source
+        or not metadata["begin"] <= begin <= end <= metadata["end"]
+    ):
+        # No cache, the file changed or the range isn't covered: load fresh data
+        return load_fresh_data(
+            exchange, asset, currency, filepath, begin, end, candle_size, stride, keys
+        )
 
-    # Load or initialize the data index
-    try:
-        index = json_ipc("data_index.json")  # Rely on json_ipc to handle the path
-    except FileNotFoundError:
-        json_ipc("data_index.json", "{}")  # Create an empty index
-        index = " {}\n"
-    total_time = [begin, end]  # Track the requested time range
-
-    if index_key in index:
-        # Cached data exists; check if it covers the requested range
-        cached_range = index[index_key]  # e.g., [start_timestamp, end_timestamp]
-        if ranges_overlap(cached_range, [begin, end]):
-            # Return cached data if there's overlap
-            data = load_from_cache(index_key)
-            data.raw_candles = clip_to_time_range(data.raw_candles, begin, end)
-            data.fine_data = clip_to_time_range(data.fine_data, begin, end)
-            data.begin = begin
-            data.end = end
-            data.days = (end - begin) / 86400
-            return data
-        else:
-            # Cached range doesn't fully cover; need to reload
-            print("Partial overlap detected; reloading for full range.")
+    # memory-mapped read of only the cached candles we need
+    fine = read_candles(index_key, begin, end)
+    if fine is None or not len(fine["unix"]):
+        raise ValueError(f"{filepath} holds no rows in the requested time range")
+    return csv_data(exchange, asset, currency, fine, candle_size, stride)
 
-    # No cache or needs update: Load fresh data
-    import_data = load_fresh_data(
-        exchange, asset, currency, filepath, begin, end, candle_size, stride
-    )
 
-    # Cache the data
-    cache_data(index_key, import_data, total_time)
+CHUNKSIZE = 1_000_000
 
-    return import_data  # Return the freshly loaded Data object
 
+def aggregate_rows(unix, prices, volume, candle_size):
+    """
+    Vectorized bucketing of time ordered rows into candles.
 
-def load_fresh_data(
-    exchange: str,
-    asset: str,
-    currency: str,
-    filepath: str,
-    begin=None,
-    end=None,
+    Parameters:
+    - unix: Array of timestamps in seconds.
+    - prices: Dictionary of "open", "high", "low" and "close" arrays; for trades,
+      all four are the trade price.
+    - volume: Array of volumes.
+    - candle_size: Width of the candles in seconds.
+
+    Returns:
+    - Dictionary of candle arrays, one candle per occupied bucket.
+    """
+    bucket = unix // candle_size * candle_size
+    # rows of a bucket keep their file order, so open and close are first and last
+    order = np.argsort(bucket, kind="stable")
+    bucket = bucket[order]
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    stops = np.r_[starts[1:], len(bucket)] - 1
+    return {
+        "unix": bucket[starts],
+        "open": prices["open"][order][starts],
+        "high": np.maximum.reduceat(prices["high"][order], starts),
+        "low": np.minimum.reduceat(prices["low"][order], starts),
+        "close": prices["close"][order][stops],
+        "volume": np.add.reduceat(volume[order], starts),
+    }
+
+
+def import_csv(
+    filepath,
+    exchange,
+    asset,
+    currency,
     candle_size=86400,
-    stride=None,  # Optional: stride for candles; defaults to candle_size if not provided
     keys=("unix", "price", "volume"),
-) -> Data:
-    if stride is None:
-        stride = candle_size  # Default to non-overlapping candles
-    else:
-        hold_stride = stride
-        hold_candle_size = candle_size
-        candle_size = stride  # Default to non-overlapping candles
+    begin=None,
+    end=None,
+    chunksize=CHUNKSIZE,
+    index_key=None,
+    replace=False,
+):
+    """
+    Stream a trade or candle CSV into the binary candle store with bounded memory.
+
+    The file is read `chunksize` rows at a time, each chunk is bucketed into candles
+    with numpy (see aggregate_rows) and the completed candles are appended to the
+    store; only the candle still open at the end of a chunk is carried over.  Rows
+    are expected in time order, as exchange exports are; rows older than a candle
+    already written are dropped.
+
+    Parameters:
+    - filepath: Path to the CSV file, with or without a header row.
+    - exchange, asset, currency: The market the file belongs to.
+    - candle_size: Width of the candles to build, in seconds.
+    - keys: Name of every column of the file, in order; a "unix" (or "unix_milli",
+      "unix_micro") column and either "price" or "open", "high", "low" and "close"
+      are required, "volume" is optional (each row counts as 1 without it), other
+      names are ignored.
+    - begin, end: Optional time range to import.
+    - chunksize: Rows held in memory at a time.
+    - index_key: Candle store key to import to; by default the data index key of
+      `Data(exchange, asset, currency, candle_size=candle_size)`, which then reads the
+      imported candles instead of fetching them.
+    - replace: Discard whatever the store holds for `index_key` first.
 
-    keydxes = {key: keys.index(key) for key in keys}
+    Returns:
+    - A tuple of (index_key, [first unix, last unix]), the span being None if the
+      file held no rows in range.
+    """
+    # imported here so backtests that never touch a CSV don't pay for pandas
+    import pandas as pd
+
+    if index_key is None:
+        index_key = str((exchange, None, candle_size, asset, currency))
+    begin = float("-inf") if begin is None else parse_date(begin)
+    end = float("inf") if end is None else parse_date(end)
 
     keys = list(keys)
-    use_discrete = not all(key in keys for key in ["high", "low", "open", "close"])
+    unix_key = next((key for key in keys if key.startswith("unix")), None)
+    if unix_key is None:
+        raise ValueError("No timestamp key found in keys")
+    multiplier = {"unix_milli": 1e3, "unix_micro": 1e6}.get(unix_key, 1)
+    price_keys = (
+        ["open", "high", "low", "close"]
+        if all(key in keys for key in ["open", "high", "low", "close"])
+        else ["price"]
+    )
+    if price_keys[0] not in keys:
+        raise ValueError("keys need a 'price' column or 'open', 'high', 'low', 'close'")
+    wanted = [unix_key, *price_keys] + (["volume"] if "volume" in keys else [])
 
-    # Parse dates
-    if begin is not None:
-        begin = parse_date(begin)
-    else:
-        begin = float("-inf")
-    if end is not None:
-        end = parse_date(end)
-    else:
-        end = float("inf")
-
-    unix_dx = next((i for i, key in enumerate(keys) if "unix" in key), None)
-    if unix_dx is not None:
-        multiplier = (
-            1e3
-            if keys[unix_dx] == "unix_milli"
-            else 1e6
-            if keys[unix_dx] == "unix_micro"
-            else 1
+    # skip a header row up front so clean columns parse straight to floats
+    with open(filepath, "r") as handle:
+        first = handle.readline().split(",")
+    try:
+        float(first[keys.index(unix_key)])
+        skip = 0
+    except (IndexError, ValueError):
+        skip = 1
+
+    reader = pd.read_csv(
+        filepath,
+        header=None,
+        skiprows=skip,
+        usecols=[keys.index(key) for key in wanted],
+        chunksize=chunksize,
+        on_bad_lines="skip",
+        # chunks are bounded already; parse each one in one go
+        low_memory=False,
+    )
+    dprint("Streaming and aggregating data into candles...\n")
+    pending = None
+    span = None
+    dropped = 0
+    for chunk in reader:
+        # malformed rows become NaN and are dropped
+        columns = {
+            key: pd.to_numeric(chunk[keys.index(key)], errors="coerce").to_numpy(
+                dtype=float
+            )
+            for key in wanted
+        }
+        valid = np.all(np.isfinite(np.stack(list(columns.values()))), axis=0)
+        columns = {k: v[valid] for k, v in columns.items()}
+        unix = columns[unix_key] / multiplier
+        in_range = (unix >= begin) & (unix <= end)
+        if len(unix) and not np.any(in_range) and unix.min() > end:
+            dprint("Found timestamp past end date; stopping read.")
+            break
+        prices = {
+            key: columns[key if len(price_keys) == 4 else "price"][in_range]
+            for key in ["open", "high", "low", "close"]
+        }
+        volume = (
+            columns["volume"][in_range]
+            if "volume" in columns
+            else np.ones(int(np.count_nonzero(in_range)))
         )
-        keys[unix_dx] = "unix"
-    else:
-        raise ValueError("No timestamp key found in keys")
+        if not len(volume):
+            continue
+        dprint(f"\033[AProcessing: {time.ctime(unix[in_range][-1])}")
+
+        candles = aggregate_rows(unix[in_range], prices, volume, candle_size)
+        if pending is not None:
+            # candles before the one carried over have been written already
+            fresh = candles["unix"] >= pending["unix"][0]
+            dropped += int(np.count_nonzero(~fresh))
+            candles = {k: v[fresh] for k, v in candles.items()}
+            if len(candles["unix"]) and candles["unix"][0] == pending["unix"][0]:
+                # the chunk boundary split this candle
+                candles["open"][0] = pending["open"][0]
+                candles["high"][0] = max(candles["high"][0], pending["high"][0])
+                candles["low"][0] = min(candles["low"][0], pending["low"][0])
+                candles["volume"][0] += pending["volume"][0]
+            else:
+                candles = {k: np.r_[pending[k], v] for k, v in candles.items()}
+
+        # everything but the last candle is complete
+        pending = {k: v[-1:] for k, v in candles.items()}
+        complete = {k: v[:-1] for k, v in candles.items()}
+        if len(complete["unix"]):
+            span = write_import(index_key, complete, candle_size, span, replace)
+    if pending is not None:
+        span = write_import(index_key, pending, candle_size, span, replace)
+    if dropped:
+        dprint(f"Dropped {dropped} candles of rows out of time order.")
+    return index_key, span
+
+
+def write_import(index_key, candles, candle_size, span, replace):
+    """
+    Append one batch of imported candles to the store and the data index.
 
-    dprint("Reading and aggregating data into candles...\n")
-    candles = []  # List to hold finalized candles
-    current_candle = None  # Will hold the state of the current candle
-    last_printed = time.time()
-    with open(filepath, mode="r", newline="") as file:
-        csv_reader = csv.reader(file)
-        for row in csv_reader:
-            try:
-                ctime = float(row[unix_dx]) / multiplier  # Convert to Unix seconds
-            except (IndexError, ValueError):
-                continue  # Skip malformed rows
-
-            if ctime < begin:
-                continue  # Skip before start
-            if ctime > end:
-                dprint("Found timestamp past end date; stopping read.")
-                break  # Assume ordered data
-
-            if time.time() - last_printed > 0.2:
-                dprint(f"\033[AProcessing: {time.ctime(ctime)}")
-                last_printed = time.time()
-
-            # Determine the candle's start time for this row
-            candle_start = (
-                ctime // stride * stride
-            )  # Floor to the nearest stride boundary
-
-            if (
-                current_candle is None
-                or ctime < current_candle["unix"]
-                or ctime >= current_candle["unix"] + candle_size
-            ):
-                # Finalize the previous candle if it exists
-                if current_candle is not None:
-                    candles.append(current_candle)
-                # Start a new candle
-                if use_discrete:
-                    price = float(row[keydxes["price"]])
-                    current_candle = {
-                        "unix": candle_start,
-                        "open": price,
-                        "high": price,
-                        "low": price,
-                        "close": price,
-                        "volume": 0,
-                    }
-                else:
-                    current_candle = {
-                        "unix": candle_start,
-                        "open": float(row[keydxes["open"]]),
-                        "high": float(row[keydxes["high"]]),
-                        "low": float(row[keydxes["low"]]),
-                        "close": float(row[keydxes["close"]]),
-                        "volume": 0,
-                    }
-                if "volume" in keys:
-                    current_candle["volume"] += float(row[keydxes["volume"]])
-                else:
-                    current_candle["volume"] = 1
-
-            # Update the current candle with this row's data
-            if current_candle and candle_start == current_candle["unix"]:
-                if use_discrete:
-                    prices = (float(row[keydxes["price"]]),)
-                else:
-                    prices = (
-                        float(row[keydxes["open"]]),
-                        float(row[keydxes["high"]]),
-                        float(row[keydxes["low"]]),
-                        float(row[keydxes["close"]]),
-                    )
-                current_candle["high"] = max([current_candle["high"], *prices])
-                current_candle["low"] = min([current_candle["low"], *prices])
-                current_candle["close"] = prices[-1]
-                if "volume" in keys:
-                    current_candle["volume"] += float(row[keydxes["volume"]])
-
-        # After the loop, add the last candle if it exists
-        if current_candle is not None:
-            candles.append(current_candle)
-
-    # Now, candles is a list of dictionaries; convert to NumPy arrays
-    if candles:
-        data = {k: np.array([candle[k] for candle in candles]) for k in candles[0]}
-
-        # Check and reaggregate if needed, as in original
-        if len(data.get("unix", [])) > 1:
-            empirical_size = data["unix"][1] - data["unix"][0]
-            if abs(empirical_size - candle_size) >= 1:
-                dprint("Reaggregating candles...")
-                data = reaggregate(data, candle_size)
-    else:
-        data = {}  # Empty data if no candles were created
+    Returns:
+    - The [first, last] unix span imported so far.
+    """
+    with CACHE_LOCK:
+        write_candles(index_key, candles, candle_size, replace=replace and span is None)
+        first = candles["unix"][0] if span is None else span[0]
+        span = [float(first), float(candles["unix"][-1])]
+        if replace:
+            json_update("data_index.json", lambda index: {**index, index_key: [span]})
+        else:
+            add_coverage(index_key, *span, candle_size)
+    return span
+
+
+def csv_index_key(exchange, asset, currency, filepath, candle_size):
+    """
+    Candle store key of a CSV import; the path of the file takes the place of the pool.
+    """
+    return str((exchange, os.path.abspath(filepath), candle_size, asset, currency))
 
-    # Ensure volume is present
-    if "volume" not in data:
-        data["volume"] = np.ones_like(data.get("unix", np.array([])))
 
-    data = {k: np.array(v) for k, v in data.items()}  # Final conversion to numpy arrays
-    data["candle_size"] = np.full(data["unix"].shape, hold_candle_size)
+def source_metadata(filepath, keys):
+    """
+    Describe a CSV file so a cached import of it can be recognized as stale.
+    """
+    stat = os.stat(filepath)
+    return {
+        "path": os.path.abspath(filepath),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "keys": list(keys),
+    }
 
-    # FIXME: stride is borken, so for now, i'm just reaggregating to get the right stride
-    if hold_stride != hold_candle_size:
-        reagg_data = reaggregate(data, hold_candle_size, hold_stride)
+
+def csv_data(exchange, asset, currency, fine, candle_size, stride):
+    """
+    Build the Data object of a CSV import from its `stride` candles.
+    """
+    data = {k: np.array(v) for k, v in fine.items()}
+    data["candle_size"] = np.full(data["unix"].shape, stride)
+
+    if stride != candle_size:
+        reagg_data = reaggregate(data, candle_size, stride)
+    else:
+        reagg_data = dict(data)
 
     # Create and return the Data object
     data_class = Data(
@@ -252,47 +315,53 @@ def load_fresh_data(
         placeholder=True,
     )
     data_class.raw_candles = reagg_data
-    data["candle_size"] = np.full_like(data["unix"], hold_stride)
     data_class.fine_data = data
-    data_class.base_size = hold_candle_size
-    data_class.candle_size = hold_stride
+    data_class.base_size = candle_size
+    data_class.candle_size = stride
     return data_class
 
 
-def cache_data(index_key: str, data: Data, total_time: list):
-    """Serialize and cache the Data object."""
-    # Convert Data object to a serializable dictionary
-    cache_dict = jsonpickle.encode(data)
-
-    cache_file = (
-        PATH + "pipe/" + f"{index_key}_csv_candles.json"
-    )  # json_ipc will handle the full path
-    write_file(cache_file, cache_dict)  # Save to JSON
-
-    # Update the index with the time range
-    index = json_ipc("data_index.json")
-    index[index_key] = total_time  # Store as [begin, end]
-    json_ipc("data_index.json", json.dumps(index))
-
-
-def load_from_cache(index_key: str) -> Data:
-    """Load and reconstruct a Data object from the cache."""
-    cache_file = f"{index_key}_csv_candles.json"
-    cache_file = PATH + "pipe/" + cache_file
-    cached_data = jsonpickle.decode(json.loads(read_file(cache_file)))
-    return cached_data
-
-
-def ranges_overlap(range1: list, range2: list) -> bool:
-    """Check if two time ranges overlap. Assumes ranges are [start, end] in timestamps."""
-    return not (
-        float(range1[1]) < float(range2[0]) or float(range1[0]) > float(range2[1])
+def load_fresh_data(
+    exchange: str,
+    asset: str,
+    currency: str,
+    filepath: str,
+    begin=None,
+    end=None,
+    candle_size=86400,
+    stride=None,  # Optional: stride for candles; defaults to candle_size if not provided
+    keys=("unix", "price", "volume"),
+) -> Data:
+    if stride is None:
+        stride = candle_size  # Default to non-overlapping candles
+    begin = float("-inf") if begin is None else parse_date(begin)
+    end = float("inf") if end is None else parse_date(end)
+
+    # stream the file into the candle store as `stride` candles, then read back
+    # only the requested range
+    index_key = csv_index_key(exchange, asset, currency, filepath, stride)
+    source = source_metadata(filepath, keys)
+    index_key, span = import_csv(
+        filepath,
+        exchange,
+        asset,
+        currency,
+        stride,
+        keys,
+        begin,
+        end,
+        index_key=index_key,
+        replace=True,
+    )
+    if span is None:
+        raise ValueError(f"{filepath} holds no rows in the requested time range")
+    write_metadata(index_key, {"source": source, "begin": begin, "end": end})
+    return csv_data(
+        exchange, asset, currency, read_candles(index_key, begin, end), candle_size, stride
     )
-
-
 # Example usage:
 if __name__ == "__main__":
-    data = retrieve_and_cache_csv_candles(
+    data = load_csv(
         exchange="kraken",
         asset="BTC",
         currency="USD",
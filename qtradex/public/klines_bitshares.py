@@ -48,7 +48,7 @@ from qtradex.public.kibana import fetch_candles
 from qtradex.public.rpc import (rpc_get_objects, rpc_last,
                                 rpc_lookup_asset_symbols, rpc_market_history,
                                 wss_handshake)
-from qtradex.public.utilities import BadTimeframeError
+from qtradex.public.utilities import BadTimeframeError, normalize_candles
 
 # ======================================================================
 VERSION = "klines_bitshares v0.00000001"
@@ -114,11 +114,12 @@ def interpolate_previous(
     rpc, pair: str, data: Dict[str, List[float]], start: int, stop: int, period: int
 ) -> Dict[str, List[float]]:
     """
-    Converts discrete data (buckets) into continuous klines (candlestick) format.
+    Converts discrete data (buckets) into continuous, normalized klines (candlestick) format.
 
-    This function interpolates market data to fill in missing intervals between `start` and `stop`
-    with the specified `period`. If there are no data points for certain time intervals, the function
-    fills those with the previous available data (or a default value if no prior data exists).
+    Missing intervals between `start` and `stop` are filled with the previous close and
+    extreme outliers are clamped by the shared normalization stage,
+    qtradex.public.utilities.normalize_candles.  If there is no data at all, every
+    period is filled with the last known close price.
 
     Args:
         rpc: The RPC client used to fetch the last known close price if no data is available.
@@ -138,74 +139,35 @@ def interpolate_previous(
     stop = int(stop)
     period = int(period)
 
-    # Initialize a dictionary to store the new data with interpolated values
-    data2 = {
-        "volume": [],
-        "high": [],
-        "low": [],
-        "open": [],
-        "close": [],
-        "unix": [
-            *range(max(int(min(data["unix"])), start), stop + period, period)
-        ],  # Generate timestamps for each period
-    }
-
     # If there is existing data to interpolate from
     if data["unix"]:
-        for unix in data2["unix"]:
-            match = False  # Flag to check if data was found for the current timestamp
-
-            # Loop through the provided data to find a match for the current timestamp
-            for idx, _ in enumerate(data["unix"]):
-                diff = unix - data["unix"][idx]
-                if 0 <= diff < period:
-                    # If the data point fits within this period, add it to the new data
-                    data2["volume"].append(data["volume"][idx])
-                    data2["high"].append(data["high"][idx])
-                    data2["low"].append(data["low"][idx])
-                    data2["open"].append(data["open"][idx])
-                    data2["close"].append(data["close"][idx])
-                    match = True
-                    break  # Exit the inner loop since we found a match
-
-            # If no match was found for the timestamp, fill with previous data or default value
-            if not match:
-                if unix == start:
-                    # If it's the first candle, set the close price as the first data point's close
-                    close = data["close"][0]
-                else:
-                    # Otherwise, interpolate the previous close value
-                    close = data2["close"][-1]
-
-                # Fill in the missing data points with the interpolated value
-                data2["volume"].append(0)
-                data2["high"].append(close)
-                data2["low"].append(close)
-                data2["open"].append(close)
-                data2["close"].append(close)
-
-    else:
-        # If no data exists, fetch the last known close price from RPC
-        close = rpc_last(rpc, pair)
+        report = {}
+        data2 = normalize_candles(
+            data,
+            period,
+            begin=start,
+            end=stop + period,
+            strip=False,
+            report=report,
+        )
         if DETAIL:
-            print(">" * 30, close, "<" * 30)
+            print(report)
+        return {k: v.tolist() for k, v in data2.items()}
 
-        # Fill all time periods with the last known close price
-        for unix in data2["unix"]:
-            data2["volume"].append(0)
-            data2["high"].append(close)
-            data2["low"].append(close)
-            data2["open"].append(close)
-            data2["close"].append(close)
+    # If no data exists, fetch the last known close price from RPC
+    close = rpc_last(rpc, pair)
+    if DETAIL:
+        print(">" * 30, close, "<" * 30)
 
-    # Return the newly created dictionary with interpolated or filled data
+    # Fill all time periods with the last known close price
+    unix = [*range(start, stop + period, period)]
     return {
-        "high": data2["high"],
-        "low": data2["low"],
-        "open": data2["open"],
-        "close": data2["close"],
-        "volume": data2["volume"],
-        "unix": data2["unix"],
+        "high": [close] * len(unix),
+        "low": [close] * len(unix),
+        "open": [close] * len(unix),
+        "close": [close] * len(unix),
+        "volume": [0] * len(unix),
+        "unix": unix,
     }
 
 
@@ -249,53 +211,6 @@ def reformat(data: List[Dict[str, float]]) -> Dict[str, List[float]]:
     return data2
 
 
-def normalize(data: Dict[str, List[float]]) -> Dict[str, List[float]]:
-    """
-    Eliminate extreme outlier data by normalizing the high, low, open, and close prices.
-
-    This function processes market data and normalizes the values for high, low, open, and close
-    prices by removing extreme outliers. The values are adjusted based on their relationships with
-    the open and close prices, ensuring that no values are excessively far from the average.
-
-    Args:
-        data (Dict[str, List[float]]): A dictionary containing market data with keys for 'high', 'low',
-                                       'open', and 'close', each mapping to a list of float values.
-
-    Returns:
-        Dict[str, List[float]]: The normalized market data, with high, low, open, and close values adjusted
-                                 to eliminate extreme outliers.
-    """
-    # Iterate over each index in the close price list (assuming all lists have the same length)
-    for idx in range(len(data["close"])):
-        # Calculate the high and low based on the max and min of open, close, high, and low values
-        high = max(
-            data["high"][idx], data["low"][idx], data["open"][idx], data["close"][idx]
-        )
-        low = min(
-            data["high"][idx], data["low"][idx], data["open"][idx], data["close"][idx]
-        )
-
-        # Normalize the high and low values by capping them at the calculated limits
-        data["high"][idx] = high
-        data["low"][idx] = low
-
-        # Filter out extreme candles, ensuring they are within 0.5x to 2x the open/close average
-        open_close_avg = data["open"][idx] + data["close"][idx]
-
-        data["high"][idx] = min(data["high"][idx], open_close_avg)
-        data["open"][idx] = min(data["open"][idx], open_close_avg)
-        data["close"][idx] = min(data["close"][idx], open_close_avg)
-
-        # Adjust the low, open, and close values to be no lower than 1/4th of the open/close average
-        low_bound = open_close_avg / 4
-
-        data["low"][idx] = max(data["low"][idx], low_bound)
-        data["open"][idx] = max(data["open"][idx], low_bound)
-        data["close"][idx] = max(data["close"][idx], low_bound)
-
-    return data
-
-
 def truncate_depth(data: Dict[str, List[float]], depth: int) -> Dict[str, List[float]]:
     """
     Truncate the data to the specified depth.
@@ -415,10 +330,7 @@ def dexdata(
     # Transform the data from a list of dicts to a dict of lists
     data = reformat(data)
 
-    # Normalize and filter extreme values
-    data = normalize(data)
-
-    # Interpolate missing price data in buckets with no action
+    # Interpolate missing price data in buckets with no action, filter extreme values
     data = interpolate_previous(rpc, f"{asset}:{currency}", data, start, stop, period)
 
     # Limit the data to the requested depth
@@ -484,11 +396,10 @@ def dexdata_pools(
     # Fetch market data from the pool
     data = fetch_candles(rpc, pool, start, stop, period)
 
-    # Process and normalize the data
+    # Process the data
     data = reformat(data)  # Convert from list of dicts to dict of lists
-    data = normalize(data)  # Filter extreme outlier values
 
-    # Interpolate missing data
+    # Interpolate missing data and filter extreme outlier values
     data = interpolate_previous(rpc, f"{asset}:{currency}", data, start, stop, period)
 
     # Truncate data to the requested depth
@@ -1,35 +1,56 @@
+import asyncio
 import math
 import time
 
 import ccxt
 import numpy as np
 from tqdm import tqdm
-from qtradex.common.utilities import (format_timeframe, rotate, to_iso_date,
-                                      trace, unformat_timeframe)
-from qtradex.public.utilities import BadTimeframeError, clip_to_time_range
+from qtradex.common.aio import run_sync, session
+from qtradex.common.utilities import (format_timeframe, to_iso_date, trace,
+                                      unformat_timeframe)
+from qtradex.public.utilities import (BadTimeframeError, clip_to_time_range,
+                                      normalize_candles)
 
 DETAIL = False
 ATTEMPTS = 5
+# pages of one download requested at the same time
+CONCURRENCY = 8
+# show a progress bar per download; the prefetcher shows one for all of them instead
+PROGRESS = True
 
 
-
-def klines_ccxt(exchange, asset, currency, start, end, interval):
+def klines_ccxt(exchange, asset, currency, start, end, interval, on_page=None):
     """
     Input and output normalized requests for candle data.
     Returns a dict with numpy array values for the following keys:
     ["high", "low", "open", "close", "volume", "unix"]
     where unix is int and the remainder are float.
     This is the ideal format for utilizing talib / tulip indicators.
+
+    Blocking wrapper around klines_ccxt_async(); `on_page` is passed on to
+    paginate_candles().
+    """
+    return run_sync(
+        klines_ccxt_async(exchange, asset, currency, start, end, interval, on_page)
+    )
+
+
+async def klines_ccxt_async(
+    exchange, asset, currency, start, end, interval, on_page=None
+):
+    """
+    Coroutine version of klines_ccxt(), using the shared ccxt.async_support session
+    of the exchange (see qtradex.common.aio).
     """
 
     api = {
         "exchange": exchange,
         "pair": f"{asset}/{currency}",
-        "ccxt_hook": getattr(ccxt, exchange)(),
+        "ccxt_hook": await session(exchange),
     }
     if not api["ccxt_hook"].has["fetchOHLCV"]:
         raise ValueError(f"{exchange} does not support klines.")
-    if api["pair"] not in api["ccxt_hook"].load_markets().keys():
+    if api["pair"] not in api["ccxt_hook"].markets.keys():
         raise ValueError(api["pair"])
 
     if end is None:
@@ -51,63 +72,11 @@ def klines_ccxt(exchange, asset, currency, start, end, interval):
         idx += 1
         try:
             # Collect external data in pages if need be
-            data = paginate_candles(api, deep_begin, end, interval)
-            if DETAIL:
-                print(len(data), "paginated with overlap and collated")
-            data = remove_null(data)
-            if DETAIL:
-                print(len(data), "null data removed")
-            data = no_duplicates(data)
-            if DETAIL:
-                print(len(data), "edge match - no duplicates by unix")
-            data = sort_by_unix(data)
+            data = await paginate_candles(api, deep_begin, end, interval, on_page)
             if DETAIL:
-                print(len(data), "edge match - sort by unix")
-            data = rotate(data)
+                print(len(data), "paginated with overlap")
+            data = collate(data, interval)
             if DETAIL:
-                print(
-                    len(data["unix"]),
-                    data["unix"][0],
-                    data["unix"][-1],
-                    "rotation; reformatted to dict of lists",
-                )
-            data = interpolate_previous(data, deep_begin, end, interval)
-            if DETAIL:
-                print(
-                    len(data["unix"]),
-                    len(data["close"]),
-                    "missing buckets to candles interpolated as previous close",
-                )
-            data = {k: np.array(v) for k, v in data.items()}
-            # data = clip_to_time_range(data, start, end)
-            # if DETAIL:
-            #     print(
-            #         len(data["unix"]),
-            #         "windowed to initial start / end request",
-            #     )
-            data = left_strip(data)
-            if DETAIL:
-                print(
-                    len(data["unix"]),
-                    "stripped of empty pre-market candles",
-                )
-            data = normalize(data)
-            if DETAIL:
-                print({k: len(v) for k, v in data.items()})
-            if DETAIL:
-                print("normalized as valid: high is highest, no extremes, etc.")
-            if DETAIL:
-                print("final conversion to dict of numpy arrays:\n")
-                print(
-                    "total items",
-                    len(data),
-                    "/",
-                    len(data["unix"]),
-                    "keys",
-                    data.keys(),
-                    "type",
-                    type(data["unix"]),
-                )
                 print("\n\nRETURNING", exchange.upper(), api["pair"], "CANDLE DATA\n\n")
             return data
         except BadTimeframeError:
@@ -120,8 +89,26 @@ def klines_ccxt(exchange, asset, currency, start, end, interval):
             continue
 
 
+def collate(data, interval):
+    """
+    Turn raw paginated candles into a clean, gapless dict of numpy arrays.
+    """
+    data = page_candles(data)
+    report = {}
+    # the last bucket is still open; it is not gap filled or returned
+    data = normalize_candles(
+        data,
+        interval,
+        end=np.nanmax(data["unix"]) if len(data["unix"]) else None,
+        report=report,
+    )
+    if DETAIL:
+        print(report, "normalized as valid: high is highest, no extremes, etc.")
+    return data
+
+
 # Pagination function
-def paginate_candles(api, start, end, interval):
+async def paginate_candles(api, start, end, interval, on_page=None):
     """
     Paginate requests per maximum request size per exchange.
     Collate responses crudely with overlap.
@@ -129,48 +116,82 @@ def paginate_candles(api, start, end, interval):
     of candles each exchange would return at once. This is now determined
     empirically at runtime.
 
-    Note that `candles` (aka ccxt) doesn't provide for an end time. Thus, this
-    simply queries until enough candles are gathered.
+    Note that `candles` (aka ccxt) doesn't provide for an end time.  Thus, the first
+    page is requested for everything; once it comes back short, its length is the
+    exchange's page size and the pages for the rest of the range are known, so they
+    are requested concurrently, CONCURRENCY at a time; the session's rate limiter
+    spaces them out.
+
+    If given, `on_page` is called with each page as a dict of numpy arrays as soon
+    as it arrives, i.e. to persist a long download so it can resume after a crash.
+    It runs in a worker thread, so its disk I/O does not stall the other pages.
     """
     overlap = 2
 
     # Determine number of candles we require
     total_depth = int(math.ceil((end - start) / float(interval)))
-    depth = total_depth
-    
-    # Attempt to gather all the candles at once
-    data = []
-    
+
     # Create progress bar
     pbar = tqdm(total=total_depth, desc=f"📥 Downloading {api['pair']}", unit=" candles", 
-                bar_format='{desc}: {percentage:3.0f}%|{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]')
-    
-    last_chunk = candles(api, start, interval, limit=depth)
-    data.extend(last_chunk)
-    depth -= len(last_chunk)
-    pbar.update(len(last_chunk))
-    
-    # If that didn't return enough
-    while depth > 0 and last_chunk:
-        # Find how many are left
-        if DETAIL:
-            print(f"Only got {len(last_chunk)} datapoints, {depth} left.")
-        # Tick forward, but leave an `overlap`
-        start += (len(last_chunk) - overlap) * interval
-        # Don't anger the database overlords
-        time.sleep(0.5) # Reduzido de 2.0 para 0.5 para ser menos obstrutivo
-        # Get more candles
-        last_chunk = candles(api, start, interval, limit=depth)
-        data.extend(last_chunk)
-        depth -= len(last_chunk)
-        pbar.update(len(last_chunk))
-    
-    pbar.close()
+                bar_format='{desc}: {percentage:3.0f}%|{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]',
+                disable=not PROGRESS)
+
+    async def collect(page):
+        data.extend(page)
+        pbar.update(len(page))
+        if on_page is not None and page:
+            await asyncio.to_thread(on_page, page_candles(page))
+
+    # at most CONCURRENCY pages are requested at a time
+    limit = asyncio.Semaphore(CONCURRENCY)
+
+    async def fetch(page_start, page_size):
+        async with limit:
+            return await candles(api, page_start, interval, page_size)
+
+    data = []
+    pages = []
+    try:
+        # Attempt to gather all the candles at once
+        first_chunk = await candles(api, start, interval, limit=total_depth)
+        await collect(first_chunk)
+
+        # If that didn't return enough
+        if first_chunk and first_chunk[-1][0] / 1000 + interval < end:
+            page_size = len(first_chunk)
+            if DETAIL:
+                print(f"Only got {page_size} datapoints, paging the rest concurrently.")
+            # Tick forward from the end of the first page, but leave an `overlap`
+            step = max(page_size - overlap, 1) * interval
+            starts = np.arange(
+                first_chunk[-1][0] / 1000 - (overlap - 1) * interval, end, step
+            )
+            pages = [
+                asyncio.ensure_future(fetch(page_start, page_size))
+                for page_start in starts
+            ]
+            for page in asyncio.as_completed(pages):
+                await collect(await page)
+    finally:
+        for page in pages:
+            page.cancel()
+        pbar.close()
     return data
 
 
+def page_candles(page):
+    """
+    Convert raw ccxt rows, [[milliseconds, open, high, low, close, volume], ...],
+    to a dict of numpy arrays keyed by unix seconds.
+    """
+    page = np.array(page, dtype=float).reshape(-1, 6)
+    return {
+        "unix": page[:, 0] / 1000,
+        **dict(zip(["open", "high", "low", "close", "volume"], page[:, 1:].T)),
+    }
+
 
-def candles(api, start, interval, limit):
+async def candles(api, start, interval, limit):
     while True:
         try:
             # initialize the exchange
@@ -183,16 +204,12 @@ def candles(api, start, interval, limit):
                     "Valid timeframes: ",
                     [unformat_timeframe(i) for i in exchange.timeframes.keys()],
                 )
-            page = exchange.fetch_ohlcv(
+            # Don't anger the database overlords; the session throttles requests
+            page = await exchange.fetch_ohlcv(
                 symbol=api["pair"], timeframe=timeframe, since=int(start) * 1000, limit=limit
             )
-            return [
-                {
-                    "unix": i[0] / 1000,
-                    **dict(zip(["open", "high", "low", "close", "volume"], i[1:])),
-                }
-                for i in page
-            ]
+            # drop malformed rows; nulls inside a row are handled by collate()
+            return [i[:6] for i in page if isinstance(i, (list, tuple)) and len(i) >= 6]
         except (
             ccxt.DDoSProtection,
             ccxt.ExchangeNotAvailable,
@@ -201,124 +218,5 @@ def candles(api, start, interval, limit):
         ) as error:
             print(f"Erro CCXT: {type(error).__name__}: {error}")
             print("Pausing for 10 seconds...")
-            time.sleep(10)
+            await asyncio.sleep(10)
             continue
-
-
-# Remove null data function
-def remove_null(data):
-    """
-    Ensure all data in list are dicts with a "unix" key
-    """
-    return [i for i in data if isinstance(i, dict) and "unix" in i]
-
-
-# Remove duplicates function
-def no_duplicates(data):
-    """
-    Ensure no duplicates due to pagination overlap at edges
-    """
-    dup_free = []
-    timestamps = []
-    for item in data:
-        if item["unix"] not in timestamps:
-            timestamps.append(item["unix"])
-            dup_free.append(item)
-
-    return dup_free
-
-
-# Sort by unix timestamp function
-def sort_by_unix(data):
-    """
-    Pagination may still be backwards and segmented; resort by timestamp
-    """
-    return sorted(data, key=lambda k: k["unix"])
-
-
-# Interpolate previous function
-def interpolate_previous(data, start, end, interval):
-    """
-    Candles may be missing; fill them in with previous close
-    """
-    start = int(start)
-    end = int(end)
-    interval = int(interval)
-    ip_unix = list(range(int(min(data["unix"])), int(max(data["unix"])), int(interval)))
-    out = {
-        "high": [],
-        "low": [],
-        "open": [],
-        "close": [],
-        "volume": [],
-        "unix": ip_unix,
-    }
-    for candle in ip_unix:
-        match = False
-        for idx, _ in enumerate(data["unix"]):
-            diff = candle - data["unix"][idx]
-            if 0 <= diff < interval:
-                match = True
-                out["volume"].append(data["volume"][idx])
-                out["high"].append(data["high"][idx])
-                out["low"].append(data["low"][idx])
-                out["open"].append(data["open"][idx])
-                out["close"].append(data["close"][idx])
-                break
-
-        if not match:
-            if candle == start:
-                close = data["close"][0]
-            else:
-                close = out["close"][-1]
-            out["volume"].append(0)
-            out["high"].append(close)
-            out["low"].append(close)
-            out["open"].append(close)
-            out["close"].append(close)
-
-    return out
-
-
-# Left strip function
-def left_strip(data):
-    """
-    Remove no volume candles from the beginning of the dataset.
-    """
-    first_non_zero_index = next(
-        (i for i, v in enumerate(data["volume"]) if v > 0), len(data["volume"])
-    )
-    return {
-        "high": data["high"][first_non_zero_index:],
-        "low": data["low"][first_non_zero_index:],
-        "open": data["open"][first_non_zero_index:],
-        "close": data["close"][first_non_zero_index:],
-        "volume": data["volume"][first_non_zero_index:],
-        "unix": data["unix"][first_non_zero_index:],
-    }
-
-
-# Normalize function
-def normalize(data):
-    """
-    Ensure high is high and low is low.
-    Filter extreme candlesticks at 0.5X to 2X the candlestick average.
-    Ensure open and close are within high and low.
-    """
-    for i in range(len(data["close"])):
-        data["high"][i] = max(
-            data["high"][i], data["low"][i], data["open"][i], data["close"][i]
-        )
-        data["low"][i] = min(
-            data["high"][i], data["low"][i], data["open"][i], data["close"][i]
-        )
-        ocl = (data["open"][i] + data["close"][i] + data["low"][i]) / 3
-        och = (data["open"][i] + data["close"][i] + data["high"][i]) / 3
-        data["high"][i] = min(data["high"][i], 2 * ocl)
-        data["low"][i] = max(data["low"][i], och / 2)
-        data["open"][i] = min(data["open"][i], data["high"][i])
-        data["open"][i] = max(data["open"][i], data["low"][i])
-        data["close"][i] = min(data["close"][i], data["high"][i])
-        data["close"][i] = max(data["close"][i], data["low"][i])
-
-    return data
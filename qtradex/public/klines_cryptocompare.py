@@ -35,6 +35,7 @@ import requests
 
 # EXTINCTION EVENT MODULES
 from qtradex.common.json_ipc import json_ipc
+from qtradex.public.utilities import normalize_candles
 
 # ======================================================================
 VERSION = "klines_cryptocompare v0.00000001"
@@ -286,47 +287,22 @@ def normalize(signal, data: Dict[str, list]) -> None:
     """
     Normalize high, low, open, and close prices in the dataset.
 
-    This function adjusts the high, low, open, and close values to ensure they stay within reasonable limits
-    based on their relationships and ensures extreme price fluctuations are corrected.
+    The daily candles go through the shared normalization stage,
+    qtradex.public.utilities.normalize_candles: gaps are filled with the previous
+    close and extreme price fluctuations are clamped to 0.5X to 2X the open/close
+    average.
 
     Args:
         signal (Value): The multiprocessing signal used to indicate completion.
         data (dict): A dictionary containing 'high', 'low', 'open', 'close', and other data as lists.
 
     Returns:
-        None: The function directly modifies the `data` dictionary in place.
+        None: The normalized data is passed back through json_ipc.
     """
-    for idx in range(len(data["close"])):
-        # Get the maximum and minimum of high, low, open, and close values
-        high = max(
-            data["high"][idx], data["low"][idx], data["open"][idx], data["close"][idx]
-        )
-        low = min(
-            data["high"][idx], data["low"][idx], data["open"][idx], data["close"][idx]
-        )
-
-        # Set high and low to the calculated values
-        data["high"][idx] = high
-        data["low"][idx] = low
-
-        # Apply filtering for extreme price fluctuations based on open/close average
-        open_close_avg = (data["open"][idx] + data["close"][idx]) / 2
-
-        # Apply the 0.5X to 2X range for high/low values and clamp extreme values accordingly
-        data["high"][idx] = min(data["high"][idx], open_close_avg * 2)
-        data["low"][idx] = max(data["low"][idx], open_close_avg / 2)
-
-        # Ensure open/close values are within the same range
-        data["open"][idx] = min(data["open"][idx], open_close_avg * 2)
-        data["close"][idx] = min(data["close"][idx], open_close_avg * 2)
-
-        # Ensure low prices are not too low by restricting them to 0.25x the open/close average
-        data["low"][idx] = max(data["low"][idx], open_close_avg / 4)
-        data["open"][idx] = max(data["open"][idx], open_close_avg / 4)
-        data["close"][idx] = max(data["close"][idx], open_close_avg / 4)
+    data = normalize_candles(data, 86400, strip=False)
 
     # Save the normalized data to a file
-    json_ipc("proxy.txt", json_dumps(data))
+    json_ipc("proxy.txt", json_dumps({k: v.tolist() for k, v in data.items()}))
 
     # Indicate that the process is complete
     signal.value = 1
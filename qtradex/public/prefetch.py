@@ -0,0 +1,128 @@
+"""
+Concurrent bulk download of historical candles into the candle cache.
+
+Warming a universe of pairs for a research run:
+
+    from qtradex.public.prefetch import prefetch
+
+    prefetch(
+        [
+            ("binance", "BTC/USDT", 3600, ("2021-01-01", "2024-01-01")),
+            ("binance", "ETH/USDT", 3600, ("2021-01-01", "2024-01-01")),
+            ("kucoin", "XRP/USDT", 86400, ("2019-01-01", "2024-01-01")),
+        ]
+    )
+
+Every job goes through `Data`, so it lands in the same data index and binary
+candle store any later `Data(...)` reads from, fetching only what is missing.
+Requests to each exchange share one ccxt session and its rate limiter (see
+qtradex.common.aio), so throughput is bounded by the exchanges' rate limits, not
+by serial latency.
+"""
+
+# STANDARD MODULES
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# 3RD PARTY MODULES
+from tqdm import tqdm
+# QTRADEX MODULES
+from qtradex.common.utilities import it
+from qtradex.public import klines_ccxt
+from qtradex.public.data import Data
+
+DETAIL = False
+WORKERS = 8
+ATTEMPTS = 4
+BACKOFF = 2.0
+
+
+def parse_job(job):
+    """
+    Normalize a prefetch job.
+
+    Parameters:
+    - job: (exchange, pair, candle_size, (begin, end)) where pair is "ASSET/CURRENCY"
+      or an (asset, currency) tuple and begin/end are anything `Data` accepts.
+
+    Returns:
+    - Dictionary of `Data` keyword arguments.
+    """
+    exchange, pair, candle_size, (begin, end) = job
+    asset, currency = pair.split("/") if isinstance(pair, str) else pair
+    return {
+        "exchange": exchange,
+        "asset": asset,
+        "currency": currency,
+        "begin": begin,
+        "end": end,
+        "candle_size": candle_size,
+    }
+
+
+def fetch_job(job, attempts=ATTEMPTS, backoff=BACKOFF):
+    """
+    Download one job into the cache, retrying with exponential backoff.
+
+    Returns:
+    - The resulting Data object.
+    """
+    kwargs = parse_job(job)
+    for attempt in range(attempts):
+        try:
+            return Data(**kwargs)
+        except KeyboardInterrupt:
+            raise
+        except Exception as error:
+            if attempt == attempts - 1:
+                raise
+            delay = backoff * 2**attempt
+            if DETAIL:
+                print(
+                    it(
+                        "yellow",
+                        f"{kwargs['exchange']} {kwargs['asset']}/{kwargs['currency']}"
+                        f" failed ({error}), retrying in {delay:.0f}s...",
+                    )
+                )
+            time.sleep(delay)
+
+
+def prefetch(jobs, workers=WORKERS, attempts=ATTEMPTS, backoff=BACKOFF):
+    """
+    Download many (exchange, pair, candle_size, range) jobs concurrently.
+
+    Parameters:
+    - jobs: List of (exchange, pair, candle_size, (begin, end)), see parse_job().
+    - workers: Number of download threads.
+    - attempts: Tries per job before giving up on it.
+    - backoff: Seconds to wait after the first failure, doubling each retry.
+
+    Returns:
+    - Dictionary of {job: Data} for the jobs that succeeded and
+      {job: exception} for those that did not.
+    """
+    jobs = [
+        (exchange, pair if isinstance(pair, str) else tuple(pair), size, tuple(span))
+        for exchange, pair, size, span in jobs
+    ]
+    results = {}
+    # one overall bar instead of one per download
+    progress, klines_ccxt.PROGRESS = klines_ccxt.PROGRESS, False
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(fetch_job, job, attempts, backoff): job for job in jobs
+            }
+            with tqdm(total=len(jobs), desc="📥 Prefetching", unit=" pairs") as pbar:
+                for future in as_completed(futures):
+                    job = futures[future]
+                    try:
+                        results[job] = future.result()
+                    except Exception as error:
+                        results[job] = error
+                        pbar.write(it("red", f"{job[0]} {job[1]}: {error}"))
+                    pbar.update(1)
+    finally:
+        klines_ccxt.PROGRESS = progress
+    return results
@@ -8,7 +8,7 @@ from json import dumps as json_dumps
 from json import loads as json_loads
 
 from qtradex.common.bitshares_nodes import bitshares_nodes
-from qtradex.common.utilities import it, race_read, race_write, to_iso_date, trace
+from qtradex.common.utilities import it, race_read, race_update, to_iso_date, trace
 from websocket import create_connection as wss
 
 
@@ -147,8 +147,8 @@ def id_from_name(rpc, object_name):
     if object_name in precs:
         return precs[object_name]
     prec = rpc_lookup_asset_symbols(rpc, object_name, object_name)[0]["id"]
-    precs[object_name] = prec
-    race_write("ids_to_names.txt", json_dumps(precs))
+    # merge into the file as it is now, not as it was read above
+    race_update("ids_to_names.txt", lambda precs: {**precs, object_name: prec})
     return prec
 
 
@@ -160,8 +160,7 @@ def id_to_name(rpc, object_id):
     if object_id in precs:
         return precs[object_id]
     prec = rpc_get_objects(rpc, object_id)["symbol"]
-    precs[object_id] = prec
-    race_write("names_to_ids.txt", json_dumps(precs))
+    race_update("names_to_ids.txt", lambda precs: {**precs, object_id: prec})
     return prec
 
 
@@ -0,0 +1,152 @@
+"""
+Market data in shared memory for optimizer worker processes.
+
+SharedData copies the candle arrays of a Data object (raw candles, fine data and
+any resampled timeframes) into one `multiprocessing.shared_memory` block, once.
+Workers are handed its `handle`, which pickles to a few hundred bytes whatever
+the size of the dataset, and attach() turns it back into a Data object whose
+arrays are read-only, zero-copy views of the block:
+
+    with SharedData(data) as shared:
+        Process(target=work, args=(shared.handle,)).start()
+        ...
+
+    def work(handle):
+        data = handle.attach()
+
+so memory scales with one dataset instead of one per worker.
+"""
+
+# STANDARD MODULES
+import os
+import sys
+from multiprocessing import shared_memory
+
+# 3RD PARTY MODULES
+import numpy as np
+
+# Data attributes holding arrays (shared) or objects that are not worth shipping
+SHARED = ("raw_candles", "fine_data", "timeframes")
+DROPPED = ("ring", "high_res", "views", "store")
+# bytes; keeps every array cache line aligned
+ALIGN = 64
+# names of the blocks created by this process
+CREATED = set()
+
+
+def open_block(name):
+    """
+    Attach to an existing shared memory block without taking ownership of it.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    block = shared_memory.SharedMemory(name=name)
+    if os.name == "posix" and name not in CREATED:
+        # before 3.13 attaching registers the block with this process' resource
+        # tracker, which would unlink it from under everyone when the worker exits
+        from multiprocessing import resource_tracker
+
+        resource_tracker.unregister(block._name, "shared_memory")
+    return block
+
+
+class SharedDataHandle:
+    """
+    Picklable description of a SharedData block; see attach().
+    """
+
+    def __init__(self, name, layout, cls, attributes):
+        self.name = name
+        self.layout = layout
+        self.cls = cls
+        self.attributes = attributes
+
+    def attach(self):
+        """
+        Rebuild the shared Data object as read-only views of the shared block.
+
+        Returns:
+        - A Data object; it keeps the block mapped for as long as it lives.
+        """
+        block = open_block(self.name)
+        groups = {"raw_candles": {}, "fine_data": {}, "timeframes": {}}
+        for (group, size, key), dtype, shape, offset in self.layout:
+            view = np.ndarray(shape, np.dtype(dtype), buffer=block.buf, offset=offset)
+            view.flags.writeable = False
+            if group == "timeframes":
+                groups[group].setdefault(size, {})[key] = view
+            else:
+                groups[group][key] = view
+        data = self.cls.__new__(self.cls)
+        data.__dict__.update(self.attributes)
+        data.__dict__.update(dict.fromkeys(DROPPED))
+        data.raw_candles = groups["raw_candles"]
+        data.fine_data = groups["fine_data"] or None
+        data.timeframes = groups["timeframes"]
+        data.shared_block = block
+        return data
+
+
+class SharedData:
+    """
+    Owner of the shared memory block holding a Data object's arrays.
+
+    Use as a context manager, or call close() once the workers are done; the block
+    is freed when both the owner and every attached Data are gone.
+    """
+
+    def __init__(self, data):
+        """
+        Parameters:
+        - data: The Data object to share.
+        """
+        arrays = [
+            (("raw_candles", None, k), v) for k, v in data.raw_candles.items()
+        ]
+        arrays += [
+            (("fine_data", None, k), v) for k, v in (data.fine_data or {}).items()
+        ]
+        arrays += [
+            (("timeframes", size, k), v)
+            for size, candles in getattr(data, "timeframes", {}).items()
+            for k, v in candles.items()
+        ]
+        layout = []
+        offset = 0
+        for path, values in arrays:
+            values = np.asarray(values)
+            offset = -(-offset // ALIGN) * ALIGN
+            layout.append((path, values.dtype.str, values.shape, offset))
+            offset += values.nbytes
+        self.block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        CREATED.add(self.block.name)
+        for (path, dtype, shape, offset), (_, values) in zip(layout, arrays):
+            np.ndarray(shape, np.dtype(dtype), buffer=self.block.buf, offset=offset)[
+                ...
+            ] = values
+        attributes = {
+            k: v
+            for k, v in data.__dict__.items()
+            if k not in SHARED + DROPPED + ("shared_block",)
+        }
+        self.handle = SharedDataHandle(self.block.name, layout, type(data), attributes)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Release the block; attached Data objects keep their mapping until collected.
+        """
+        if self.block is None:
+            return
+        self.block.close()
+        try:
+            self.block.unlink()
+        except FileNotFoundError:
+            pass
+        CREATED.discard(self.block.name)
+        self.block = None
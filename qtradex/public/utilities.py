@@ -3,6 +3,7 @@ Klines specific utilities
 """
 
 import itertools
+import time
 
 import matplotlib.pyplot as plt
 import numpy as np
@@ -65,7 +66,36 @@ def invert(candles):
         }
 
 
-def implied(candles1, candles2):
+def align(candles1, candles2, how="inner"):
+    """
+    Align two candle series on their timestamps.
+
+    Parameters:
+    - candles1, candles2: Candle dictionaries sorted by unique "unix".
+    - how: "inner" keeps only timestamps present in both series; "asof" keeps every
+      timestamp of candles1 and pairs it with the latest candle of candles2 at or
+      before it, dropping those that precede candles2 entirely.
+
+    Returns:
+    - A tuple of the two candle dictionaries, row for row on the same "unix".
+    """
+    unix1 = np.asarray(candles1["unix"])
+    unix2 = np.asarray(candles2["unix"])
+    if how == "inner":
+        _, idx1, idx2 = np.intersect1d(unix1, unix2, return_indices=True)
+    elif how == "asof":
+        idx2 = np.searchsorted(unix2, unix1, side="right") - 1
+        idx1 = np.flatnonzero(idx2 >= 0)
+        idx2 = idx2[idx1]
+    else:
+        raise ValueError(f"Unknown join {how!r}, use 'inner' or 'asof'.")
+    return (
+        {k: np.asarray(v)[idx1] for k, v in candles1.items()},
+        {k: np.asarray(v)[idx2] for k, v in candles2.items()},
+    )
+
+
+def implied(candles1, candles2, how="inner"):
     """
     Take two sets of candles, in format
     {
@@ -76,60 +106,100 @@ def implied(candles1, candles2):
         "close": np.ndarray(np.float64),
         "volume": np.ndarray(np.float64),
     }
-    and return the implied price.
+    both quoted in the same currency, and return the implied price of one in the other.
     For example, if candles1 represents XRP/BTC
-    and candles2 represents BTC/XLM,
+    and candles2 represents XLM/BTC,
     this function should return the implied candles for XRP/XLM.
+
+    The two series are joined on "unix" (see align()) rather than by position.
     """
+    candles1, candles2 = align(candles1, candles2, how)
+    d1_h, d2_h = candles1["high"], candles2["high"]
+    d1_l, d2_l = candles1["low"], candles2["low"]
+    d1_o, d2_o = candles1["open"], candles2["open"]
+    d1_c, d2_c = candles1["close"], candles2["close"]
+
+    # Calculate synthesized close and open values
+    _close = d1_c / d2_c
+    _open = d1_o / d2_o
 
-    # Ensure the datasets are the same length by truncating to the smaller length
-    minlen = min(len(candles1["unix"]), len(candles2["unix"]))
-    candles1 = {k: v[-minlen:] for k, v in candles1.items()}
-    candles2 = {k: v[-minlen:] for k, v in candles2.items()}
+    # Use the synthesis strategy for high/low calculations
+    _high, _low = synthesize_high_low(d1_h, d2_h, d1_l, d2_l, d1_o, d2_o, d1_c, d2_c)
 
-    # Create a new dataset with synthesized data
-    implied_candles = {
-        "unix": [],
-        "close": [],
-        "high": [],
-        "low": [],
-        "open": [],
-        "volume": [],
+    # Ensure high is the maximum and low is the minimum
+    _low = np.minimum.reduce([_high, _low, _open, _close])
+    _high = np.maximum.reduce([_high, _low, _open, _close])
+
+    return {
+        "unix": candles1["unix"],
+        "close": _close,
+        "high": _high,
+        "low": _low,
+        "open": _open,
+        # Assuming 'volume' is the same in both datasets for the implied price.
+        "volume": candles1["volume"],
     }
 
-    for idx in range(minlen):
-        # Extract the necessary values for synthesis
-        d1_h, d2_h = candles1["high"][idx], candles2["high"][idx]
-        d1_l, d2_l = candles1["low"][idx], candles2["low"][idx]
-        d1_o, d2_o = candles1["open"][idx], candles2["open"][idx]
-        d1_c, d2_c = candles1["close"][idx], candles2["close"][idx]
-        unix = candles1["unix"][idx]
-
-        # Calculate synthesized close and open values
-        _close = d1_c / d2_c
-        _open = d1_o / d2_o
-
-        # Use the synthesis strategy for high/low calculations
-        _high, _low = synthesize_high_low(
-            d1_h, d2_h, d1_l, d2_l, d1_o, d2_o, d1_c, d2_c
-        )
 
-        # Ensure high is the maximum and low is the minimum
-        _low = min(_high, _low, _open, _close)
-        _high = max(_high, _low, _open, _close)
+def triangulate(legs, how="inner"):
+    """
+    Build every implied cross from a set of pairs quoted in a common currency.
 
-        # Assuming 'volume' is the same in both datasets for the implied price.
-        volume = candles1["volume"][idx]  # Assuming both have the same volume
+    For example, legs for XRP/BTC, XLM/BTC and ETH/BTC give XRP/XLM, XRP/ETH,
+    XLM/XRP, XLM/ETH, ETH/XRP and ETH/XLM in one pass; all legs are aligned on
+    the timestamps they share and the crosses are computed as one
+    (legs, legs, candles) array per field.
 
-        implied_candles["unix"].append(unix)
-        implied_candles["close"].append(_close)
-        implied_candles["high"].append(_high)
-        implied_candles["low"].append(_low)
-        implied_candles["open"].append(_open)
-        implied_candles["volume"].append(volume)
+    Parameters:
+    - legs: Dictionary of {asset: candles} all quoted in the same currency.
+    - how: Timestamp join, "inner" or "asof" against the first leg (see align()).
 
-    # Return the resulting dataset
-    return {k: np.array(v) for k, v in implied_candles.items()}
+    Returns:
+    - Dictionary of {(asset, currency): candles} for every ordered pair of legs.
+    """
+    names = list(legs)
+    if len(names) < 2:
+        return {}
+    unix = np.asarray(legs[names[0]]["unix"])
+    for name in names[1:]:
+        unix = align({"unix": unix}, {"unix": legs[name]["unix"]}, how)[0]["unix"]
+    aligned = [align({"unix": unix}, legs[name], how)[1] for name in names]
+
+    stack = {
+        key: np.array([np.asarray(leg[key], dtype=float) for leg in aligned])
+        for key in ("high", "low", "open", "close", "volume")
+    }
+    # numerator along axis 0, denominator along axis 1
+    num = {k: v[:, None, :] for k, v in stack.items()}
+    den = {k: v[None, :, :] for k, v in stack.items()}
+    _close = num["close"] / den["close"]
+    _open = num["open"] / den["open"]
+    _high, _low = synthesize_high_low(
+        num["high"],
+        den["high"],
+        num["low"],
+        den["low"],
+        num["open"],
+        den["open"],
+        num["close"],
+        den["close"],
+    )
+    _low = np.minimum.reduce([_high, _low, _open, _close])
+    _high = np.maximum.reduce([_high, _low, _open, _close])
+
+    crosses = {}
+    for i, asset in enumerate(names):
+        for j, currency in enumerate(names):
+            if i != j:
+                crosses[(asset, currency)] = {
+                    "unix": unix.copy(),
+                    "close": _close[i, j],
+                    "high": _high[i, j],
+                    "low": _low[i, j],
+                    "open": _open[i, j],
+                    "volume": stack["volume"][i].copy(),
+                }
+    return crosses
 
 
 def synthesize_high_low(d1_h, d2_h, d1_l, d2_l, d1_o, d2_o, d1_c, d2_c):
@@ -137,7 +207,8 @@ def synthesize_high_low(d1_h, d2_h, d1_l, d2_l, d1_o, d2_o, d1_c, d2_c):
     This function calculates the high and low values.
 
     Args:
-        d1_h, d2_h, d1_l, d2_l, d1_o, d2_o, d1_c, d2_c (float): The values from both asset datasets.
+        d1_h, d2_h, d1_l, d2_l, d1_o, d2_o, d1_c, d2_c (float or np.ndarray): The values
+        from both asset datasets.
 
     Returns:
         tuple: The calculated high and low values.
@@ -147,71 +218,340 @@ def synthesize_high_low(d1_h, d2_h, d1_l, d2_l, d1_o, d2_o, d1_c, d2_c):
     return _high, _low
 
 
+def compact_candles(candles, unix_dtype=np.int64, float_dtype=np.float32):
+    """
+    Convert candles to compact dtypes, as used by `Data(compact=True)`.
+
+    Parameters:
+    - candles: Dictionary of candle arrays.
+    - unix_dtype: Integer dtype for the "unix" and "candle_size" columns; np.uint32
+      also works for timestamps before 2106 but cannot hold negative differences.
+    - float_dtype: Dtype for prices and volume.
+
+    Returns:
+    - A new dictionary of candle arrays.
+    """
+    compacted = {}
+    for key, value in candles.items():
+        value = np.asarray(value)
+        if key in ("unix", "candle_size"):
+            compacted[key] = np.round(value).astype(unix_dtype)
+        elif value.dtype.kind == "f":
+            compacted[key] = value.astype(float_dtype)
+        else:
+            compacted[key] = value
+    return compacted
+
+
+class CandleRing:
+    """
+    Fixed length window of candles that new candles are appended to, dropping the
+    oldest, without reallocating.
+
+    Every row is written twice, at i and i + capacity, so the newest `capacity` rows
+    are always one contiguous slice and view() hands them out without copying.
+    Appending costs as much as the rows appended, not the length of the window.
+    """
+
+    def __init__(self, candles, capacity=None):
+        """
+        Parameters:
+        - candles: Dictionary of candle arrays sorted by "unix" to start with.
+        - capacity: Number of candles kept; defaults to the length of `candles`.
+        """
+        capacity = int(capacity or len(candles["unix"]))
+        if capacity < 1:
+            raise ValueError("CandleRing needs a capacity of at least one candle.")
+        self.capacity = capacity
+        self.size = 0
+        self.head = 0
+        self.columns = {
+            k: np.empty(2 * capacity, dtype=np.asarray(v).dtype)
+            for k, v in candles.items()
+        }
+        self.extend(candles)
+
+    def __len__(self):
+        return self.size
+
+    def extend(self, candles):
+        """
+        Append candles newer than everything held; the oldest fall out of the window.
+        """
+        rows = len(candles["unix"])
+        skip = max(0, rows - self.capacity)
+        positions = (self.head + np.arange(rows - skip)) % self.capacity
+        for key, column in self.columns.items():
+            values = np.asarray(candles[key])[skip:]
+            column[positions] = values
+            column[positions + self.capacity] = values
+        self.head = (self.head + rows - skip) % self.capacity
+        self.size = min(self.capacity, self.size + rows - skip)
+
+    def view(self):
+        """
+        Return the window as a dictionary of zero-copy arrays, oldest first.
+
+        The arrays are overwritten by later appends; copy them to keep a snapshot.
+        """
+        stop = self.head + self.capacity
+        return {k: v[stop - self.size : stop] for k, v in self.columns.items()}
+
+
 def quantize_unix(unix_array, candle_size):
     # Quantize the unix times by the given candle size
     return np.floor(unix_array / candle_size) * candle_size
 
 
-def merge_candles(candles, candle_size):
-    # Quantize the unix times for both dictionaries
-    candles = [
-        {**batch, "unix": quantize_unix(batch["unix"], candle_size)}
-        for batch in candles
-    ]
+def normalize_candles(
+    candles, interval, begin=None, end=None, strip=True, clamp=2.0, report=None
+):
+    """
+    Shared cleaning stage for freshly fetched candles, vectorized throughout.
+
+    Steps:
+    1. Drop rows with a missing or non-finite unix or price.
+    2. Sort by unix and drop duplicate timestamps, keeping the first fetched.
+    3. Put the candles on a regular `interval` grid; every grid candle takes the
+       first candle in (unix - interval, unix], and empty buckets are filled as flat,
+       zero volume candles at the previous close.
+    4. Optionally strip zero volume (pre-market) candles from the beginning.
+    5. Make high the highest and low the lowest price, clamp high and low to
+       `clamp` times / divided by the open-close average, and keep open and close
+       within [low, high].
+
+    Parameters:
+    - candles: Dictionary of unix/open/high/low/close/volume arrays or lists.
+    - interval: The candle size in seconds.
+    - begin: Optional first grid timestamp; the grid never starts before the data.
+    - end: Optional exclusive end of the grid, by default one interval past the
+      last candle.
+    - strip: Whether to strip leading zero volume candles.
+    - clamp: Outlier ratio for high and low, or None to skip clamping.
+    - report: Optional dictionary, updated with data quality counts: "rows",
+      "nulls", "duplicates", "unsorted", "filled", "stripped", "clamped".
+
+    Returns:
+    - A dictionary of float arrays; empty arrays if nothing valid was given.
+    """
+    keys = ["unix", "open", "high", "low", "close", "volume"]
+    columns = {key: np.asarray(candles[key], dtype=float) for key in keys}
+    counts = {"rows": len(columns["unix"])}
 
-    # Find the unique unix values from both dictionaries
-    unique_unix = np.sort(
-        np.unique(np.concatenate([batch["unix"] for batch in candles]))
+    # 1. null removal
+    valid = np.logical_and.reduce(
+        [np.isfinite(columns[key]) for key in ["unix", "open", "high", "low", "close"]]
     )
+    columns = {key: value[valid] for key, value in columns.items()}
+    columns["volume"] = np.nan_to_num(columns["volume"])
+    counts["nulls"] = int(np.count_nonzero(~valid))
+
+    # 2. stable sort and dedupe
+    order = np.argsort(columns["unix"], kind="stable")
+    counts["unsorted"] = bool(np.any(np.diff(order) < 0))
+    unix = columns["unix"][order]
+    first = np.ones(len(unix), dtype=bool)
+    first[1:] = unix[1:] != unix[:-1]
+    order = order[first]
+    columns = {key: value[order] for key, value in columns.items()}
+    counts["duplicates"] = int(np.count_nonzero(~first))
+
+    unix = columns["unix"]
+    if not len(unix):
+        counts.update({"filled": 0, "stripped": 0, "clamped": 0})
+        if report is not None:
+            report.update(counts)
+        return {key: np.array([], dtype=float) for key in keys}
+
+    # 3. forward fill on a regular grid
+    start = unix[0] if begin is None else max(unix[0], int(begin))
+    stop = unix[-1] + interval if end is None else end
+    grid = np.arange(start, stop, interval, dtype=float)
+    # first candle after the previous grid point
+    match = np.searchsorted(unix, grid - interval, side="right")
+    matched = match < len(unix)
+    matched[matched] = unix[match[matched]] <= grid[matched]
+    # latest candle at or before each grid point, for the previous close
+    previous = np.clip(np.searchsorted(unix, grid, side="right") - 1, 0, None)
+    fill = columns["close"][previous]
+    take = match.clip(0, len(unix) - 1)
+    filled = {"unix": grid}
+    for key in ["open", "high", "low", "close"]:
+        filled[key] = np.where(matched, columns[key][take], fill)
+    filled["volume"] = np.where(matched, columns["volume"][take], 0.0)
+    counts["filled"] = int(np.count_nonzero(~matched))
+    columns = filled
+
+    # 4. left strip
+    stripped = 0
+    if strip:
+        traded = np.flatnonzero(columns["volume"] > 0)
+        stripped = int(traded[0]) if len(traded) else len(columns["volume"])
+        columns = {key: value[stripped:] for key, value in columns.items()}
+    counts["stripped"] = stripped
+
+    # 5. ensure high is high and low is low, and clamp extremes
+    prices = np.stack([columns[key] for key in ["open", "high", "low", "close"]])
+    before = prices.copy()
+    high = prices.max(axis=0)
+    low = prices.min(axis=0)
+    if clamp is not None:
+        average = (columns["open"] + columns["close"]) / 2
+        high = np.minimum(high, average * clamp)
+        low = np.maximum(low, average / clamp)
+    columns["high"] = high
+    columns["low"] = low
+    columns["open"] = np.clip(columns["open"], low, high)
+    columns["close"] = np.clip(columns["close"], low, high)
+    after = np.stack([columns[key] for key in ["open", "high", "low", "close"]])
+    counts["clamped"] = int(np.count_nonzero(np.any(after != before, axis=0)))
+
+    if report is not None:
+        report.update(counts)
+    return columns
+
+
+def merge_intervals(intervals, candle_size=0):
+    """
+    Sort and coalesce inclusive [begin, end] intervals.
+
+    Parameters:
+    - intervals: Iterable of [begin, end] pairs.
+    - candle_size: Intervals at most this far apart are adjacent and joined.
+
+    Returns:
+    - A sorted list of disjoint [begin, end] lists.
+    """
+    merged = []
+    for begin, end in sorted(intervals):
+        if merged and begin <= merged[-1][1] + candle_size:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([begin, end])
+    return merged
+
+
+def index_intervals(entry, candle_size):
+    """
+    Normalize a data index entry to a list of quantized intervals.
+
+    Older indexes stored a single [begin, end] pair per key; those are read as
+    a set holding one interval.
+
+    Parameters:
+    - entry: The data index value, [begin, end] or [[begin, end], ...].
+    - candle_size: The candle size of the series.
+
+    Returns:
+    - A sorted list of disjoint [begin, end] lists.
+    """
+    if len(entry) == 2 and all(isinstance(i, (int, float)) for i in entry):
+        entry = [entry]
+    return merge_intervals(
+        [
+            [
+                float(quantize_unix(begin, candle_size)),
+                float(quantize_unix(end, candle_size)),
+            ]
+            for begin, end in entry
+        ],
+        candle_size,
+    )
+
+
+def missing_intervals(intervals, begin, end, candle_size=0):
+    """
+    Find the parts of [begin, end] not covered by a set of intervals.
+
+    Parameters:
+    - intervals: Sorted, disjoint [begin, end] pairs, as from merge_intervals().
+    - begin, end: The inclusive range that is needed.
+    - candle_size: Spacing of the candles the intervals describe.
+
+    Returns:
+    - A list of [begin, end] sub-ranges that still have to be fetched.
+    """
+    missing = []
+    cursor = begin
+    for start, stop in intervals:
+        if cursor > end:
+            break
+        if start > cursor:
+            missing.append([cursor, min(start - candle_size, end)])
+        cursor = max(cursor, stop + candle_size)
+    if cursor <= end:
+        missing.append([cursor, end])
+    return [i for i in missing if i[0] <= i[1]]
 
-    # Initialize the merged dictionary
-    merged_candles = {
-        "unix": unique_unix,
-        "high": [],
-        "low": [],
-        "open": [],
-        "close": [],
-        "volume": [],
+
+def merge_candles(candles, candle_size):
+    """
+    Merge several candle batches into one series, one candle per quantized unix.
+
+    Where batches overlap, the open comes from the first batch and the close
+    from the last, while high, low and volume are the max, min and max of the
+    batches; within a batch only the first candle at a timestamp counts.
+
+    Parameters:
+    - candles: List of candle dictionaries, in priority order.
+    - candle_size: The candle size used to quantize the unix times.
+
+    Returns:
+    - A dictionary of float arrays sorted by "unix".
+    """
+    # Quantize the unix times and flatten every batch into one set of columns
+    unix = np.concatenate(
+        [
+            quantize_unix(np.asarray(batch["unix"], dtype=float), candle_size)
+            for batch in candles
+        ]
+    )
+    batch_id = np.concatenate(
+        [np.full(len(batch["unix"]), i) for i, batch in enumerate(candles)]
+    )
+    position = np.concatenate([np.arange(len(batch["unix"])) for batch in candles])
+    columns = ["high", "low", "open", "close", "volume"]
+    stacked = {
+        key: np.concatenate([np.asarray(batch[key], dtype=float) for batch in candles])
+        for key in columns
     }
-    if any("candle_size" in i for i in candles):
-        merged_candles["candle_size"] = []
-
-    # Merge and handle conflicts by prioritizing candles1
-    for i, unix in enumerate(unique_unix):
-        # Initialize high, low, open, close for this unix
-        high_vals = []
-        low_vals = []
-        vol_vals = []
-        open_val = None
-        close_val = None
-        candle_sizes = []
-
-        for batch in candles:
-            # Handle batch prices at the current unix time
-            if unix in batch["unix"]:
-                idx = np.where(batch["unix"] == unix)[0][0]
-                high_vals.append(batch["high"][idx])
-                low_vals.append(batch["low"][idx])
-                vol_vals.append(batch["volume"][idx])
-                if open_val is None:
-                    open_val = batch["open"][idx]
-                close_val = batch["close"][idx]
-                if "candle_size" in batch:
-                    candle_sizes.append(batch["candle_size"][idx])
-
-        # Set the values for the merged dictionary
-        if close_val is not None:
-            merged_candles["high"].append(np.max(high_vals))
-            merged_candles["low"].append(np.min(low_vals))
-            merged_candles["open"].append(open_val)
-            merged_candles["close"].append(close_val)
-            merged_candles["volume"].append(np.max(vol_vals))
-            if candle_sizes:
-                merged_candles["candle_size"].append(max(candle_sizes))
-            elif "candle_size" in merged_candles:
-                merged_candles["candle_size"].append(0)
-
-    return {k: np.array(v, dtype=float) for k, v in merged_candles.items()}
+    has_size = any("candle_size" in i for i in candles)
+    if has_size:
+        # batches without a candle size never win the max
+        stacked["candle_size"] = np.concatenate(
+            [
+                np.asarray(batch["candle_size"], dtype=float)
+                if "candle_size" in batch
+                else np.full(len(batch["unix"]), -np.inf)
+                for batch in candles
+            ]
+        )
+
+    # stable order by unix, then batch priority, then position within the batch
+    order = np.lexsort((position, batch_id, unix))
+    unix, batch_id = unix[order], batch_id[order]
+    # only the first candle of each batch at a given unix counts
+    keep = np.ones(len(unix), dtype=bool)
+    keep[1:] = (unix[1:] != unix[:-1]) | (batch_id[1:] != batch_id[:-1])
+    order, unix = order[keep], unix[keep]
+
+    merged = {"unix": np.unique(unix)}
+    if not len(unix):
+        merged.update({key: np.array([], dtype=float) for key in stacked})
+        return merged
+    starts = np.flatnonzero(np.concatenate(([True], unix[1:] != unix[:-1])))
+    ends = np.concatenate((starts[1:], [len(unix)])) - 1
+
+    values = {key: value[order] for key, value in stacked.items()}
+    merged["high"] = np.maximum.reduceat(values["high"], starts)
+    merged["low"] = np.minimum.reduceat(values["low"], starts)
+    merged["open"] = values["open"][starts]
+    merged["close"] = values["close"][ends]
+    merged["volume"] = np.maximum.reduceat(values["volume"], starts)
+    if has_size:
+        size = np.maximum.reduceat(values["candle_size"], starts)
+        merged["candle_size"] = np.where(np.isneginf(size), 0, size)
+    return merged
 
 
 def interpolate(data, oldperiod, newperiod):
@@ -247,80 +587,155 @@ def interpolate(data, oldperiod, newperiod):
     }
 
 
-def create_candles(data, width=86400, stride=600):
-    """
-    Create OHLCV candles given a list of (unix, price, volume) tuples
+# minute, five minute, fifteen minute, hour, four hour, day
+PYRAMID = [60, 5 * 60, 15 * 60, 60 * 60, 4 * 60 * 60, 86400]
+
+
+def window_reduce(ufunc, values, starts, stops):
     """
-    candles = []
-    data = np.array(data)
+    Reduce `values` over many (possibly overlapping) [start, stop) windows at once.
 
-    # Initialize variables
-    start_index = 0
-    num_data_points = len(data)
+    Interleaving the starts and stops lets a single `ufunc.reduceat` call do the
+    work; every window must be non-empty.
 
-    for unix in np.arange(data[0][0], data[-1][0], stride):
-        # Move the start_index to the first valid data point for the current candle
-        while start_index < num_data_points and data[start_index][0] < unix - width:
-            start_index += 1
+    Parameters:
+    - ufunc: i.e. np.maximum, np.minimum or np.add.
+    - values: 1D array.
+    - starts, stops: Arrays of window bounds, with starts < stops.
 
-        # If there are no valid data points, continue to the next candle
-        if start_index >= num_data_points or data[start_index][0] > unix:
-            continue
+    Returns:
+    - An array with one reduced value per window.
+    """
+    if not len(starts):
+        return np.array([], dtype=values.dtype)
+    # pad so a window may stop at the very end
+    padded = np.append(values, values[-1:])
+    bounds = np.empty(2 * len(starts), dtype=np.intp)
+    bounds[0::2] = starts
+    bounds[1::2] = stops
+    return ufunc.reduceat(padded, bounds)[0::2]
 
-        # Now we can slice the data for the current candle
-        end_index = start_index
-        while end_index < num_data_points and data[end_index][0] <= unix:
-            end_index += 1
-
-        # Get the valid data points for this candle
-        datapoints = data[start_index:end_index]
-
-        # Create the candle
-        current_candle = {
-            "open": datapoints[0][1],
-            "high": np.max(datapoints[:, 1]),
-            "low": np.min(datapoints[:, 1]),
-            "close": datapoints[-1][1],
-            "volume": np.sum(datapoints[:, 2]),
-            "unix": unix,
-        }
-        if datapoints.shape[1] > 3:
-            current_candle["candle_size"] = np.max(datapoints[:, 3])
-        candles.append(current_candle)
 
-    return {k: np.array(v) for k, v in rotate(candles).items()}
+def create_candles(data, width=86400, stride=600):
+    """
+    Create OHLCV candles given a list of (unix, price, volume[, candle_size]) tuples
+
+    A candle is labeled with the unix at its end and holds every data point in
+    [unix - width, unix]; labels are spaced `stride` apart from the first data point.
+    """
+    data = np.array(data, dtype=float)
+    unix = data[:, 0]
+
+    labels = np.arange(unix[0], unix[-1], stride)
+    starts = np.searchsorted(unix, labels - width, side="left")
+    stops = np.searchsorted(unix, labels, side="right")
+    # skip candles with no valid data points
+    valid = starts < stops
+    labels, starts, stops = labels[valid], starts[valid], stops[valid]
+
+    candles = {
+        "open": data[starts, 1],
+        "high": window_reduce(np.maximum, data[:, 1], starts, stops),
+        "low": window_reduce(np.minimum, data[:, 1], starts, stops),
+        "close": data[stops - 1, 1],
+        "volume": window_reduce(np.add, data[:, 2], starts, stops),
+        "unix": labels,
+    }
+    if data.shape[1] > 3:
+        candles["candle_size"] = window_reduce(np.maximum, data[:, 3], starts, stops)
+    return candles
 
 
 def reaggregate(data, candle_size, stride=None):
-    discrete = list(
-        itertools.chain(
-            *[
-                [
-                    [unix, _open, volume / 4, size],
-                    [unix, high, volume / 4, size],
-                    [unix, low, volume / 4, size],
-                    [unix, close, volume / 4, size],
-                ]
-                for unix, high, low, _open, close, volume, size in zip(
-                    data["unix"],
-                    data["high"],
-                    data["low"],
-                    data["open"],
-                    data["close"],
-                    data["volume"],
-                    data.get(
-                        "candle_size",
-                        np.full(data["unix"].shape, data["unix"][1] - data["unix"][0]),
-                    ),
-                )
-            ]
-        )
+    """
+    Rebucket candles into candles `candle_size` wide spaced `stride` apart,
+    treating every candle as four discrete (ohlc) data points at its unix.
+    """
+    size = data.get(
+        "candle_size",
+        np.full(data["unix"].shape, data["unix"][1] - data["unix"][0]),
     )
+    # interleave open, high, low, close per candle
+    discrete = np.empty((len(data["unix"]) * 4, 4))
+    discrete[:, 0] = np.repeat(data["unix"], 4)
+    discrete[:, 1] = np.stack(
+        [data["open"], data["high"], data["low"], data["close"]], axis=1
+    ).ravel()
+    discrete[:, 2] = np.repeat(np.asarray(data["volume"]) / 4, 4)
+    discrete[:, 3] = np.repeat(size, 4)
     return create_candles(
         discrete, candle_size, stride if stride is not None else candle_size
     )
 
 
+def resample(candles, candle_size, stride=None):
+    """
+    Resample OHLCV candles to a larger candle size.
+
+    Each output candle is labeled with the start of its window, [unix, unix +
+    candle_size), and windows begin every `stride` seconds; by default windows do
+    not overlap, i.e. ordinary 1m -> 1h bucketing.  Empty windows are skipped.
+
+    Parameters:
+    - candles: Candle dictionary sorted by "unix".
+    - candle_size: Width of the new candles in seconds.
+    - stride: Optional spacing of the new candles, for sliding windows.
+
+    Returns:
+    - A dictionary of resampled candle arrays.
+    """
+    stride = candle_size if stride is None else stride
+    unix = np.asarray(candles["unix"], dtype=float)
+    if not len(unix):
+        return {k: np.asarray(v)[:0] for k, v in candles.items()}
+
+    labels = np.arange(quantize_unix(unix[0], stride), unix[-1] + 1, stride)
+    starts = np.searchsorted(unix, labels, side="left")
+    stops = np.searchsorted(unix, labels + candle_size, side="left")
+    valid = starts < stops
+    labels, starts, stops = labels[valid], starts[valid], stops[valid]
+
+    def column(key):
+        return np.asarray(candles[key])
+
+    resampled = {
+        "unix": labels,
+        "open": column("open")[starts],
+        "high": window_reduce(np.maximum, column("high"), starts, stops),
+        "low": window_reduce(np.minimum, column("low"), starts, stops),
+        "close": column("close")[stops - 1],
+        "volume": window_reduce(np.add, column("volume"), starts, stops),
+    }
+    if "candle_size" in candles:
+        resampled["candle_size"] = np.full(len(labels), candle_size)
+    return resampled
+
+
+def build_pyramid(candles, base_size, sizes=None):
+    """
+    Resample candles to every timeframe of a pyramid in one pass.
+
+    Each level is built from the largest smaller level that divides it
+    (1m -> 5m -> 15m -> 1h -> 4h -> 1d), so every candle is only read once per level.
+
+    Parameters:
+    - candles: Candle dictionary at `base_size`.
+    - base_size: The candle size of `candles`.
+    - sizes: Optional list of candle sizes, by default PYRAMID.
+
+    Returns:
+    - Dictionary of {candle_size: candles}, including `base_size` itself; sizes
+      smaller than, or not a multiple of, `base_size` are left out.
+    """
+    pyramid = {base_size: candles}
+    for size in sorted(PYRAMID if sizes is None else sizes):
+        if size <= base_size or size % base_size:
+            continue
+        source = max(i for i in pyramid if size % i == 0)
+        pyramid[size] = resample(pyramid[source], size)
+    return pyramid
+
+
 def fetch_composite_data(data, new_size):
     """
     Fetches and aggregates high-resolution candle data for a given asset from a
@@ -367,7 +782,7 @@ def fetch_composite_data(data, new_size):
     if DETAIL:
         print(f"Gathering data with candle_size={new_size}")
     try:
-        high_res = Data(
+        high_res_data = Data(
             exchange=data.exchange,
             asset=data.asset,
             currency=data.currency,
@@ -377,10 +792,12 @@ def fetch_composite_data(data, new_size):
             intermediary=data.intermediary,
             end=end,
             candle_size=new_size,
-        ).raw_candles
+        )
+        high_res = high_res_data.raw_candles
     except KeyboardInterrupt:
         raise
     except:
+        high_res_data = None
         high_res = {}
     else:
         high_res = {
@@ -487,6 +904,53 @@ def fetch_composite_data(data, new_size):
 
     # assign our aggregated data to the data class we were given so that it's
     # in the format the rest of QTradeX expects it to be in
+    if getattr(data, "compact", False):
+        re_agg = compact_candles(re_agg)
+        high_res = compact_candles(high_res)
+
+    data.raw_candles = re_agg
+    data.candle_size = new_size
+    # keep the high resolution window around so update_composite_data() can
+    # append to it instead of fetching it all again
+    if high_res_data is not None:
+        high_res_data.raw_candles = high_res
+        high_res_data.compact = getattr(data, "compact", False)
+    data.high_res = high_res_data
+    return data, high_res
+
+
+def update_composite_data(data, new_size, now=None):
+    """
+    Bring data from fetch_composite_data() up to date on a live or papertrade tick.
+
+    Only the high resolution candles newer than the last one held are fetched (see
+    Data.append_latest) and the window is reaggregated from them; if there is no
+    high resolution window to append to, the window is moved to end at `now` and
+    this falls back to fetch_composite_data().
+
+    Parameters:
+    - data: A Data object previously passed through fetch_composite_data().
+    - new_size: The high resolution candle size, as given to fetch_composite_data().
+    - now: Optional unix time to fetch up to; defaults to the current time.
+
+    Returns:
+    - (data, high_res) as fetch_composite_data() does.
+    """
+    high_res_data = getattr(data, "high_res", None)
+    if high_res_data is None or high_res_data.candle_size != new_size:
+        now = int(time.time()) if now is None else int(now)
+        # same window length, ending now
+        data.begin, data.end = now - (data.end - data.begin), now
+        data.candle_size = data.base_size
+        return fetch_composite_data(data, new_size)
+
+    high_res_data.append_latest(now)
+    high_res = high_res_data.raw_candles
+    re_agg = reaggregate(high_res, data.base_size, stride=new_size)
+    if getattr(data, "compact", False):
+        re_agg = compact_candles(re_agg)
+
     data.raw_candles = re_agg
     data.candle_size = new_size
+    data.end = high_res_data.end
     return data, high_res
@@ -0,0 +1,52 @@
+import unittest
+
+import numpy as np
+from qtradex.public.utilities import update_composite_data
+
+
+class SyntheticData:
+    """
+    Stands in for Data: any window of a linear price series, without a network.
+    """
+
+    def __init__(self, exchange, asset, currency, begin, end=None, candle_size=86400, **kwargs):
+        self.exchange = exchange
+        self.asset = asset
+        self.currency = currency
+        self.pool = self.api_key = self.intermediary = None
+        self.candle_size = self.base_size = int(candle_size)
+        self.begin = int(np.ceil(begin / candle_size) * candle_size)
+        self.end = int(np.ceil(end / candle_size) * candle_size)
+        unix = np.arange(self.begin, self.end + 1, candle_size, dtype=float)
+        self.raw_candles = {
+            "unix": unix,
+            "open": unix / 1e6,
+            "high": unix / 1e6 + 1,
+            "low": unix / 1e6 - 1,
+            "close": unix / 1e6,
+            "volume": np.ones(len(unix)),
+        }
+        self.high_res = None
+
+
+class TestUpdateCompositeData(unittest.TestCase):
+
+    def test_fallback_moves_the_window(self):
+        # without a high resolution window to append to, the tick refetches
+        # the same length of data, ending at `now`
+        begin, end = 1_700_006_400, 1_700_006_400 + 30 * 86400
+        data = SyntheticData("x", "A", "B", begin, end)
+
+        for days in (2, 5):
+            now = end + days * 86400
+            data.high_res = None
+            data, _ = update_composite_data(data, 3600, now)
+
+            self.assertEqual(data.end, now)
+            self.assertEqual(data.end - data.begin, end - begin)
+            self.assertEqual(data.high_res.end, now)
+            self.assertGreater(data.raw_candles["unix"][-1], end)
+
+
+if __name__ == "__main__":
+    unittest.main()